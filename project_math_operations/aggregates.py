@@ -0,0 +1,414 @@
+# aggregates.py
+# This module computes running totals of the four math operations over streams of operand pairs.
+
+# Aggregates are computed in a single pass and in constant memory, however long the stream:
+# - sums use Neumaier's compensated summation, so adding many numbers of different magnitudes
+#   does not lose the small ones (each batch is first summed exactly with math.fsum);
+# - means and variances use Welford's algorithm, and batches and shards are combined with the
+#   pairwise update of Chan et al., which avoids the cancellation of the sum-of-squares formula;
+# - minimum and maximum are tracked directly, and are NaN once a value is NaN.
+#
+# Every state can be merged with another one, so shards of a stream can be aggregated in parallel
+# (e.g. in separate processes, through to_dict and from_dict) and combined afterwards. Merging
+# the states of two halves gives the same result as aggregating the whole stream.
+
+import math
+from itertools import compress, islice
+from typing import Any, Dict, Iterable, Sequence, Tuple
+
+from math_operations import add_batch, subtract_batch, multiply_batch, divide_batch
+from stream_operations import DEFAULT_CHUNK_SIZE, parse_pairs
+
+# Names of the results aggregated by OperationAggregates, in output order.
+RESULTS = ("sum", "difference", "product", "quotient")
+
+
+def _scaled_sum(values: Sequence[float]) -> Tuple[float, int]:
+    # The exact sum of the values as (s, e), the sum being s * 2**e. e is 0 unless a partial
+    # sum overflows: the values are then summed scaled down by a power of two, which is exact
+    # but for subnormal values, so the sum and the mean survive even if s * 2**e overflows.
+    try:
+        return math.fsum(values), 0
+    except OverflowError:
+        scale = len(values).bit_length() + 1
+        return math.fsum([math.ldexp(x, -scale) for x in values]), scale
+    except ValueError:
+        # inf and -inf: the sum is undefined, like inf - inf.
+        return math.nan, 0
+
+
+def _ldexp(x: float, exponent: int) -> float:
+    # math.ldexp, giving +-inf instead of raising when the result overflows.
+    try:
+        return math.ldexp(x, exponent)
+    except OverflowError:
+        return math.copysign(math.inf, x)
+
+
+def _nan_min(x: float, y: float) -> float:
+    # min, but NaN if either value is NaN, whatever the order of the arguments.
+    return x if x != x or x < y else y
+
+
+def _nan_max(x: float, y: float) -> float:
+    # max, but NaN if either value is NaN, whatever the order of the arguments.
+    return x if x != x or x > y else y
+
+
+class RunningStats:
+    """
+    Count, compensated sum, mean, variance, minimum and maximum of a stream of numbers.
+
+    Attributes:
+        count (int): The number of values seen.
+        mean (float): The mean of the values, NaN before the first value.
+        minimum (float): The smallest value, NaN before the first value or once a value
+            is NaN.
+        maximum (float): The largest value, NaN before the first value or once a value
+            is NaN.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = math.nan
+        self.minimum = math.nan
+        self.maximum = math.nan
+        # Neumaier sum: the running total and the compensation for its lost low-order bits.
+        self._total = 0.0
+        self._compensation = 0.0
+        # Welford: sum of squared differences from the current mean.
+        self._m2 = 0.0
+
+    def _add_to_total(self, x: float) -> None:
+        # One step of Neumaier's compensated summation. Once the total is infinite or NaN
+        # there are no low-order bits left to compensate.
+        total = self._total + x
+        if math.isfinite(total):
+            if abs(self._total) >= abs(x):
+                self._compensation += (self._total - total) + x
+            else:
+                self._compensation += (x - total) + self._total
+        self._total = total
+
+    def _combine(self, count: int, mean: float, m2: float, minimum, maximum) -> None:
+        # Chan et al.: merges the count, mean and squared differences of another group.
+        if not count:
+            return
+        if not self.count:
+            self.count, self.mean, self._m2 = count, mean, m2
+            self.minimum, self.maximum = minimum, maximum
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.minimum = _nan_min(self.minimum, minimum)
+        self.maximum = _nan_max(self.maximum, maximum)
+
+    def update(self, x: float) -> None:
+        """
+        Adds one value.
+
+        Args:
+            x (float): The value.
+        """
+        self._add_to_total(x)
+        if not self.count:
+            self.count, self.mean, self._m2 = 1, x, 0.0
+            self.minimum = self.maximum = x
+            return
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        # Once either is NaN, no comparison is true and it stays NaN.
+        if x < self.minimum or x != x:
+            self.minimum = x
+        if x > self.maximum or x != x:
+            self.maximum = x
+
+    def update_batch(self, values: Sequence[float]) -> None:
+        """
+        Adds many values at once. The statistics equal, up to rounding, those of calling update
+        for each value.
+
+        Args:
+            values (Sequence[float]): The values.
+        """
+        n = len(values)
+        if not n:
+            return
+        # The exact sum lets the batch enter the compensated total as a single term.
+        scaled_total, scale = _scaled_sum(values)
+        self._add_to_total(_ldexp(scaled_total, scale))
+        mean = _ldexp(scaled_total / n, scale)
+        m2 = _ldexp(*_scaled_sum([(x - mean) * (x - mean) for x in values]))
+        minimum, maximum = min(values), max(values)
+        if scaled_total != scaled_total and any(x != x for x in values):
+            # A NaN makes the extremes NaN, wherever it is; min and max depend on its place.
+            minimum = maximum = math.nan
+        self._combine(n, mean, m2, minimum, maximum)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """
+        Adds every value seen by another state, e.g. the state of another shard.
+
+        Args:
+            other (RunningStats): The state to merge into this one. It is not modified.
+
+        Returns:
+            RunningStats: This state.
+        """
+        self._add_to_total(other._total)
+        self._add_to_total(other._compensation)
+        self._combine(other.count, other.mean, other._m2, other.minimum, other.maximum)
+        return self
+
+    @property
+    def total(self) -> float:
+        """
+        float: The compensated sum of the values.
+        """
+        if not math.isfinite(self._total):
+            return self._total
+        return self._total + self._compensation
+
+    @property
+    def variance(self) -> float:
+        """
+        float: The population variance of the values, NaN before the first value.
+        """
+        return self._m2 / self.count if self.count else math.nan
+
+    @property
+    def sample_variance(self) -> float:
+        """
+        float: The sample variance of the values, NaN before the second value.
+        """
+        return self._m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def stddev(self) -> float:
+        """
+        float: The population standard deviation of the values.
+        """
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Returns the state as a dictionary that can be sent to another process or saved.
+
+        Returns:
+            dict: The count, total, mean, variance, minimum and maximum, and the internal
+            terms from_dict needs to restore the exact state.
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "variance": self.variance,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "_total": self._total,
+            "_compensation": self._compensation,
+            "_m2": self._m2,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, float]) -> "RunningStats":
+        """
+        Restores a state returned by to_dict.
+
+        Args:
+            state (dict): The dictionary returned by to_dict.
+
+        Returns:
+            RunningStats: The restored state.
+        """
+        stats = cls()
+        stats.count = state["count"]
+        stats.mean = state["mean"]
+        stats.minimum = state["minimum"]
+        stats.maximum = state["maximum"]
+        stats._total = state["_total"]
+        stats._compensation = state["_compensation"]
+        stats._m2 = state["_m2"]
+        return stats
+
+    def __repr__(self):
+        return (
+            f"RunningStats(count={self.count}, total={self.total!r}, mean={self.mean!r}, "
+            f"variance={self.variance!r}, minimum={self.minimum!r}, maximum={self.maximum!r})"
+        )
+
+
+class OperationAggregates:
+    """
+    Running statistics of the sum, difference, product and quotient of a stream of pairs.
+
+    Quotients of pairs whose divisor is zero are left out of the quotient statistics and
+    counted in zero_divisions instead.
+
+    Attributes:
+        pairs (int): The number of operand pairs seen.
+        zero_divisions (int): The number of pairs whose divisor was zero.
+        skipped (int): The number of input lines skipped by aggregate_stream.
+        stats (dict): The RunningStats of every name in RESULTS.
+    """
+
+    def __init__(self):
+        self.pairs = 0
+        self.zero_divisions = 0
+        self.skipped = 0
+        self.stats = {name: RunningStats() for name in RESULTS}
+
+    def update(self, a: float, b: float) -> None:
+        """
+        Adds the results of one operand pair.
+
+        Args:
+            a (float): The first number.
+            b (float): The second number.
+        """
+        self.update_batch([a], [b])
+
+    def update_batch(self, a: Sequence[float], b: Sequence[float]) -> None:
+        """
+        Adds the results of many operand pairs, computed with the math_operations batch
+        functions.
+
+        Args:
+            a (Sequence[float]): The first numbers.
+            b (Sequence[float]): The second numbers.
+        """
+        quotients, zero_mask = divide_batch(a, b)
+        self.stats["sum"].update_batch(add_batch(a, b))
+        self.stats["difference"].update_batch(subtract_batch(a, b))
+        self.stats["product"].update_batch(multiply_batch(a, b))
+        zeros = zero_mask.count(1)
+        if zeros:
+            quotients = list(compress(quotients, [not zero for zero in zero_mask]))
+        self.stats["quotient"].update_batch(quotients)
+        self.pairs += len(zero_mask)
+        self.zero_divisions += zeros
+
+    def merge(self, other: "OperationAggregates") -> "OperationAggregates":
+        """
+        Adds every pair seen by another state, e.g. the state of another shard.
+
+        Args:
+            other (OperationAggregates): The state to merge into this one. It is not modified.
+
+        Returns:
+            OperationAggregates: This state.
+        """
+        self.pairs += other.pairs
+        self.zero_divisions += other.zero_divisions
+        self.skipped += other.skipped
+        for name in RESULTS:
+            self.stats[name].merge(other.stats[name])
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the state as a dictionary that can be sent to another process or saved.
+
+        Returns:
+            dict: The pair, zero-division and skipped line counts, and the statistics of
+            every result.
+        """
+        return {
+            "pairs": self.pairs,
+            "zero_divisions": self.zero_divisions,
+            "skipped": self.skipped,
+            **{name: self.stats[name].to_dict() for name in RESULTS},
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "OperationAggregates":
+        """
+        Restores a state returned by to_dict.
+
+        Args:
+            state (dict): The dictionary returned by to_dict.
+
+        Returns:
+            OperationAggregates: The restored state.
+        """
+        aggregates = cls()
+        aggregates.pairs = state["pairs"]
+        aggregates.zero_divisions = state["zero_divisions"]
+        aggregates.skipped = state["skipped"]
+        for name in RESULTS:
+            aggregates.stats[name] = RunningStats.from_dict(state[name])
+        return aggregates
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Returns the aggregates without the internal terms of the states.
+
+        Returns:
+            dict: The pair, zero-division and skipped line counts, and the count, total,
+            mean, variance, minimum and maximum of every result.
+        """
+        state = self.to_dict()
+        for name in RESULTS:
+            state[name] = {
+                k: v for k, v in state[name].items() if not k.startswith("_")
+            }
+        return state
+
+
+def aggregate_columns(
+    a: Sequence[float], b: Sequence[float], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> OperationAggregates:
+    """
+    Aggregates the results of two columns of operands, e.g. mapped binary columns, a chunk
+    at a time.
+
+    Args:
+        a (Sequence[float]): The first numbers.
+        b (Sequence[float]): The second numbers.
+        chunk_size (int): The number of pairs evaluated at a time.
+
+    Returns:
+        OperationAggregates: The aggregates of every pair.
+    """
+    aggregates = OperationAggregates()
+    for start in range(0, len(a), chunk_size):
+        aggregates.update_batch(
+            a[start : start + chunk_size], b[start : start + chunk_size]
+        )
+    return aggregates
+
+
+def aggregate_stream(
+    lines: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> OperationAggregates:
+    """
+    Aggregates the results of every operand pair of a stream of lines in one pass.
+
+    Only one chunk of lines is held in memory at a time. Lines that are not a valid pair are
+    skipped, like in stream_operations.
+
+    Args:
+        lines (Iterable[str]): Lines of text, e.g. an open file, each holding two numbers
+            separated by a comma or whitespace.
+        chunk_size (int): The number of lines read and evaluated at a time.
+
+    Returns:
+        OperationAggregates: The aggregates of every valid pair. Its skipped attribute holds
+        the number of non-blank lines that were skipped.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    aggregates = OperationAggregates()
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return aggregates
+        a, b, skipped = parse_pairs(chunk)
+        aggregates.skipped += skipped
+        aggregates.update_batch(a, b)
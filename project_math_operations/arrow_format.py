@@ -0,0 +1,494 @@
+# arrow_format.py
+# This module exports results as Apache Arrow IPC files, for analytics tools to read directly.
+
+# An Arrow IPC file (also known as Feather version 2) is self-describing: a schema names the
+# columns and their types, and every record batch after it holds a range of rows as contiguous
+# column buffers. pyarrow, pandas, Polars, DuckDB and other Arrow readers open it, and can
+# memory-map it instead of reading it. The columns are those of results.FIELDS:
+#
+#   a, b, sum, difference, product   float64
+#   quotient                         float64, null where the divisor was zero
+#   division_error                   bool
+#
+# Every ResultBatch is written as one record batch, straight from its array columns: the
+# numbers are never formatted as text. Only the division errors are converted, from the byte
+# per pair of ResultBatch to the bit per pair of Arrow, which is also the validity bitmap of
+# the quotients. Buffers are aligned to 64 bytes in the file.
+#
+# The metadata of the format is encoded with FlatBuffers; the few tables it needs are built
+# here with struct, so no Arrow library is needed to write or read these files.
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from itertools import islice
+from typing import BinaryIO, Iterator, Tuple
+
+from binary_format import (
+    DEFAULT_CHUNK_SIZE,
+    MappedColumns,
+    is_binary_file,
+    little_endian,
+)
+from compressed_io import open_input
+from results import FIELDS, ResultBatch
+from stream_operations import parse_pairs
+
+# The first and last bytes of an Arrow IPC file.
+ARROW_MAGIC = b"ARROW1"
+
+_ALIGNMENT = 64
+_CONTINUATION = b"\xff\xff\xff\xff"
+
+# Values of the Arrow format enums and unions used here.
+_METADATA_V5 = 4
+_HEADER_SCHEMA = 1
+_HEADER_RECORD_BATCH = 3
+_TYPE_FLOATING_POINT = 3
+_TYPE_BOOL = 6
+_PRECISION_DOUBLE = 2
+_ENDIANNESS = {"little": 0, "big": 1}
+
+# The FieldNode and Buffer structs of a record batch, and the Block struct of the footer.
+_FIELD_NODE = struct.Struct("<qq")
+_BUFFER = struct.Struct("<qq")
+_BLOCK = struct.Struct("<qi4xq")
+
+# Converts division errors to binary digits and back.
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_TO_VALID_DIGITS = bytes.maketrans(b"\x00\x01", b"10")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class _Table:
+    """
+    A FlatBuffers table to encode.
+
+    Args:
+        *fields (tuple): (slot, format, value) for every field set: format is a struct code
+            for scalars, or "offset" for a string, a _Vector or another _Table.
+    """
+
+    __slots__ = ("fields",)
+
+    def __init__(self, *fields):
+        self.fields = fields
+
+
+class _Vector:
+    """
+    A FlatBuffers vector to encode.
+
+    Args:
+        items (list): The _Table items, or tuples of the fields of struct items.
+        struct_ (struct.Struct, optional): The layout of struct items. Defaults to tables.
+    """
+
+    __slots__ = ("items", "struct")
+
+    def __init__(self, items, struct_=None):
+        self.items = items
+        self.struct = struct_
+
+
+def _pad(buffer: bytearray, alignment: int, extra: int = 0) -> None:
+    # Pads buffer so that len(buffer) + extra is a multiple of alignment.
+    buffer.extend(bytes(-(len(buffer) + extra) % alignment))
+
+
+def _place(buffer: bytearray, item, pending: deque) -> int:
+    """
+    Appends a table, vector or string to a FlatBuffers buffer.
+
+    Args:
+        buffer (bytearray): The buffer.
+        item (_Table, _Vector or str): What to append.
+        pending (deque): Receives (position, item) for every offset of the item that still
+            has to point to an item appended later.
+
+    Returns:
+        int: The position of the item in the buffer.
+    """
+    if isinstance(item, str):
+        data = item.encode("utf-8")
+        _pad(buffer, 4)
+        position = len(buffer)
+        buffer += struct.pack("<I", len(data)) + data + b"\0"
+        return position
+    if isinstance(item, _Vector):
+        if item.struct is None:
+            _pad(buffer, 4)
+            position = len(buffer)
+            buffer += struct.pack("<I", len(item.items))
+            for table in item.items:
+                pending.append((len(buffer), table))
+                buffer += bytes(4)
+            return position
+        # The structs used here hold 8-byte fields, so they start 8-byte aligned.
+        _pad(buffer, 8, 4)
+        position = len(buffer)
+        buffer += struct.pack("<I", len(item.items))
+        for fields in item.items:
+            buffer += item.struct.pack(*fields)
+        return position
+    # A table is its offset to its vtable followed by its fields, largest first, each aligned
+    # to its size. The vtable holds the sizes of both and the offset of every field.
+    layout = []
+    size = 4
+    for slot, format_, value in sorted(
+        item.fields,
+        key=lambda field: -(4 if field[1] == "offset" else struct.calcsize(field[1])),
+    ):
+        field_size = 4 if format_ == "offset" else struct.calcsize(format_)
+        size += -size % field_size
+        layout.append((slot, format_, value, size))
+        size += field_size
+    slots = max((field[0] for field in item.fields), default=-1) + 1
+    offsets = [0] * slots
+    for slot, _, _, offset in layout:
+        offsets[slot] = offset
+    _pad(buffer, 2)
+    vtable = len(buffer)
+    buffer += struct.pack(f"<HH{slots}H", 4 + 2 * slots, size, *offsets)
+    _pad(buffer, 8)
+    position = len(buffer)
+    buffer += bytes(size)
+    struct.pack_into("<i", buffer, position, position - vtable)
+    for slot, format_, value, offset in layout:
+        if format_ == "offset":
+            pending.append((position + offset, value))
+        else:
+            struct.pack_into("<" + format_, buffer, position + offset, value)
+    return position
+
+
+def _encode(root: _Table) -> bytes:
+    """
+    Encodes a table and everything it refers to as a FlatBuffers buffer.
+
+    Items are appended breadth first, so that every offset points forward as FlatBuffers
+    requires.
+
+    Args:
+        root (_Table): The root table.
+
+    Returns:
+        bytes: The buffer.
+    """
+    buffer = bytearray(4)
+    pending = deque([(0, root)])
+    while pending:
+        at, item = pending.popleft()
+        position = _place(buffer, item, pending)
+        struct.pack_into("<I", buffer, at, position - at)
+    return bytes(buffer)
+
+
+def _schema() -> _Table:
+    # The Schema table of the result columns, in the byte order of this host.
+    fields = []
+    for name in FIELDS:
+        if name == "division_error":
+            type_type, type_ = _TYPE_BOOL, _Table()
+        else:
+            type_type, type_ = _TYPE_FLOATING_POINT, _Table((0, "h", _PRECISION_DOUBLE))
+        fields.append(
+            _Table(
+                (0, "offset", name),
+                (1, "B", name == "quotient"),
+                (2, "B", type_type),
+                (3, "offset", type_),
+                (5, "offset", _Vector([])),
+            )
+        )
+    return _Table((0, "h", _ENDIANNESS[sys.byteorder]), (1, "offset", _Vector(fields)))
+
+
+def _message(header_type: int, header: _Table, body_length: int) -> bytes:
+    # Encodes a Message table holding a schema or a record batch.
+    return _encode(
+        _Table(
+            (0, "h", _METADATA_V5),
+            (1, "B", header_type),
+            (2, "offset", header),
+            (3, "q", body_length),
+        )
+    )
+
+
+def _pack_bits(flags, invert: bool = False) -> bytes:
+    """
+    Packs a byte per flag into an Arrow bitmap, where bit i (least significant first) is
+    flag i.
+
+    Args:
+        flags (bytearray): 1 or 0 per flag.
+        invert (bool): Whether to set the bits of the flags that are 0 instead.
+
+    Returns:
+        bytes: The bitmap.
+    """
+    digits = bytes(flags[::-1]).translate(_TO_VALID_DIGITS if invert else _TO_DIGITS)
+    return int(digits or b"0", 2).to_bytes((len(flags) + 7) // 8, "little")
+
+
+def _unpack_bits(bitmap, count: int) -> bytearray:
+    # The inverse of _pack_bits.
+    digits = format(int.from_bytes(bitmap, "little"), f"0{len(bitmap) * 8}b")
+    return bytearray(digits[::-1][:count].encode("ascii").translate(_FROM_DIGITS))
+
+
+class ArrowWriter:
+    """
+    Writes results to an Arrow IPC file, one record batch per ResultBatch.
+
+    The file is complete once the writer is closed. Use it as a context manager, or call
+    close.
+
+    Args:
+        stream (BinaryIO): The binary stream the file is written to. It is not closed with
+            the writer.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.rows = 0
+        self._position = 0
+        self._blocks = []
+        self._write(ARROW_MAGIC + b"\0\0")
+        self._write_message(_HEADER_SCHEMA, _schema(), 0)
+
+    def _write(self, data) -> None:
+        self.stream.write(data)
+        self._position += memoryview(data).nbytes
+
+    def _write_message(self, header_type: int, header: _Table, body_length: int) -> int:
+        # Writes the metadata of a message, padded so that its body is aligned.
+        metadata = _message(header_type, header, body_length)
+        padding = -(self._position + 8 + len(metadata)) % _ALIGNMENT
+        self._write(_CONTINUATION + struct.pack("<i", len(metadata) + padding))
+        self._write(metadata + bytes(padding))
+        return 8 + len(metadata) + padding
+
+    def write_results(self, results: ResultBatch) -> None:
+        """
+        Writes a batch of results as a record batch.
+
+        Args:
+            results (ResultBatch): Results computed with floats, whose numeric columns are
+                arrays or memoryviews of doubles.
+        """
+        rows = len(results)
+        errors = results.division_errors.count(1)
+        columns = results.columns()
+        buffers = []
+        for name, column in zip(FIELDS, columns):
+            if name == "division_error":
+                buffers += [b"", _pack_bits(column)]
+            elif name == "quotient" and errors:
+                buffers += [_pack_bits(columns[6], invert=True), column]
+            else:
+                buffers += [b"", column]
+        layout = []
+        offset = 0
+        for data in buffers:
+            size = memoryview(data).nbytes
+            layout.append((offset, size))
+            offset += size + -size % _ALIGNMENT
+        nodes = [(rows, errors if name == "quotient" else 0) for name in FIELDS]
+        block = self._position
+        metadata_length = self._write_message(
+            _HEADER_RECORD_BATCH,
+            _Table(
+                (0, "q", rows),
+                (1, "offset", _Vector(nodes, _FIELD_NODE)),
+                (2, "offset", _Vector(layout, _BUFFER)),
+            ),
+            offset,
+        )
+        for data in buffers:
+            size = memoryview(data).nbytes
+            if size:
+                self._write(data)
+            self._write(bytes(-size % _ALIGNMENT))
+        self._blocks.append((block, metadata_length, offset))
+        self.rows += rows
+
+    def close(self) -> None:
+        """
+        Writes the end of the stream and the footer indexing the record batches.
+        """
+        if self._blocks is None:
+            return
+        self._write(_CONTINUATION + bytes(4))
+        footer = _encode(
+            _Table(
+                (0, "h", _METADATA_V5),
+                (1, "offset", _schema()),
+                (2, "offset", _Vector([], _BLOCK)),
+                (3, "offset", _Vector(self._blocks, _BLOCK)),
+            )
+        )
+        self._write(footer + struct.pack("<i", len(footer)) + ARROW_MAGIC)
+        self._blocks = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def is_arrow_file(path: str) -> bool:
+    """
+    Checks whether a file starts with the magic bytes of an Arrow IPC file.
+
+    Args:
+        path (str): Path of the file to check.
+
+    Returns:
+        bool: True if the file is an Arrow IPC file.
+    """
+    with open(path, "rb") as f:
+        return f.read(len(ARROW_MAGIC)) == ARROW_MAGIC
+
+
+def _iter_operand_batches(
+    input_path: str, chunk_size: int
+) -> Iterator[Tuple[object, object, int]]:
+    # Yields (a, b, skipped) for every chunk of a text or binary operand file.
+    if is_binary_file(input_path):
+        with MappedColumns(input_path) as operands:
+            for start in range(0, operands.rows, chunk_size):
+                stop = min(start + chunk_size, operands.rows)
+                with operands.columns["a"][start:stop] as a, operands.columns["b"][
+                    start:stop
+                ] as b:
+                    yield little_endian(a), little_endian(b), 0
+        return
+    with open_input(input_path) as infile:
+        while True:
+            lines = list(islice(infile, chunk_size))
+            if not lines:
+                break
+            yield parse_pairs(lines)
+
+
+def export_file(
+    input_path: str, output_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[int, int]:
+    """
+    Evaluates every operand pair of a file and writes the results to an Arrow IPC file.
+
+    Args:
+        input_path (str): Path of a text file of operand pairs, which may be compressed, or
+            of a binary operand file (see binary_format).
+        output_path (str): Path of the Arrow IPC file to write.
+        chunk_size (int): The number of input lines or rows evaluated and written per
+            record batch.
+
+    Returns:
+        tuple (int, int): The number of pairs evaluated and the number of lines skipped.
+    """
+    skipped = 0
+    with open(output_path, "wb") as outfile, ArrowWriter(outfile) as writer:
+        for a, b, chunk_skipped in _iter_operand_batches(input_path, chunk_size):
+            skipped += chunk_skipped
+            if len(a):
+                writer.write_results(ResultBatch.compute(a, b))
+    return writer.rows, skipped
+
+
+def _table_fields(buffer, position: int) -> dict:
+    # The positions of the fields set in a FlatBuffers table, by slot.
+    vtable = position - struct.unpack_from("<i", buffer, position)[0]
+    vtable_size = struct.unpack_from("<H", buffer, vtable)[0]
+    fields = {}
+    for slot in range((vtable_size - 4) // 2):
+        offset = struct.unpack_from("<H", buffer, vtable + 4 + 2 * slot)[0]
+        if offset:
+            fields[slot] = position + offset
+    return fields
+
+
+def _follow(buffer, position: int) -> int:
+    # The position an offset points to.
+    return position + struct.unpack_from("<I", buffer, position)[0]
+
+
+def _vector(buffer, position: int) -> Tuple[int, int]:
+    # The length and the position of the first item of the vector an offset points to.
+    position = _follow(buffer, position)
+    return struct.unpack_from("<I", buffer, position)[0], position + 4
+
+
+def read_arrow(path: str) -> ResultBatch:
+    """
+    Reads the results of an Arrow IPC file written by ArrowWriter.
+
+    The file is memory-mapped and its columns are copied once into the arrays of the batch.
+    Null quotients are read as NaN, like in a ResultBatch.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        ResultBatch: The results of every record batch of the file, in order.
+
+    Raises:
+        ValueError: If the file is not an Arrow IPC file of results.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < 2 * len(ARROW_MAGIC) + 8:
+            raise ValueError(f"{path} is not an Arrow IPC file.")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _read_results(buffer, path)
+
+
+def _read_results(buffer, path: str) -> ResultBatch:
+    if buffer[: len(ARROW_MAGIC)] != ARROW_MAGIC or buffer[-len(ARROW_MAGIC) :] != (
+        ARROW_MAGIC
+    ):
+        raise ValueError(f"{path} is not an Arrow IPC file.")
+    (footer_length,) = struct.unpack_from("<i", buffer, len(buffer) - 10)
+    footer = len(buffer) - 10 - footer_length
+    fields = _table_fields(buffer, _follow(buffer, footer))
+    schema = _table_fields(buffer, _follow(buffer, fields[1]))
+    count, position = _vector(buffer, schema[1])
+    names = []
+    for i in range(count):
+        field = _table_fields(buffer, _follow(buffer, position + 4 * i))
+        length, start = _vector(buffer, field[0])
+        names.append(bytes(buffer[start : start + length]).decode("utf-8"))
+    if tuple(names) != FIELDS:
+        raise ValueError(f"{path} does not hold the columns {FIELDS}.")
+    endianness = struct.unpack_from("<h", buffer, schema[0])[0] if 0 in schema else 0
+    swap = endianness != _ENDIANNESS[sys.byteorder]
+    columns = [array("d") for _ in range(6)] + [bytearray()]
+    count, position = _vector(buffer, fields[3])
+    for i in range(count):
+        offset, metadata_length, _ = _BLOCK.unpack_from(
+            buffer, position + i * _BLOCK.size
+        )
+        message = _table_fields(buffer, _follow(buffer, offset + 8))
+        batch = _table_fields(buffer, _follow(buffer, message[2]))
+        (rows,) = struct.unpack_from("<q", buffer, batch[0])
+        _, buffers = _vector(buffer, batch[2])
+        body = offset + metadata_length
+        for j, column in enumerate(columns):
+            start, size = _BUFFER.unpack_from(
+                buffer, buffers + (2 * j + 1) * _BUFFER.size
+            )
+            data = buffer[body + start : body + start + size]
+            if j == 6:
+                column += _unpack_bits(data, rows)
+            else:
+                values = array("d")
+                values.frombytes(data)
+                if swap:
+                    values.byteswap()
+                column += values
+    return ResultBatch(*columns)
@@ -0,0 +1,313 @@
+# run_benchmarks.py
+# Performance suite for the hot paths of the project.
+
+# Every benchmark case measures one code path at several input sizes: per-call latency for the
+# scalar functions and bulk throughput for the batch, parsing and rendering paths. Results can be
+# saved as a JSON baseline, and a later run compared against it fails when any case got slower
+# than the baseline by more than a threshold.
+#
+# Run from the project_math_operations directory, for example:
+#   python -m benchmarks.run_benchmarks --sizes 1 1000 100000 --save baseline.json
+#   python -m benchmarks.run_benchmarks --sizes 1 1000 100000 --compare baseline.json
+
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+from itertools import cycle
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+import input_validation
+import main
+import math_operations
+import print_operations
+
+DEFAULT_SIZES = (1, 1000, 100000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25
+
+# A case prepares its inputs for a size and returns the function to time.
+# The timed function processes `size` items.
+CASES: Dict[str, Callable[[int], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """
+    Registers a benchmark case under a name.
+
+    Args:
+        name (str): The name of the case, e.g. "add/scalar".
+
+    Returns:
+        callable: A decorator that registers the setup function of the case.
+    """
+
+    def register(setup: Callable[[int], Callable[[], object]]):
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+def _operands(size: int):
+    rng = random.Random(size)
+    a = [rng.uniform(-1e6, 1e6) for _ in range(size)]
+    b = [rng.uniform(-1e3, 1e3) or 1.0 for _ in range(size)]
+    return a, b
+
+
+def _scalar_case(func):
+    def setup(size):
+        a, b = _operands(size)
+        return lambda: list(map(func, a, b))
+
+    return setup
+
+
+def _batch_case(func):
+    def setup(size):
+        a, b = _operands(size)
+        return lambda: func(a, b)
+
+    return setup
+
+
+for _name in ("add", "subtract", "multiply", "divide"):
+    benchmark(f"{_name}/scalar")(_scalar_case(getattr(math_operations, _name)))
+    benchmark(f"{_name}/batch")(_batch_case(getattr(math_operations, f"{_name}_batch")))
+
+
+def _tokens(size: int) -> List[str]:
+    a, _ = _operands(size)
+    # One malformed token in ten exercises the slow path of the validators.
+    return [repr(x) if i % 10 else "n/a" for i, x in enumerate(a)]
+
+
+@benchmark("validate_float/scalar")
+def _validate_float(size):
+    tokens = _tokens(size)
+    return lambda: list(map(input_validation.validate_float, tokens))
+
+
+@benchmark("validate_floats/bulk")
+def _validate_floats(size):
+    tokens = _tokens(size)
+    return lambda: input_validation.validate_floats(tokens)
+
+
+@benchmark("print_operations/scalar")
+def _print_operations(size):
+    a, b = _operands(size)
+
+    def run():
+        with redirect_stdout(io.StringIO()):
+            for x, y in zip(a, b):
+                print_operations.print_operations(x, y)
+
+    return run
+
+
+@benchmark("print_operations/writer")
+def _operations_writer(size):
+    a, b = _operands(size)
+
+    def run():
+        with print_operations.OperationsWriter(io.StringIO()) as writer:
+            writer.write_batch(a, b)
+
+    return run
+
+
+@benchmark("get_user_input/scalar")
+def _get_user_input(size):
+    a, b = _operands(size)
+    answers = [repr(x) for pair in zip(a, b) for x in pair]
+
+    def run():
+        with mock.patch("builtins.input", side_effect=cycle(answers)):
+            for _ in range(size):
+                main.get_user_input()
+
+    return run
+
+
+def measure(
+    setup: Callable[[int], Callable[[], object]], size: int, repeat: int
+) -> Dict[str, float]:
+    """
+    Times one case at one size, keeping the best of several runs.
+
+    Args:
+        setup (callable): The setup function of the case.
+        size (int): The number of items processed per run.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        dict: The best run time in seconds, the time per item in nanoseconds and the
+        throughput in items per second.
+    """
+    run = setup(size)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    best = max(best, 1e-9)
+    return {
+        "seconds": best,
+        "ns_per_item": best * 1e9 / size,
+        "items_per_second": size / best,
+    }
+
+
+def run_suite(
+    sizes=DEFAULT_SIZES, repeat: int = DEFAULT_REPEAT, only: Optional[str] = None
+) -> Dict[str, object]:
+    """
+    Runs every registered case, or the cases whose name contains only, at every size.
+
+    Args:
+        sizes (iterable of int): The input sizes.
+        repeat (int): The number of timed runs per case and size.
+        only (str, optional): A substring selecting the cases to run.
+
+    Returns:
+        dict: The environment of the run and, per case name and size, the measured timings.
+    """
+    results = {}
+    for name, setup in CASES.items():
+        if only and only not in name:
+            continue
+        results[name] = {str(size): measure(setup, size, repeat) for size in sizes}
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, object],
+    baseline: Dict[str, object],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[str]:
+    """
+    Compares a run against a baseline.
+
+    Args:
+        current (dict): The result of run_suite.
+        baseline (dict): A previously saved result of run_suite.
+        threshold (float): The allowed slowdown, as a fraction of the baseline time per item.
+
+    Returns:
+        list of str: One message per case and size that regressed past the threshold.
+    """
+    regressions = []
+    for name, by_size in current["results"].items():
+        for size, timing in by_size.items():
+            reference = baseline["results"].get(name, {}).get(size)
+            if reference is None:
+                continue
+            ratio = timing["ns_per_item"] / reference["ns_per_item"]
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{name} at size {size}: {timing['ns_per_item']:.1f} ns/item, "
+                    f"{ratio:.2f}x the baseline of {reference['ns_per_item']:.1f} ns/item"
+                )
+    return regressions
+
+
+def format_report(report: Dict[str, object]) -> str:
+    """
+    Formats the timings of a run as a table.
+
+    Args:
+        report (dict): The result of run_suite.
+
+    Returns:
+        str: One line per case and size.
+    """
+    lines = [f"{'case':<28}{'size':>12}{'ns/item':>14}{'items/s':>16}"]
+    for name, by_size in report["results"].items():
+        for size, timing in by_size.items():
+            lines.append(
+                f"{name:<28}{size:>12}{timing['ns_per_item']:>14.1f}"
+                f"{timing['items_per_second']:>16.0f}"
+            )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line arguments of the benchmark runner.
+
+    Args:
+        argv (list of str, optional): The arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="input sizes, from 1 up to 10**8 (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="timed runs per case, the best one is kept (default: %(default)s)",
+    )
+    parser.add_argument("--only", help="run only the cases whose name contains this")
+    parser.add_argument("--save", metavar="PATH", help="save the results as JSON")
+    parser.add_argument(
+        "--compare", metavar="PATH", help="compare against a saved JSON baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown against the baseline, e.g. 0.25 for 25%% (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    if min(args.sizes) < 1 or args.repeat < 1:
+        parser.error("--sizes and --repeat must be at least 1")
+    return args
+
+
+def run(argv=None) -> int:
+    """
+    Runs the benchmark suite from the command line.
+
+    Args:
+        argv (list of str, optional): The command line arguments.
+
+    Returns:
+        int: The exit status, 1 if a regression was found and 0 otherwise.
+    """
+    args = parse_args(argv)
+    report = run_suite(args.sizes, args.repeat, args.only)
+    print(format_report(report))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,152 @@
+# startup.py
+# Startup budget check for the command line entry point.
+
+# Every import is timed with "python -X importtime" in a fresh interpreter, and a module fails
+# the check when importing it takes longer than its budget or when it loads one of the heavy
+# modules that only some modes need (asyncio, multiprocessing, mmap, the profilers, ...).
+# The best of several runs is kept, since a single interpreter start is noisy.
+#
+# Run from the project_math_operations directory, for example:
+#   python -m benchmarks.startup
+#   python -m benchmarks.startup --budget main=20 --repeat 10
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Import time budgets in milliseconds, per module.
+DEFAULT_BUDGETS = {"math_operations": 10.0, "main": 20.0, "client": 15.0}
+DEFAULT_REPEAT = 5
+
+# Modules that must be imported lazily, by the modes that need them.
+HEAVY_MODULES = (
+    "argparse",
+    "asyncio",
+    "cProfile",
+    "json",
+    "mmap",
+    "multiprocessing",
+    "re",
+    "typing",
+)
+
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Imports a module in a fresh interpreter and reports the time spent on every import.
+
+    Args:
+        module (str): The name of the module to import.
+
+    Returns:
+        dict: The self and cumulative import times, in microseconds, of every module loaded
+        by the import, by module name.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIRECTORY,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def check_startup(
+    budgets: Dict[str, float] = DEFAULT_BUDGETS, repeat: int = DEFAULT_REPEAT
+) -> Tuple[Dict[str, float], List[str]]:
+    """
+    Checks the import time of every module against its budget.
+
+    Args:
+        budgets (dict): The budget in milliseconds, by module name.
+        repeat (int): The number of fresh interpreters each module is imported in.
+
+    Returns:
+        tuple (dict, list of str): The best import time in milliseconds by module name, and
+        one message per module that is over its budget or loads a heavy module.
+    """
+    best = {}
+    failures = []
+    for module, budget in budgets.items():
+        runs = [import_times(module) for _ in range(repeat)]
+        best[module] = min(times[module][1] for times in runs) / 1000
+        if best[module] > budget:
+            failures.append(
+                f"{module} takes {best[module]:.1f} ms to import, over its budget of {budget:.1f} ms"
+            )
+        heavy = sorted(set(runs[0]).intersection(HEAVY_MODULES))
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)} at startup")
+    return best, failures
+
+
+def parse_budget(text: str) -> Tuple[str, float]:
+    """
+    Parses a "module=milliseconds" budget given on the command line.
+
+    Args:
+        text (str): The budget text.
+
+    Returns:
+        tuple (str, float): The module name and its budget in milliseconds.
+
+    Raises:
+        argparse.ArgumentTypeError: If the text is not of the form module=milliseconds.
+    """
+    module, separator, budget = text.partition("=")
+    try:
+        return module, float(budget) if separator else DEFAULT_BUDGETS[module]
+    except (ValueError, KeyError):
+        raise argparse.ArgumentTypeError(
+            f"expected module=milliseconds, got {text!r}"
+        ) from None
+
+
+def run(argv=None) -> int:
+    """
+    Runs the startup budget check from the command line.
+
+    Args:
+        argv (list of str, optional): The command line arguments.
+
+    Returns:
+        int: The exit status, 1 if a module is over budget and 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Check the import time budgets.")
+    parser.add_argument(
+        "--budget",
+        type=parse_budget,
+        action="append",
+        metavar="MODULE=MS",
+        help="import time budget of a module in milliseconds (default: %s)"
+        % ", ".join(f"{m}={ms:g}" for m, ms in DEFAULT_BUDGETS.items()),
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="fresh interpreters per module, the best run is kept (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    budgets = dict(args.budget) if args.budget else DEFAULT_BUDGETS
+    best, failures = check_startup(budgets, max(args.repeat, 1))
+    for module, milliseconds in best.items():
+        print(f"{module:<20}{milliseconds:>8.1f} ms  (budget {budgets[module]:g} ms)")
+    for failure in failures:
+        print(f"OVER BUDGET {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,329 @@
+# binary_format.py
+# This module stores operand pairs and results in a compact binary file that can be memory-mapped.
+
+# A file is a header followed by contiguous little-endian float64 columns of equal length:
+#
+#   offset 0   magic b"MOPS", format version (uint16), column count (uint16), row count (uint64)
+#   offset 16  one 16-byte, NUL-padded ASCII name per column
+#   then       padding up to a multiple of 64 bytes, followed by the columns one after another
+#
+# Operand files hold the columns "a" and "b". Result files add "sum", "difference", "product",
+# "quotient" and "division_error" (1.0 where the divisor was zero, 0.0 otherwise).
+# Evaluating a mapped file runs the batch functions of math_operations directly over views of
+# the mapped columns, so the operands are never parsed or copied into Python lists.
+# The views of MappedColumns hold the little-endian floats of the file; code computing with
+# them passes them through little_endian, which returns them unchanged on little-endian hosts
+# and byte-swapped copies on big-endian hosts.
+
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from contextlib import ExitStack
+from itertools import islice
+from typing import Dict, Sequence, TextIO, Tuple
+
+from compressed_io import open_input
+from math_operations import add_batch, subtract_batch, multiply_batch, divide_batch
+from print_operations import OperationsWriter
+from stream_operations import parse_pairs
+
+MAGIC = b"MOPS"
+VERSION = 1
+OPERAND_COLUMNS = ("a", "b")
+RESULT_COLUMNS = OPERAND_COLUMNS + (
+    "sum",
+    "difference",
+    "product",
+    "quotient",
+    "division_error",
+)
+
+# Number of rows evaluated or converted at a time.
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_HEADER = struct.Struct("<4sHHQ")
+_NAME_SIZE = 16
+_ALIGNMENT = 64
+_ITEM_SIZE = 8
+
+
+def _data_offset(column_count: int) -> int:
+    """
+    Returns the offset of the first column in a file with the given number of columns.
+
+    Args:
+        column_count (int): The number of columns.
+
+    Returns:
+        int: The header size rounded up to a multiple of 64 bytes.
+    """
+    size = _HEADER.size + _NAME_SIZE * column_count
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _pack_header(names: Sequence[str], rows: int) -> bytes:
+    """
+    Builds the header of a file with the given columns and number of rows.
+
+    Args:
+        names (Sequence[str]): The column names, at most 16 ASCII characters each.
+        rows (int): The number of rows.
+
+    Returns:
+        bytes: The header, padded to the offset of the first column.
+    """
+    header = _HEADER.pack(MAGIC, VERSION, len(names), rows)
+    for name in names:
+        encoded = name.encode("ascii")
+        if len(encoded) > _NAME_SIZE:
+            raise ValueError(f"Column name {name!r} is longer than {_NAME_SIZE} bytes.")
+        header += encoded.ljust(_NAME_SIZE, b"\0")
+    return header.ljust(_data_offset(len(names)), b"\0")
+
+
+def little_endian(values: Sequence[float]) -> Sequence[float]:
+    """
+    Converts floats between the native byte order and the little-endian order of the files,
+    swapping a copy on big-endian hosts. The swap is its own inverse, so the same function
+    converts floats written in native order for a file and floats read from a mapped file.
+
+    Args:
+        values (Sequence[float]): An array('d') or a float memoryview.
+
+    Returns:
+        Sequence[float]: The values themselves on little-endian hosts, otherwise a
+        byte-swapped array('d') copy.
+    """
+    if sys.byteorder == "little":
+        return values
+    swapped = array("d", values)
+    swapped.byteswap()
+    return swapped
+
+
+def is_binary_file(path: str) -> bool:
+    """
+    Checks whether a file starts with the magic bytes of this format.
+
+    Args:
+        path (str): Path of the file to check.
+
+    Returns:
+        bool: True if the file is in this binary format.
+    """
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class MappedColumns:
+    """
+    A binary column file mapped into memory.
+
+    The columns attribute maps every column name to a float memoryview of the mapped file.
+    Slicing those views does not copy. Use the object as a context manager, or call close,
+    to release the views and unmap the file.
+
+    Args:
+        path (str): Path of the file to map.
+        writable (bool): Whether the columns can be written to. Defaults to False.
+
+    Raises:
+        ValueError: If the file is not in this binary format.
+    """
+
+    def __init__(self, path: str, writable: bool = False):
+        self.path = path
+        self._stack = ExitStack()
+        with open(path, "r+b" if writable else "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"{path} is too short to be a binary column file.")
+            magic, version, column_count, self.rows = _HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(
+                    f"{path} is not a version {VERSION} binary column file."
+                )
+            raw_names = f.read(_NAME_SIZE * column_count)
+            self.names = tuple(
+                raw_names[i : i + _NAME_SIZE].rstrip(b"\0").decode("ascii")
+                for i in range(0, len(raw_names), _NAME_SIZE)
+            )
+            offset = _data_offset(column_count)
+            size = offset + column_count * self.rows * _ITEM_SIZE
+            if os.fstat(f.fileno()).st_size < size:
+                raise ValueError(f"{path} is truncated.")
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self._mmap = mmap.mmap(f.fileno(), size, access=access)
+        self._stack.callback(self._mmap.close)
+        buf = self._stack.enter_context(memoryview(self._mmap))
+        self.columns: Dict[str, memoryview] = {}
+        for i, name in enumerate(self.names):
+            start = offset + i * self.rows * _ITEM_SIZE
+            raw = self._stack.enter_context(buf[start : start + self.rows * _ITEM_SIZE])
+            self.columns[name] = self._stack.enter_context(raw.cast("d"))
+
+    def close(self) -> None:
+        """
+        Releases the column views and unmaps the file.
+        """
+        self.columns = {}
+        self._stack.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def create_columns(path: str, names: Sequence[str], rows: int) -> MappedColumns:
+    """
+    Creates a binary column file of the given size, filled with zeros, and maps it for writing.
+
+    Args:
+        path (str): Path of the file to create.
+        names (Sequence[str]): The column names.
+        rows (int): The number of rows.
+
+    Returns:
+        MappedColumns: The writable mapping of the new file.
+    """
+    with open(path, "wb") as f:
+        f.write(_pack_header(names, rows))
+        f.truncate(_data_offset(len(names)) + len(names) * rows * _ITEM_SIZE)
+    return MappedColumns(path, writable=True)
+
+
+def write_operands(path: str, a: Sequence[float], b: Sequence[float]) -> None:
+    """
+    Writes two sequences of numbers to a binary operand file.
+
+    Args:
+        path (str): Path of the file to write.
+        a (Sequence[float]): The first numbers.
+        b (Sequence[float]): The second numbers.
+
+    Raises:
+        ValueError: If the sequences have different lengths.
+    """
+    if len(a) != len(b):
+        raise ValueError(
+            f"Operand sequences must have the same length ({len(a)} != {len(b)})."
+        )
+    with open(path, "wb") as f:
+        f.write(_pack_header(OPERAND_COLUMNS, len(a)))
+        little_endian(array("d", a)).tofile(f)
+        little_endian(array("d", b)).tofile(f)
+
+
+def convert_csv(
+    csv_path: str, binary_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[int, int]:
+    """
+    Converts a CSV or newline-delimited file of operand pairs to a binary operand file.
+
+    Lines are parsed with the same rules as the file mode of main.py, in chunks, so memory
+    use does not depend on the size of the input. The second column is staged in a
+    temporary file until the number of rows is known.
+
+    Args:
+        csv_path (str): Path of the text file of operand pairs, which may be gzip, bz2 or xz
+            compressed.
+        binary_path (str): Path of the binary operand file to write.
+        chunk_size (int): The number of lines parsed at a time.
+
+    Returns:
+        tuple (int, int): The number of pairs written and the number of lines skipped.
+    """
+    rows = skipped = 0
+    with open_input(csv_path) as infile, open(
+        binary_path, "wb"
+    ) as outfile, tempfile.TemporaryFile() as second_column:
+        outfile.write(_pack_header(OPERAND_COLUMNS, 0))
+        while True:
+            chunk = list(islice(infile, chunk_size))
+            if not chunk:
+                break
+            a, b, chunk_skipped = parse_pairs(chunk)
+            skipped += chunk_skipped
+            rows += len(a)
+            little_endian(a).tofile(outfile)
+            little_endian(b).tofile(second_column)
+        second_column.seek(0)
+        shutil.copyfileobj(second_column, outfile)
+        outfile.seek(0)
+        outfile.write(_pack_header(OPERAND_COLUMNS, rows))
+    return rows, skipped
+
+
+def evaluate_binary(
+    operand_path: str, result_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    Evaluates the four operations over a binary operand file and writes a binary result file.
+
+    Both files are memory-mapped. The batch functions read the operands straight from the
+    mapped columns and their results are stored straight into the mapped result columns.
+
+    Args:
+        operand_path (str): Path of the binary operand file.
+        result_path (str): Path of the binary result file to write.
+        chunk_size (int): The number of rows evaluated at a time.
+
+    Returns:
+        int: The number of rows evaluated.
+    """
+    with MappedColumns(operand_path) as operands, create_columns(
+        result_path, RESULT_COLUMNS, operands.rows
+    ) as results:
+        out = results.columns
+        out["a"][:] = operands.columns["a"]
+        out["b"][:] = operands.columns["b"]
+        for start in range(0, operands.rows, chunk_size):
+            stop = min(start + chunk_size, operands.rows)
+            with out["a"][start:stop] as mapped_a, out["b"][start:stop] as mapped_b:
+                # Big-endian hosts compute on swapped copies and swap the results back.
+                a, b = little_endian(mapped_a), little_endian(mapped_b)
+                out["sum"][start:stop] = little_endian(add_batch(a, b))
+                out["difference"][start:stop] = little_endian(subtract_batch(a, b))
+                out["product"][start:stop] = little_endian(multiply_batch(a, b))
+                quotients, zero_mask = divide_batch(a, b)
+                out["quotient"][start:stop] = little_endian(quotients)
+                out["division_error"][start:stop] = little_endian(
+                    array("d", list(zero_mask))
+                )
+        return operands.rows
+
+
+def render_binary(
+    operand_path: str,
+    outfile: TextIO,
+    fmt: str = "text",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Evaluates the four operations over a binary operand file and writes them as text.
+
+    Args:
+        operand_path (str): Path of the binary operand file.
+        outfile (TextIO): The stream the results are written to.
+        fmt (str): The output format, one of print_operations.FORMATS. Defaults to "text".
+        chunk_size (int): The number of rows evaluated at a time.
+
+    Returns:
+        int: The number of rows evaluated.
+    """
+    with MappedColumns(operand_path) as operands, OperationsWriter(
+        outfile, fmt
+    ) as writer:
+        for start in range(0, operands.rows, chunk_size):
+            stop = min(start + chunk_size, operands.rows)
+            with operands.columns["a"][start:stop] as a, operands.columns["b"][
+                start:stop
+            ] as b:
+                writer.write_batch(little_endian(a), little_endian(b))
+        return operands.rows
@@ -0,0 +1,264 @@
+# caching.py
+# This module memoizes the math operations for workloads that repeat the same operand pairs.
+
+# Results are kept in a bounded LRU cache that is safe to share across threads and counts hits,
+# misses and evictions. Cache keys keep the type and the exact bits of each operand, so 5 and 5.0
+# (whose results differ in type) and -0.0 and 0.0 (whose products differ in sign) never share an
+# entry. Calls that raise, such as a division by zero, are not cached.
+
+import math
+import threading
+from array import array
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Sequence, Tuple
+
+from math_operations import add, subtract, multiply, divide
+
+# Number of entries kept when no capacity is given.
+DEFAULT_CAPACITY = 65536
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    A thread-safe mapping that keeps the most recently used entries up to a fixed capacity.
+
+    Args:
+        capacity (int): The largest number of entries kept. Defaults to DEFAULT_CAPACITY.
+
+    Raises:
+        ValueError: If capacity is less than 1.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value stored for key and marks it as most recently used.
+
+        Args:
+            key (Hashable): The key to look up.
+            default (Any): The value returned when key is not cached.
+
+        Returns:
+            Any: The cached value, or default.
+        """
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (Hashable): The key to store the value under.
+            value (Any): The value to store.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The hits, misses, evictions, current size and capacity of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def operand_key(x: Any) -> Tuple[type, Hashable]:
+    """
+    Returns a cache key that tells apart operands that compare equal but behave differently.
+
+    Floats, and instances of float subclasses, are keyed by their exact hexadecimal form, so
+    -0.0 and 0.0 differ and every NaN maps to the same key. Decimals are keyed by their sign,
+    digits and exponent, so Decimal("-0") and Decimal("0"), or Decimal("1.0") and
+    Decimal("1"), differ too. Every key includes the operand type, so 5 and 5.0 differ.
+
+    Args:
+        x (Any): The operand.
+
+    Returns:
+        tuple: The operand type and a hashable value.
+    """
+    cls = type(x)
+    if cls is float or isinstance(x, float):
+        return cls, x.hex()
+    # Decimals, and other numbers with an exact tuple form, without importing decimal.
+    as_tuple = getattr(x, "as_tuple", None)
+    if as_tuple is not None:
+        return cls, as_tuple()
+    return cls, x
+
+
+def memoize(
+    func: Callable[[Any, Any], Any], cache: LRUCache = None, name: str = None
+) -> Callable[[Any, Any], Any]:
+    """
+    Wraps a two-operand function so that results for repeated operands come from a cache.
+
+    Args:
+        func (callable): The function to wrap, e.g. math_operations.divide.
+        cache (LRUCache, optional): The cache to use. Defaults to a new LRUCache. A cache can
+            be shared by several wrapped functions.
+        name (str, optional): The name that tells the functions sharing a cache apart.
+            Defaults to the name of func.
+
+    Returns:
+        callable: The wrapped function. Its cache attribute is the cache it uses.
+    """
+    cache = cache if cache is not None else LRUCache()
+    name = name or func.__name__
+
+    @wraps(func)
+    def wrapper(a, b):
+        key = (name, operand_key(a), operand_key(b))
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = func(a, b)
+            cache.put(key, result)
+        return result
+
+    wrapper.cache = cache
+    return wrapper
+
+
+class CachedOperations:
+    """
+    Memoized versions of add, subtract, multiply and divide, and of their batch versions,
+    all sharing one LRU cache.
+
+    Args:
+        capacity (int): The largest number of results kept. Defaults to DEFAULT_CAPACITY.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.cache = LRUCache(capacity)
+        self.add = memoize(add, self.cache)
+        self.subtract = memoize(subtract, self.cache)
+        self.multiply = memoize(multiply, self.cache)
+        self.divide = memoize(divide, self.cache)
+
+    def _batch(self, func: Callable[[Any, Any], Any], a, b) -> array:
+        # Applies a memoized scalar function to every pair of the two sequences.
+        if len(a) != len(b):
+            raise ValueError(
+                f"Operand sequences must have the same length ({len(a)} != {len(b)})."
+            )
+        return array("d", map(func, a, b))
+
+    def add_batch(self, a: Sequence[float], b: Sequence[float]) -> array:
+        """
+        Adds two sequences of numbers element by element, using cached results.
+
+        Args:
+            a (Sequence[float]): The first numbers.
+            b (Sequence[float]): The second numbers.
+
+        Returns:
+            array: The same result as math_operations.add_batch.
+        """
+        return self._batch(self.add, a, b)
+
+    def subtract_batch(self, a: Sequence[float], b: Sequence[float]) -> array:
+        """
+        Subtracts the second sequence from the first, using cached results.
+
+        Args:
+            a (Sequence[float]): The first numbers.
+            b (Sequence[float]): The second numbers.
+
+        Returns:
+            array: The same result as math_operations.subtract_batch.
+        """
+        return self._batch(self.subtract, a, b)
+
+    def multiply_batch(self, a: Sequence[float], b: Sequence[float]) -> array:
+        """
+        Multiplies two sequences of numbers element by element, using cached results.
+
+        Args:
+            a (Sequence[float]): The first numbers.
+            b (Sequence[float]): The second numbers.
+
+        Returns:
+            array: The same result as math_operations.multiply_batch.
+        """
+        return self._batch(self.multiply, a, b)
+
+    def divide_batch(
+        self, a: Sequence[float], b: Sequence[float], fill: float = math.nan
+    ) -> Tuple[array, bytearray]:
+        """
+        Divides the first sequence by the second, using cached results.
+
+        Args:
+            a (Sequence[float]): The first numbers.
+            b (Sequence[float]): The second numbers.
+            fill (float): The value stored for elements whose divisor is zero. Defaults to NaN.
+
+        Returns:
+            tuple (array, bytearray): The same result as math_operations.divide_batch.
+        """
+        if len(a) != len(b):
+            raise ValueError(
+                f"Operand sequences must have the same length ({len(a)} != {len(b)})."
+            )
+        zero_mask = bytearray(len(b))
+        quotients = array("d", bytes(8 * len(b)))
+        divide_cached = self.divide
+        for i, (x, y) in enumerate(zip(a, b)):
+            if y == 0:
+                quotients[i] = fill
+                zero_mask[i] = 1
+            else:
+                quotients[i] = divide_cached(x, y)
+        return quotients, zero_mask
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the counters of the shared cache.
+
+        Returns:
+            dict: The hits, misses, evictions, current size and capacity of the cache.
+        """
+        return self.cache.stats()
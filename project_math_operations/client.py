@@ -0,0 +1,285 @@
+# client.py
+# Thin client that prints the operations of two numbers computed by a long-lived daemon.
+
+# Starting main.py for every pair pays for a new interpreter and for importing the project on each
+# call. This client keeps that cost as low as possible: it prompts for the two numbers exactly like
+# main.py, or reads every pair from stdin without prompting when stdin is not a terminal, forwards
+# them as "print" requests over a Unix socket to a warm daemon running service.py (started with
+# "python main.py --serve PATH"), and prints the responses. The output is identical to what
+# main.py prints.
+#
+# Piped pairs are sent in batches over a single connection. If no daemon answers on the socket,
+# the client starts one in the background and retries. If the daemon still cannot be reached or
+# answers with an error, or the platform has no Unix sockets, the client computes the results
+# itself for the rest of the run, so a call never fails or waits again for lack of a daemon.
+#
+# Usage: python client.py [SOCKET]
+# The socket path defaults to the MATH_OPERATIONS_SOCKET environment variable, or to
+# math_operations-<uid>.sock in the temporary directory.
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+# The low-level _socket module is used because importing socket (and enum with it) takes longer
+# than the whole request to the daemon.
+import _socket
+
+from input_validation import get_validated_float_input, iter_validated_batches
+
+# For type checkers only, as in input_validation.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Sequence, Tuple
+
+# Windows has neither Unix sockets nor user ids; the client then always computes the result.
+UNIX_SOCKETS = hasattr(_socket, "AF_UNIX")
+
+# How long to wait for a newly started daemon to accept connections, in seconds.
+DAEMON_START_TIMEOUT = 5.0
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def default_socket() -> str:
+    """
+    Returns the Unix socket path of the daemon of the current user.
+
+    Returns:
+        str: The MATH_OPERATIONS_SOCKET environment variable, or math_operations-<uid>.sock
+        in the temporary directory.
+    """
+    address = os.environ.get("MATH_OPERATIONS_SOCKET")
+    if address:
+        return address
+    getuid = getattr(os, "getuid", None)
+    user = getuid() if getuid else os.environ.get("USERNAME", "user")
+    directory = os.environ.get("TMPDIR") or os.environ.get("TEMP") or "/tmp"
+    return os.path.join(directory, f"math_operations-{user}.sock")
+
+
+# Most pairs sent to the daemon before reading its responses. The responses of a batch fit in the
+# buffers of both ends, so neither waits for the other to read.
+PIPELINE_SIZE = 256
+
+
+class DaemonClient:
+    """
+    Sends "print" requests to the daemon over a single connection, computing the results itself
+    once the daemon turns out to be unavailable.
+
+    The daemon is started at most once per client: after it cannot be reached or answers with
+    an error, every later request is computed in this process without trying again.
+
+    Attributes:
+        address (str): The Unix socket path of the daemon.
+        available (bool): Whether the daemon is still used.
+    """
+
+    def __init__(self, address: str = None):
+        """
+        Initializes the client without connecting yet.
+
+        Args:
+            address (str, optional): The Unix socket path of the daemon. Defaults to
+                default_socket().
+        """
+        self.address = address or default_socket()
+        self.available = UNIX_SOCKETS
+        self._connection = None
+        self._buffer = b""
+        self._position = 0
+
+    def _connect(self):
+        if not UNIX_SOCKETS:
+            raise OSError("Unix sockets are not available on this platform.")
+        connection = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+        try:
+            connection.connect(self.address)
+        except OSError:
+            connection.close()
+            raise
+        return connection
+
+    def _connect_or_start(self):
+        # Starts a daemon if none answers and waits until it accepts connections.
+        try:
+            return self._connect()
+        except OSError:
+            start_daemon(self.address)
+        deadline = time.monotonic() + DAEMON_START_TIMEOUT
+        while True:
+            time.sleep(0.01)
+            try:
+                return self._connect()
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+
+    def _readline(self) -> bytes:
+        end = self._buffer.find(b"\n", self._position)
+        while end < 0:
+            data = self._connection.recv(65536)
+            if not data:
+                raise OSError("The daemon closed the connection.")
+            self._buffer = self._buffer[self._position :] + data
+            self._position = 0
+            end = self._buffer.find(b"\n")
+        line = self._buffer[self._position : end + 1]
+        self._position = end + 1
+        return line
+
+    def request(self, pairs: Sequence[Tuple[float, float]]) -> str:
+        """
+        Asks the daemon for the text print_operations prints for every pair, sending all the
+        requests before reading the responses.
+
+        Args:
+            pairs (sequence of tuple (float, float)): The pairs, at most about PIPELINE_SIZE.
+
+        Returns:
+            str: The four lines printed by print_operations for every pair, in order.
+
+        Raises:
+            OSError: If the daemon cannot be reached, or the platform has no Unix sockets.
+            RuntimeError: If the daemon answers with an error.
+        """
+        if self._connection is None:
+            self._connection = self._connect()
+        # repr gives the shortest text that converts back to exactly the same float.
+        requests = "".join(f"print {a!r} {b!r}\n" for a, b in pairs)
+        self._connection.sendall(requests.encode("utf-8"))
+        lines = []
+        for _ in pairs:
+            header = self._readline()
+            if header != b"ok 4\n":
+                raise RuntimeError(f"Unexpected response from the daemon: {header!r}")
+            lines.extend(self._readline() for _ in range(4))
+        return b"".join(lines).decode("utf-8")
+
+    def render(self, pairs: Sequence[Tuple[float, float]]) -> str:
+        """
+        Gives the text print_operations prints for every pair, from the daemon while it is
+        available and computed in this process otherwise.
+
+        Args:
+            pairs (sequence of tuple (float, float)): The pairs, at most about PIPELINE_SIZE.
+
+        Returns:
+            str: The four lines printed by print_operations for every pair, in order.
+        """
+        if self.available:
+            try:
+                if self._connection is None:
+                    self._connection = self._connect_or_start()
+                return self.request(pairs)
+            except (OSError, RuntimeError):
+                # Remember it, so that the rest of the run does not wait for the daemon again.
+                self.close()
+                self.available = False
+        from print_operations import render_pair
+
+        return "".join(render_pair(a, b) for a, b in pairs)
+
+    def close(self) -> None:
+        """
+        Closes the connection to the daemon, if any.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        self._buffer = b""
+        self._position = 0
+
+
+def request_print(a: float, b: float, address: str = None) -> str:
+    """
+    Asks the daemon for the text print_operations prints for two numbers.
+
+    Args:
+        a (float): The first number.
+        b (float): The second number.
+        address (str, optional): The Unix socket path of the daemon. Defaults to
+            default_socket().
+
+    Returns:
+        str: The four lines printed by print_operations(a, b).
+
+    Raises:
+        OSError: If the daemon cannot be reached, or the platform has no Unix sockets.
+        RuntimeError: If the daemon answers with an error.
+    """
+    daemon = DaemonClient(address)
+    try:
+        return daemon.request([(a, b)])
+    finally:
+        daemon.close()
+
+
+def start_daemon(address: str = None) -> None:
+    """
+    Starts a daemon serving on a Unix socket in the background.
+
+    Args:
+        address (str, optional): The Unix socket path the daemon serves on. Defaults to
+            default_socket().
+    """
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, MAIN_SCRIPT, "--serve", address or default_socket()],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def print_operations(a: float, b: float, address: str = None) -> None:
+    """
+    Prints the same text as print_operations.print_operations, computed by the daemon.
+
+    Args:
+        a (float): The first number.
+        b (float): The second number.
+        address (str, optional): The Unix socket path of the daemon. Defaults to
+            default_socket().
+    """
+    daemon = DaemonClient(address)
+    try:
+        print(daemon.render([(a, b)]), end="")
+    finally:
+        daemon.close()
+
+
+def print_piped_operations(stream=None, address: str = None) -> None:
+    """
+    Prints the operations of every pair read from a non-interactive stream, like main.py does,
+    sending the pairs in batches over a single connection to the daemon.
+
+    Args:
+        stream (BinaryIO or TextIO, optional): The stream to read. Defaults to sys.stdin.
+        address (str, optional): The Unix socket path of the daemon. Defaults to
+            default_socket().
+    """
+    daemon = DaemonClient(address)
+    try:
+        for a, b in iter_validated_batches(stream):
+            pairs = list(zip(a, b))
+            for start in range(0, len(pairs), PIPELINE_SIZE):
+                print(daemon.render(pairs[start : start + PIPELINE_SIZE]), end="")
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    address = sys.argv[1] if len(sys.argv) > 1 else default_socket()
+    if not sys.stdin.isatty():
+        # Like main.py, evaluate every pair piped to the client without prompting.
+        print_piped_operations(address=address)
+        sys.exit()
+    a = get_validated_float_input("Enter the first number: ")
+    b = get_validated_float_input("Enter the second number: ")
+    print_operations(a, b, address)
@@ -0,0 +1,460 @@
+# compressed_io.py
+# This module reads and writes gzip, bz2 and xz compressed files as if they were plain files.
+
+# Compressed input is recognized by its first bytes, whatever its name, and decompressed by
+# background threads while the caller parses and computes; zlib, bz2 and lzma release the GIL
+# while they work, so decompression and evaluation overlap. A file made of several independently
+# compressed members (written by pigz, bgzip, pbzip2, or by concatenating compressed files) is
+# decompressed a member at a time by a pool of threads, and the members are put back in order.
+# Member starts are found by scanning for the header of the format; a match that turns out to be
+# inside the data of a member is merged with that member. Files with a single member, or with
+# members too large to hold in memory, are decompressed in one background thread.
+#
+# Output whose name ends with .gz, .bz2 or .xz is compressed by a background thread as well.
+
+import bz2
+import io
+import lzma
+import mmap
+import os
+import queue
+import re
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, List, Optional, Tuple
+
+# Names of the supported compressions.
+COMPRESSIONS = ("gzip", "bz2", "xz")
+
+# The first bytes of a compressed file, by compression.
+MAGIC = {"gzip": b"\x1f\x8b", "bz2": b"BZh", "xz": b"\xfd7zXZ\x00"}
+
+# Compression of output files, by file name extension.
+EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+# Where a member may start: the gzip header with the deflate method, the bz2 stream header with
+# the magic of its first block, and the xz stream header.
+_MEMBER_START = {
+    "gzip": re.compile(rb"\x1f\x8b\x08"),
+    "bz2": re.compile(rb"BZh[1-9]1AY&SY"),
+    "xz": re.compile(rb"\xfd7zXZ\x00"),
+}
+
+# Compressed bytes read at a time by the single-thread decompressor.
+READ_SIZE = 1 << 20
+
+# Members are decompressed in parallel only when they are this small on average, since every
+# member in flight is held in memory.
+PARALLEL_MEMBER_LIMIT = 16 << 20
+
+# Decompressed blocks waiting for the reader, and blocks waiting for the compressor.
+QUEUE_BLOCKS = 16
+
+# Buffer size of the files opened by open_input and open_output.
+IO_BUFFER_SIZE = 1 << 20
+
+_END = object()
+
+
+def detect_compression(header: bytes) -> Optional[str]:
+    """
+    Recognizes a compressed stream by its first bytes.
+
+    Args:
+        header (bytes): The first bytes of the stream, at least 6 of them if available.
+
+    Returns:
+        str or None: The compression, one of COMPRESSIONS, or None if the stream is not
+        compressed.
+    """
+    for compression, magic in MAGIC.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def compression_from_extension(path: str) -> Optional[str]:
+    """
+    Returns the compression of an output file given by its name.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        str or None: The compression, one of COMPRESSIONS, or None for a plain file.
+    """
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def _new_decompressor(compression: str):
+    # Decompressor of a single member: zlib for gzip, with the gzip header and trailer.
+    if compression == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if compression == "bz2":
+        return bz2.BZ2Decompressor()
+    return lzma.LZMADecompressor(lzma.FORMAT_XZ)
+
+
+def _new_compressor(compression: str, level: Optional[int]):
+    if compression == "gzip":
+        return zlib.compressobj(
+            6 if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+    if compression == "bz2":
+        return bz2.BZ2Compressor(9 if level is None else level)
+    return lzma.LZMACompressor(lzma.FORMAT_XZ, preset=level)
+
+
+def _decompress_members(compression: str, data: bytes) -> Tuple[bytes, bool]:
+    """
+    Decompresses every member held in a range of compressed bytes.
+
+    Args:
+        compression (str): One of COMPRESSIONS.
+        data (bytes): Compressed bytes starting at the start of a member.
+
+    Returns:
+        tuple (bytes, bool): The decompressed bytes, and whether the last member ends in the
+        range. It does not when the next member start found by the scan was a false match.
+    """
+    parts = []
+    while data:
+        decompressor = _new_decompressor(compression)
+        parts.append(decompressor.decompress(data))
+        if not decompressor.eof:
+            return b"".join(parts), False
+        # Members may be followed by zero padding.
+        data = decompressor.unused_data.lstrip(b"\0")
+    return b"".join(parts), True
+
+
+class _QueueReader(io.RawIOBase):
+    """
+    A raw binary stream reading the blocks that a background thread puts in a queue.
+
+    Args:
+        producer (callable): Called in the background thread with a put function, it puts
+            every block of the stream in order and returns at its end.
+    """
+
+    def __init__(self, producer: Callable[[Callable[[bytes], None]], None]):
+        self._queue = queue.Queue(QUEUE_BLOCKS)
+        self._stopped = threading.Event()
+        self._block = memoryview(b"")
+        self._done = False
+        self._thread = threading.Thread(
+            target=self._run, args=(producer,), name="decompressor", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item) -> None:
+        # Waits for room in the queue, unless the reader was closed in the meantime.
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+        raise _Stopped()
+
+    def _run(self, producer) -> None:
+        try:
+            producer(self._put)
+            self._put(_END)
+        except _Stopped:
+            pass
+        except BaseException as error:
+            try:
+                self._put(error)
+            except _Stopped:
+                pass
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._block and not self._done:
+            item = self._queue.get()
+            if item is _END:
+                self._done = True
+            elif isinstance(item, BaseException):
+                self._done = True
+                raise item
+            else:
+                self._block = memoryview(item)
+        n = min(len(buffer), len(self._block))
+        buffer[:n] = self._block[:n]
+        self._block = self._block[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stopped.set()
+            self._thread.join()
+        super().close()
+
+
+class _Stopped(Exception):
+    # Raised in the background thread when the reader is closed before the end of the stream.
+    pass
+
+
+def _decompress_sequential(
+    fileobj: BinaryIO, compression: str, put: Callable[[bytes], None]
+) -> None:
+    """
+    Decompresses every member of a stream in order, a block of compressed bytes at a time.
+
+    Args:
+        fileobj (BinaryIO): The compressed stream.
+        compression (str): One of COMPRESSIONS.
+        put (callable): Receives every block of decompressed bytes.
+
+    Raises:
+        EOFError: If the stream ends inside a member.
+    """
+    decompressor = None
+    for chunk in iter(lambda: fileobj.read(READ_SIZE), b""):
+        while chunk:
+            if decompressor is None:
+                # Members may be followed by zero padding.
+                chunk = chunk.lstrip(b"\0")
+                if not chunk:
+                    break
+                decompressor = _new_decompressor(compression)
+            data = decompressor.decompress(chunk)
+            if data:
+                put(data)
+            if decompressor.eof:
+                chunk = decompressor.unused_data
+                decompressor = None
+            else:
+                chunk = b""
+    if decompressor is not None:
+        raise EOFError(
+            "Compressed file ended before the end-of-stream marker was reached"
+        )
+
+
+def _member_offsets(buffer, compression: str) -> List[int]:
+    # Offsets where a member may start. The first member starts at offset 0.
+    return [match.start() for match in _MEMBER_START[compression].finditer(buffer)]
+
+
+def _decompress_parallel(
+    buffer,
+    compression: str,
+    offsets: List[int],
+    workers: int,
+    put: Callable[[bytes], None],
+) -> None:
+    """
+    Decompresses the members of a mapped compressed file in a pool of threads, in order.
+
+    Args:
+        buffer (mmap): The mapped compressed file.
+        compression (str): One of COMPRESSIONS.
+        offsets (list of int): The offsets where a member may start, starting with 0.
+        workers (int): The number of threads.
+        put (callable): Receives the decompressed bytes of the members, in order.
+
+    Raises:
+        EOFError: If the file ends inside a member.
+    """
+    bounds = list(zip(offsets, offsets[1:] + [len(buffer)]))
+    pending = deque()
+    submitted = 0
+    with ThreadPoolExecutor(workers, thread_name_prefix="decompressor") as pool:
+        i = 0
+        while i < len(bounds):
+            # At most two members per thread are in flight.
+            while submitted < len(bounds) and len(pending) < 2 * workers:
+                start, stop = bounds[submitted]
+                pending.append(
+                    pool.submit(_decompress_members, compression, buffer[start:stop])
+                )
+                submitted += 1
+            data, complete = pending.popleft().result()
+            j = i + 1
+            while not complete:
+                # The next start was a match inside this member: decompress through it.
+                if j == len(bounds):
+                    raise EOFError(
+                        "Compressed file ended before the end-of-stream marker was reached"
+                    )
+                if pending:
+                    pending.popleft().cancel()
+                else:
+                    submitted += 1
+                j += 1
+                data, complete = _decompress_members(
+                    compression, buffer[bounds[i][0] : bounds[j - 1][1]]
+                )
+            put(data)
+            i = j
+
+
+def _decompress_file(
+    path: str, compression: str, workers: int, put: Callable[[bytes], None]
+) -> None:
+    # Decompresses a file, in parallel when it has several members of reasonable size.
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if workers > 1 and size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                offsets = _member_offsets(buffer, compression)
+                if (
+                    len(offsets) > 1
+                    and offsets[0] == 0
+                    and size / len(offsets) <= PARALLEL_MEMBER_LIMIT
+                ):
+                    _decompress_parallel(
+                        buffer, compression, offsets, min(workers, len(offsets)), put
+                    )
+                    return
+        _decompress_sequential(f, compression, put)
+
+
+def decompressing_reader(fileobj: BinaryIO, compression: str) -> io.BufferedReader:
+    """
+    Returns a binary stream of the decompressed bytes of a compressed stream, e.g. stdin,
+    decompressed by a background thread.
+
+    Args:
+        fileobj (BinaryIO): The compressed stream.
+        compression (str): One of COMPRESSIONS.
+
+    Returns:
+        io.BufferedReader: The decompressed stream.
+    """
+    return io.BufferedReader(
+        _QueueReader(lambda put: _decompress_sequential(fileobj, compression, put)),
+        IO_BUFFER_SIZE,
+    )
+
+
+def open_input(
+    path: str, mode: str = "r", encoding: str = None, workers: Optional[int] = None
+):
+    """
+    Opens a file for reading, decompressing it in background threads if it is compressed.
+
+    Args:
+        path (str): The file path.
+        mode (str): "r" for text or "rb" for bytes. Defaults to "r".
+        encoding (str, optional): The encoding of text mode, like in open.
+        workers (int, optional): The number of threads decompressing members in parallel.
+            Defaults to the number of CPUs.
+
+    Returns:
+        file object: A text or binary stream of the decompressed content.
+
+    Raises:
+        ValueError: If mode is not "r" or "rb", or workers is less than 1.
+    """
+    if mode not in ("r", "rb"):
+        raise ValueError(f"mode must be 'r' or 'rb', not {mode!r}.")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    with open(path, "rb") as f:
+        compression = detect_compression(f.read(8))
+    if compression is None:
+        if mode == "rb":
+            return open(path, mode, buffering=IO_BUFFER_SIZE)
+        return open(path, mode, buffering=IO_BUFFER_SIZE, encoding=encoding)
+    stream = io.BufferedReader(
+        _QueueReader(lambda put: _decompress_file(path, compression, workers, put)),
+        IO_BUFFER_SIZE,
+    )
+    return stream if mode == "rb" else io.TextIOWrapper(stream, encoding=encoding)
+
+
+class _CompressingWriter(io.RawIOBase):
+    """
+    A raw binary stream whose bytes a background thread compresses and writes to a file.
+
+    Args:
+        fileobj (BinaryIO): The file the compressed bytes are written to. It is closed
+            with the stream.
+        compression (str): One of COMPRESSIONS.
+        level (int, optional): The compression level.
+    """
+
+    def __init__(self, fileobj: BinaryIO, compression: str, level: Optional[int]):
+        self._file = fileobj
+        self._compressor = _new_compressor(compression, level)
+        self._queue = queue.Queue(QUEUE_BLOCKS)
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, name="compressor", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is _END:
+                break
+            if self._error is None:
+                try:
+                    self._file.write(self._compressor.compress(data))
+                except BaseException as error:
+                    self._error = error
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._check()
+        self._queue.put(bytes(data))
+        return len(data)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self._queue.put(_END)
+            self._thread.join()
+            self._check()
+            self._file.write(self._compressor.flush())
+        finally:
+            self._file.close()
+            super().close()
+
+
+def open_output(
+    path: str, mode: str = "w", encoding: str = None, level: Optional[int] = None
+):
+    """
+    Opens a file for writing, compressing it in a background thread if its name ends with
+    .gz, .bz2 or .xz.
+
+    Args:
+        path (str): The file path.
+        mode (str): "w" for text or "wb" for bytes. Defaults to "w".
+        encoding (str, optional): The encoding of text mode, like in open.
+        level (int, optional): The compression level. Defaults to the default of the
+            compression module.
+
+    Returns:
+        file object: A text or binary stream.
+    """
+    if mode not in ("w", "wb"):
+        raise ValueError(f"mode must be 'w' or 'wb', not {mode!r}.")
+    compression = compression_from_extension(path)
+    if compression is None:
+        if mode == "wb":
+            return open(path, mode, buffering=IO_BUFFER_SIZE)
+        return open(path, mode, buffering=IO_BUFFER_SIZE, encoding=encoding)
+    stream = io.BufferedWriter(
+        _CompressingWriter(open(path, "wb"), compression, level), IO_BUFFER_SIZE
+    )
+    return stream if mode == "wb" else io.TextIOWrapper(stream, encoding=encoding)
@@ -0,0 +1,259 @@
+# concurrent_operations.py
+# This module evaluates the four math operations from many threads at once.
+
+# math_operations, results and the renderers of print_operations keep no shared mutable state, so
+# any number of threads can call them at the same time. Only output needs care:
+# print_operations.print_operations prints to sys.stdout unless it is given a file, so threads
+# printing through it interleave their lines and contend on one stream. ThreadSinks gives every
+# thread its own output stream instead, and OperationsWriter objects must likewise not be shared
+# between threads without a lock.
+#
+# evaluate_threaded and render_threaded split large operand sequences into shards that a thread
+# pool evaluates, and put the results back in the order of the operands. With the GIL, only one
+# thread runs Python code at a time, so this mostly helps threads that also wait on I/O; on a
+# free-threaded build (Python 3.13t and later, or "python -X gil=0") the shards run on all cores.
+# parallel_operations gives the same scaling with processes on builds that have a GIL.
+
+from __future__ import annotations
+
+import io
+import itertools
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from parallel_operations import SHARDS_PER_WORKER, shard_bounds
+from print_operations import FORMATS, OperationsWriter, print_operations, render_results
+from results import ResultBatch
+
+# For type checkers only, as in math_operations.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Dict, Iterator, Optional, Sequence, TextIO
+
+
+def gil_enabled() -> bool:
+    """
+    Tells whether the interpreter runs with the global interpreter lock.
+
+    Returns:
+        bool: False on a free-threaded build running without the GIL, True otherwise.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+class ThreadSinks:
+    """
+    Gives every thread its own output stream, so that threads printing results never
+    interleave their output or contend on a shared stream.
+
+    Args:
+        factory (callable): Creates the stream of a thread on its first use. Defaults to
+            io.StringIO.
+    """
+
+    def __init__(self, factory: Callable[[], TextIO] = io.StringIO):
+        self.factory = factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Streams are numbered in the order they are created: thread identifiers are reused
+        # once a thread exits, so they would let a later thread replace an earlier stream.
+        self._numbers = itertools.count()
+        self._streams: Dict[int, TextIO] = {}
+
+    def stream(self) -> TextIO:
+        """
+        Returns the stream of the calling thread, creating it on first use.
+
+        Returns:
+            TextIO: The stream of the calling thread.
+        """
+        try:
+            return self._local.stream
+        except AttributeError:
+            stream = self._local.stream = self.factory()
+            with self._lock:
+                self._streams[next(self._numbers)] = stream
+            return stream
+
+    def print_operations(self, a: float, b: float, backend=None) -> None:
+        """
+        Prints the results of the four operations on two numbers to the stream of the
+        calling thread, like print_operations.print_operations.
+
+        Args:
+            a (float): The first number.
+            b (float): The second number.
+            backend (NumericBackend, optional): The numeric backend computing the results.
+                Defaults to the float functions of math_operations.
+        """
+        print_operations(a, b, backend, file=self.stream())
+
+    def getvalues(self) -> Dict[int, str]:
+        """
+        Returns what every thread wrote to its io.StringIO stream.
+
+        Returns:
+            dict: The text written by every thread, numbered in the order the threads first
+            wrote.
+        """
+        with self._lock:
+            return {
+                number: stream.getvalue() for number, stream in self._streams.items()
+            }
+
+
+def _shards(n: int, workers: int, chunk_size: Optional[int]):
+    # Splits the operands like parallel_operations.evaluate_parallel does.
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    if chunk_size is None:
+        chunk_size = max(1, -(-n // (workers * SHARDS_PER_WORKER)))
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    return shard_bounds(n, chunk_size)
+
+
+def _map_in_pool(function: Callable[[int, int], object], bounds, workers: int):
+    # Runs function(start, stop) for every shard in a thread pool, yielding results in order.
+    with ThreadPoolExecutor(min(workers, len(bounds))) as pool:
+        yield from pool.map(lambda bound: function(*bound), bounds)
+
+
+def _map_shards(
+    function: Callable[[int, int], object],
+    n: int,
+    workers: Optional[int],
+    chunk_size: Optional[int],
+) -> Iterator:
+    # Runs function(start, stop) for every shard of n items, yielding results in order.
+    if workers is None:
+        workers = os.cpu_count() or 1
+    bounds = _shards(n, workers, chunk_size)
+    if len(bounds) <= 1 or workers == 1:
+        # Not worth starting threads for.
+        return map(lambda bound: function(*bound), bounds)
+    return _map_in_pool(function, bounds, workers)
+
+
+def evaluate_threaded(
+    a: Sequence[float],
+    b: Sequence[float],
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    backend=None,
+) -> ResultBatch:
+    """
+    Evaluates the four operations on two sequences of numbers in a pool of threads.
+
+    The results are the same as those of ResultBatch.compute, in the same order as the
+    operands.
+
+    Args:
+        a (Sequence[float]): The first numbers.
+        b (Sequence[float]): The second numbers.
+        workers (int, optional): The number of threads. Defaults to the number of CPUs.
+        chunk_size (int, optional): The number of pairs per shard. Defaults to splitting the
+            operands into SHARDS_PER_WORKER shards per thread.
+        backend (NumericBackend, optional): The numeric backend computing the results.
+            Defaults to the batch functions of math_operations.
+
+    Returns:
+        ResultBatch: The results of every pair.
+
+    Raises:
+        ValueError: If the sequences have different lengths, or workers or chunk_size is less than 1.
+    """
+    if len(a) != len(b):
+        raise ValueError(
+            f"Operand sequences must have the same length ({len(a)} != {len(b)})."
+        )
+    shards = list(
+        _map_shards(
+            lambda start, stop: ResultBatch.compute(
+                a[start:stop], b[start:stop], backend
+            ),
+            len(a),
+            workers,
+            chunk_size,
+        )
+    )
+    if not shards:
+        return ResultBatch.compute(a[:0], b[:0], backend)
+    columns = [column[:] for column in shards[0].columns()]
+    for shard in shards[1:]:
+        for column, part in zip(columns, shard.columns()):
+            column += part
+    return ResultBatch(*columns)
+
+
+def render_threaded(
+    a: Sequence[float],
+    b: Sequence[float],
+    fmt: str = "text",
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    backend=None,
+) -> Iterator[str]:
+    """
+    Evaluates and renders the four operations on two sequences of numbers in a pool of
+    threads.
+
+    Args:
+        a (Sequence[float]): The first numbers.
+        b (Sequence[float]): The second numbers.
+        fmt (str): One of print_operations.FORMATS. Defaults to "text".
+        workers (int, optional): The number of threads. Defaults to the number of CPUs.
+        chunk_size (int, optional): The number of pairs per shard.
+        backend (NumericBackend, optional): The numeric backend computing the results.
+
+    Returns:
+        Iterator[str]: The rendered results of every shard, without a header, in the order
+        of the operands.
+
+    Raises:
+        ValueError: If fmt is not a format, or the sequences have different lengths.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {FORMATS}.")
+    if len(a) != len(b):
+        raise ValueError(
+            f"Operand sequences must have the same length ({len(a)} != {len(b)})."
+        )
+    return _map_shards(
+        lambda start, stop: render_results(
+            ResultBatch.compute(a[start:stop], b[start:stop], backend), fmt, backend
+        ),
+        len(a),
+        workers,
+        chunk_size,
+    )
+
+
+def write_threaded(
+    stream: TextIO,
+    a: Sequence[float],
+    b: Sequence[float],
+    fmt: str = "text",
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    backend=None,
+) -> None:
+    """
+    Writes the results of two sequences of numbers, rendered in a pool of threads, to a
+    stream in the order of the operands. Only the calling thread writes to the stream.
+
+    Args:
+        stream (TextIO): The stream the results are written to.
+        a (Sequence[float]): The first numbers.
+        b (Sequence[float]): The second numbers.
+        fmt (str): One of print_operations.FORMATS. Defaults to "text".
+        workers (int, optional): The number of threads. Defaults to the number of CPUs.
+        chunk_size (int, optional): The number of pairs per shard.
+        backend (NumericBackend, optional): The numeric backend computing the results.
+    """
+    with OperationsWriter(stream, fmt, backend=backend) as writer:
+        for text in render_threaded(a, b, fmt, workers, chunk_size, backend):
+            writer.write_text(text)
@@ -0,0 +1,643 @@
+# differential.py
+# Differential testing harness that checks the fast paths against the scalar reference functions.
+
+# Every optimized path of the project (batch functions, result batches, caches, compiled
+# expressions, threads, processes, the service, binary files, incremental runs and the bulk
+# validators) must give exactly what the scalar functions give: add, subtract, multiply and
+# divide of math_operations, render_pair for rendered text, and validate_float for parsing.
+#
+# The harness generates operands that mix edge cases (signed zeros, infinities, NaNs, subnormals,
+# the largest floats) with random values of every magnitude and random bit patterns, runs every
+# registered implementation on them and reports each result that differs from the reference.
+# Floats are equal when they are both NaN, or compare equal and have the same sign, so 0.0 and
+# -0.0 are told apart. A zero divisor must be reported wherever divide raises ZeroDivisionError.
+#
+# Run from the project_math_operations directory, for example:
+#   python differential.py --size 100000 --seed 1
+# New implementations are registered with the register decorator.
+
+import argparse
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+from array import array
+from io import StringIO
+from itertools import product
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from input_validation import validate_float, validate_floats, validate_numbers
+from math_operations import (
+    add,
+    subtract,
+    multiply,
+    divide,
+    add_batch,
+    subtract_batch,
+    multiply_batch,
+    divide_batch,
+)
+from print_operations import FORMATS, render_batch, render_pair
+
+DEFAULT_SIZE = 20000
+DEFAULT_SEED = 0
+
+# Reported when an implementation differs from the reference in more places.
+MAX_MISMATCHES = 10
+
+# Operands every run starts with, paired with each other.
+EDGE_VALUES = (
+    0.0,
+    -0.0,
+    1.0,
+    -1.0,
+    0.5,
+    3.0,
+    1e-300,
+    -1e300,
+    5e-324,
+    -5e-324,
+    2.2250738585072014e-308,
+    1.7976931348623157e308,
+    -1.7976931348623157e308,
+    math.inf,
+    -math.inf,
+    math.nan,
+    -math.nan,
+    0.1,
+    2.0**53 + 1,
+    123456789.123,
+)
+
+# Strings every validator run starts with.
+EDGE_TOKENS = (
+    "5",
+    "-3.25",
+    ".5",
+    "5.",
+    "1e-3",
+    "+2E+10",
+    " 7 ",
+    "\t-0\n",
+    "1e400",
+    "-1e400",
+    "inf",
+    "-Infinity",
+    "nan",
+    "NaN",
+    "-nan",
+    "1_000",
+    "1__0",
+    "_1",
+    "0x10",
+    "1e",
+    "e5",
+    ".",
+    "-",
+    "+",
+    "",
+    " ",
+    "1 2",
+    "1,5",
+    "abc",
+    "١٢",
+    " 1.5",
+    "５",
+    "4.9e-324",
+    "2e-324",
+)
+
+# Registered implementations, by kind and name:
+# - "operations" take two arrays('d') and return the sums, differences, products, quotients
+#   and the zero-divisor mask, like parallel_operations.evaluate_parallel;
+# - "renderers" take two arrays('d') and a format and return the rendered text of every pair;
+# - "validators" take a list of strings and return the numbers and a validity mask.
+IMPLEMENTATIONS: Dict[str, Dict[str, Callable]] = {
+    "operations": {},
+    "renderers": {},
+    "validators": {},
+}
+
+
+def register(kind: str, name: str):
+    """
+    Registers an implementation checked by the harness.
+
+    Args:
+        kind (str): One of the keys of IMPLEMENTATIONS.
+        name (str): The name of the implementation, e.g. "math_operations.batch".
+
+    Returns:
+        callable: A decorator that registers the function.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        IMPLEMENTATIONS[kind][name] = function
+        return function
+
+    return decorator
+
+
+def same_float(x: float, y: float) -> bool:
+    """
+    Tells whether two floats are the same result: both NaN, or equal with the same sign.
+
+    Args:
+        x (float): The first float.
+        y (float): The second float.
+
+    Returns:
+        bool: True if the floats are the same result.
+    """
+    if x != x:
+        return y != y
+    return x == y and math.copysign(1.0, x) == math.copysign(1.0, y)
+
+
+def _random_float(rng: random.Random) -> float:
+    # A float of any magnitude and sign, a random bit pattern or a small integer.
+    kind = rng.random()
+    if kind < 0.4:
+        return rng.choice((-1.0, 1.0)) * 10.0 ** rng.uniform(-320.0, 308.0)
+    if kind < 0.6:
+        return struct.unpack("<d", rng.getrandbits(64).to_bytes(8, "little"))[0]
+    if kind < 0.8:
+        return float(rng.randint(-1000, 1000))
+    return rng.uniform(-1e6, 1e6)
+
+
+def generate_operands(
+    size: int = DEFAULT_SIZE, seed: int = DEFAULT_SEED
+) -> Tuple[array, array]:
+    """
+    Generates operand pairs: every pair of EDGE_VALUES, followed by random pairs.
+
+    Args:
+        size (int): The number of pairs, at least len(EDGE_VALUES) ** 2 are edge cases.
+        seed (int): The random seed.
+
+    Returns:
+        tuple (array, array): The first and the second numbers, as arrays('d').
+    """
+    rng = random.Random(seed)
+    pairs = list(product(EDGE_VALUES, repeat=2))[:size]
+    while len(pairs) < size:
+        a = _random_float(rng)
+        # Some divisors are zero, some pairs repeat an edge value.
+        b = rng.choice((0.0, -0.0, rng.choice(EDGE_VALUES), _random_float(rng)))
+        pairs.append((a, b) if rng.random() < 0.8 else (b, a))
+    return array("d", (a for a, _ in pairs)), array("d", (b for _, b in pairs))
+
+
+def generate_tokens(size: int = DEFAULT_SIZE, seed: int = DEFAULT_SEED) -> List[str]:
+    """
+    Generates strings to validate: EDGE_TOKENS, followed by random numbers and mutations.
+
+    Args:
+        size (int): The number of strings.
+        seed (int): The random seed.
+
+    Returns:
+        list of str: The strings, some valid numbers and some not.
+    """
+    rng = random.Random(seed)
+    tokens = list(EDGE_TOKENS[:size])
+    alphabet = "0123456789.eE+-_ xn,"
+    while len(tokens) < size:
+        token = rng.choice((repr, str, "{:.3e}".format, "{:f}".format))(
+            _random_float(rng)
+        )
+        if rng.random() < 0.3:
+            # Insert, replace or drop a character.
+            i = rng.randrange(len(token) + 1)
+            token = token[:i] + rng.choice(alphabet) + token[i + rng.randint(0, 1) :]
+        tokens.append(token)
+    return tokens
+
+
+def reference_operations(a: Sequence[float], b: Sequence[float]) -> List[tuple]:
+    """
+    Computes the reference results with the scalar functions of math_operations.
+
+    Args:
+        a (Sequence[float]): The first numbers.
+        b (Sequence[float]): The second numbers.
+
+    Returns:
+        list of tuple: The sum, difference, product and quotient of every pair, the
+        quotient being None where divide raises ZeroDivisionError.
+    """
+    results = []
+    for x, y in zip(a, b):
+        try:
+            quotient = divide(x, y)
+        except ZeroDivisionError:
+            quotient = None
+        results.append((add(x, y), subtract(x, y), multiply(x, y), quotient))
+    return results
+
+
+def _check_operations(name, function, a, b, reference) -> List[str]:
+    sums, differences, products, quotients, zero_mask = function(a, b)
+    mismatches = []
+    if (
+        not len(sums)
+        == len(differences)
+        == len(products)
+        == len(quotients)
+        == len(zero_mask)
+        == len(a)
+    ):
+        return [f"{name}: returned {len(sums)} results for {len(a)} pairs"]
+    columns = (sums, differences, products)
+    for i, expected in enumerate(reference):
+        actual = [column[i] for column in columns]
+        for field, x, y in zip(("sum", "difference", "product"), expected, actual):
+            if not same_float(x, y):
+                mismatches.append(
+                    f"{name}: {field} of ({a[i]!r}, {b[i]!r}) is {y!r}, expected {x!r}"
+                )
+        if expected[3] is None:
+            if not zero_mask[i]:
+                mismatches.append(
+                    f"{name}: ({a[i]!r}, {b[i]!r}) did not report the zero divisor"
+                )
+        elif zero_mask[i] or not same_float(expected[3], quotients[i]):
+            actual_quotient = "a zero divisor" if zero_mask[i] else repr(quotients[i])
+            mismatches.append(
+                f"{name}: quotient of ({a[i]!r}, {b[i]!r}) is {actual_quotient}, "
+                f"expected {expected[3]!r}"
+            )
+        if len(mismatches) >= MAX_MISMATCHES:
+            break
+    return mismatches
+
+
+def _check_renderer(name, function, a, b, fmt) -> List[str]:
+    expected = "".join(map(render_pair, a, b, [fmt] * len(a)))
+    actual = function(a, b, fmt)
+    if actual == expected:
+        return []
+    expected_lines = expected.splitlines()
+    actual_lines = actual.splitlines()
+    for i, (x, y) in enumerate(zip(expected_lines, actual_lines)):
+        if x != y:
+            return [f"{name} ({fmt}): line {i + 1} is {y!r}, expected {x!r}"]
+    return [
+        f"{name} ({fmt}): wrote {len(actual_lines)} lines, expected {len(expected_lines)}"
+    ]
+
+
+def _check_validator(name, function, tokens) -> List[str]:
+    values, valid = function(tokens)
+    mismatches = []
+    for i, token in enumerate(tokens):
+        is_valid, number = validate_float(token)
+        if bool(valid[i]) != is_valid:
+            mismatches.append(
+                f"{name}: {token!r} is {'valid' if valid[i] else 'invalid'}, expected "
+                f"{'valid' if is_valid else 'invalid'}"
+            )
+        elif is_valid and not same_float(number, values[i]):
+            mismatches.append(
+                f"{name}: {token!r} converts to {values[i]!r}, expected {number!r}"
+            )
+        if len(mismatches) >= MAX_MISMATCHES:
+            break
+    return mismatches
+
+
+def run_checks(
+    size: int = DEFAULT_SIZE,
+    seed: int = DEFAULT_SEED,
+    names: Optional[Sequence[str]] = None,
+) -> Dict[str, List[str]]:
+    """
+    Runs every registered implementation against the reference functions.
+
+    Args:
+        size (int): The number of operand pairs and of strings to validate.
+        seed (int): The random seed.
+        names (Sequence[str], optional): The implementations to run. Defaults to all.
+
+    Returns:
+        dict: The mismatches found, at most MAX_MISMATCHES per implementation and format,
+        by implementation name. An empty list means the implementation matches.
+    """
+    a, b = generate_operands(size, seed)
+    tokens = generate_tokens(size, seed)
+    reference = reference_operations(a, b)
+    report = {}
+    for kind, implementations in IMPLEMENTATIONS.items():
+        for name, function in implementations.items():
+            if names is not None and name not in names:
+                continue
+            if kind == "operations":
+                report[name] = _check_operations(name, function, a, b, reference)
+            elif kind == "renderers":
+                report[name] = [
+                    mismatch
+                    for fmt in FORMATS
+                    for mismatch in _check_renderer(name, function, a, b, fmt)
+                ]
+            else:
+                report[name] = _check_validator(name, function, tokens)
+    return report
+
+
+@register("operations", "math_operations.batch")
+def _batch(a, b):
+    quotients, zero_mask = divide_batch(a, b)
+    return (
+        add_batch(a, b),
+        subtract_batch(a, b),
+        multiply_batch(a, b),
+        quotients,
+        zero_mask,
+    )
+
+
+@register("operations", "results.ResultBatch")
+def _result_batch(a, b):
+    from results import ResultBatch
+
+    return ResultBatch.compute(a, b).columns()[2:]
+
+
+@register("operations", "numeric_backends.float")
+def _float_backend(a, b):
+    from numeric_backends import float_backend
+
+    backend = float_backend()
+    quotients, zero_mask = backend.divide_batch(a, b)
+    return (
+        backend.add_batch(a, b),
+        backend.subtract_batch(a, b),
+        backend.multiply_batch(a, b),
+        quotients,
+        zero_mask,
+    )
+
+
+@register("operations", "caching.CachedOperations")
+def _cached(a, b):
+    from caching import CachedOperations
+
+    # Evaluated twice, so the second pass reads every result from the cache.
+    operations = CachedOperations(capacity=4 * len(a) + 1)
+    for _ in range(2):
+        quotients, zero_mask = operations.divide_batch(a, b)
+        results = (
+            operations.add_batch(a, b),
+            operations.subtract_batch(a, b),
+            operations.multiply_batch(a, b),
+            quotients,
+            zero_mask,
+        )
+    return results
+
+
+@register("operations", "expressions.compiled")
+def _compiled(a, b):
+    from expressions import compile_expression
+
+    quotients, zero_mask = compile_expression("a / b").evaluate_batch(a, b)
+    return (
+        compile_expression("a + b").evaluate_batch(a, b)[0],
+        compile_expression("a - b").evaluate_batch(a, b)[0],
+        compile_expression("a * b").evaluate_batch(a, b)[0],
+        quotients,
+        zero_mask,
+    )
+
+
+@register("operations", "concurrent_operations.threaded")
+def _threaded(a, b):
+    from concurrent_operations import evaluate_threaded
+
+    return evaluate_threaded(a, b, workers=4, chunk_size=997).columns()[2:]
+
+
+@register("operations", "parallel_operations.processes")
+def _processes(a, b):
+    from parallel_operations import evaluate_parallel
+
+    return evaluate_parallel(a, b, workers=2)
+
+
+@register("operations", "binary_format.evaluate_binary")
+def _binary(a, b):
+    from binary_format import MappedColumns, evaluate_binary, write_operands
+
+    with tempfile.TemporaryDirectory() as directory:
+        operands = os.path.join(directory, "operands.bin")
+        results = os.path.join(directory, "results.bin")
+        write_operands(operands, a, b)
+        evaluate_binary(operands, results, chunk_size=1009)
+        with MappedColumns(results) as mapped:
+            columns = mapped.columns
+            return (
+                array("d", columns["sum"]),
+                array("d", columns["difference"]),
+                array("d", columns["product"]),
+                array("d", columns["quotient"]),
+                bytearray(map(int, columns["division_error"])),
+            )
+
+
+@register("operations", "arrow_format.ArrowWriter")
+def _arrow(a, b):
+    from arrow_format import ArrowWriter, read_arrow
+    from results import ResultBatch
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "results.arrow")
+        with open(path, "wb") as f, ArrowWriter(f) as writer:
+            for start in range(0, len(a), 1009):
+                stop = start + 1009
+                writer.write_results(ResultBatch.compute(a[start:stop], b[start:stop]))
+        return read_arrow(path).columns()[2:]
+
+
+@register("operations", "dispatcher.scalar")
+def _dispatched_scalar(a, b):
+    from dispatcher import Dispatcher
+
+    return Dispatcher(engine="scalar").evaluate(a, b).columns()[2:]
+
+
+@register("operations", "service.handle_requests")
+def _service(a, b):
+    from service import handle_requests
+
+    def responses(operation):
+        lines = [f"{operation} {x!r} {y!r}".encode() for x, y in zip(a, b)]
+        return handle_requests(lines).decode().splitlines()
+
+    def numbers(operation):
+        return array("d", (float(line[3:]) for line in responses(operation)))
+
+    divisions = responses("divide")
+    zero_mask = bytearray(line.startswith("error") for line in divisions)
+    quotients = array(
+        "d",
+        (
+            math.nan if zero else float(line[3:])
+            for line, zero in zip(divisions, zero_mask)
+        ),
+    )
+    return (
+        numbers("add"),
+        numbers("subtract"),
+        numbers("multiply"),
+        quotients,
+        zero_mask,
+    )
+
+
+@register("renderers", "print_operations.render_batch")
+def _render_batch(a, b, fmt):
+    return render_batch(a, b, fmt)
+
+
+@register("renderers", "stream_operations.evaluate_stream")
+def _stream(a, b, fmt):
+    from stream_operations import evaluate_stream
+
+    lines = StringIO("".join(f"{x!r},{y!r}\n" for x, y in zip(a, b)))
+    out = StringIO()
+    evaluate_stream(lines, out, chunk_size=1013, fmt=fmt)
+    return _strip_header(out.getvalue(), fmt)
+
+
+@register("renderers", "binary_format.render_binary")
+def _render_binary(a, b, fmt):
+    from binary_format import render_binary, write_operands
+
+    with tempfile.TemporaryDirectory() as directory:
+        operands = os.path.join(directory, "operands.bin")
+        write_operands(operands, a, b)
+        out = StringIO()
+        render_binary(operands, out, fmt, chunk_size=1019)
+    return _strip_header(out.getvalue(), fmt)
+
+
+@register("renderers", "incremental.evaluate_incremental")
+def _incremental(a, b, fmt):
+    from incremental import evaluate_incremental
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "pairs.csv")
+        output = os.path.join(directory, "results")
+        cache = os.path.join(directory, "cache")
+        lines = [f"{x!r},{y!r}\n" for x, y in zip(a, b)]
+        with open(source, "w") as f:
+            f.writelines(lines)
+        evaluate_incremental(source, output, cache, fmt, average_lines=64)
+        # Change one line, so the second run mixes cached and evaluated chunks.
+        lines[len(lines) // 2] = "1.0,2.0\n"
+        with open(source, "w") as f:
+            f.writelines(lines)
+        evaluate_incremental(source, output, cache, fmt, average_lines=64)
+        with open(source, "w") as f:
+            f.writelines(f"{x!r},{y!r}\n" for x, y in zip(a, b))
+        evaluate_incremental(source, output, cache, fmt, average_lines=64)
+        with open(output) as f:
+            return _strip_header(f.read(), fmt)
+
+
+@register("renderers", "concurrent_operations.render_threaded")
+def _render_threaded(a, b, fmt):
+    from concurrent_operations import render_threaded
+
+    return "".join(render_threaded(a, b, fmt, workers=4, chunk_size=997))
+
+
+def _strip_header(text: str, fmt: str) -> str:
+    # Removes the CSV header written by OperationsWriter.
+    if fmt == "csv":
+        from print_operations import CSV_HEADER
+
+        return text[len(CSV_HEADER) :] if text.startswith(CSV_HEADER) else text
+    return text
+
+
+@register("validators", "input_validation.validate_floats")
+def _validate_floats(tokens):
+    return validate_floats(tokens)
+
+
+@register("validators", "input_validation.validate_numbers")
+def _validate_numbers(tokens):
+    return validate_numbers(tokens, float)
+
+
+@register("validators", "input_validation.validate_floats (one by one)")
+def _validate_floats_single(tokens):
+    # Every token on its own, so each one takes the fast path when it can.
+    values, valid = array("d"), bytearray()
+    for token in tokens:
+        value, ok = validate_floats([token])
+        values += value
+        valid += ok
+    return values, valid
+
+
+def format_report(report: Dict[str, List[str]]) -> str:
+    """
+    Formats the result of run_checks as text.
+
+    Args:
+        report (dict): The mismatches by implementation name, as returned by run_checks.
+
+    Returns:
+        str: One line per implementation, followed by its mismatches.
+    """
+    lines = []
+    for name, mismatches in report.items():
+        lines.append(f"{'MISMATCH' if mismatches else 'ok':<10}{name}")
+        lines.extend(f"    {mismatch}" for mismatch in mismatches)
+    return "\n".join(lines) + "\n"
+
+
+def run(argv=None) -> int:
+    """
+    Runs the harness from the command line.
+
+    Args:
+        argv (list of str, optional): The command line arguments.
+
+    Returns:
+        int: The exit status, 1 if an implementation differs from the reference and 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        description="Check every fast path against the scalar reference functions."
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=DEFAULT_SIZE,
+        help="operand pairs and strings generated (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help="random seed (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="NAME",
+        help="check only this implementation; may be repeated",
+    )
+    args = parser.parse_args(argv)
+    report = run_checks(args.size, args.seed, args.only)
+    sys.stdout.write(format_report(report))
+    return 1 if any(report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
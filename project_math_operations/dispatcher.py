@@ -0,0 +1,646 @@
+# dispatcher.py
+# This module routes every evaluation to the engine that is fastest for it on this host.
+
+# The four operations can be evaluated by several engines, which all give the same results:
+#
+#   scalar      one call of add, subtract, multiply and divide per pair
+#   batch       the batch functions of math_operations (ResultBatch.compute)
+#   cached      the memoized batch functions of caching.CachedOperations
+#   threads     concurrent_operations.evaluate_threaded, only on free-threaded builds
+#   processes   parallel_operations.evaluate_parallel, only with several CPUs
+#
+# Which one is fastest depends on the host and on the request: the number of pairs, and for the
+# cache how often pairs repeat. calibrate times the engines on this host and fits every one to a
+# fixed cost plus a cost per pair; it also records the startup cost of a worker process and of a
+# worker thread, and the memory bandwidth, which the parallel engines spend copying operands and
+# results. The resulting profile is saved as JSON and reused until the host changes (Python
+# version, CPU count or GIL).
+#
+# A Dispatcher predicts the time of every available engine from the profile and runs the
+# cheapest. The engine can be forced with its engine argument or the MATH_OPERATIONS_ENGINE
+# environment variable, and the choices made are kept in its choices counter and last_choice.
+#
+# Run "python dispatcher.py calibrate" to (re)calibrate, "python dispatcher.py show" to print
+# the profile, and "python dispatcher.py explain N" to see the predictions for N pairs.
+
+from __future__ import annotations
+
+import math
+import os
+import sys
+import time
+from array import array
+from collections import Counter, namedtuple
+
+from engines import ENGINES
+from math_operations import add, subtract, multiply, divide
+from results import ResultBatch
+
+# For type checkers only, as in input_validation. The command line (argparse), profile files
+# (json), the cache (caching) and the host description (platform) are imported by the functions
+# using them, so that importing the dispatcher stays cheap.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Dict, Optional, Sequence
+
+    from caching import CachedOperations
+
+# Where profiles are saved when no path is given, unless MATH_OPERATIONS_PROFILE is set.
+DEFAULT_PROFILE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "math_operations", "engine_profile.json"
+)
+PROFILE_VERSION = 1
+
+# Bytes copied per pair by the process engine: the operands into shared memory, and the
+# four results and the division error out of it.
+PROCESS_BYTES_PER_PAIR = 2 * 8 + 4 * 8 + 1
+
+# Number of leading pairs sampled to estimate how often pairs repeat.
+REPEAT_SAMPLE = 2048
+
+# Pairs per run when timing an engine, and number of runs kept the best of.
+CALIBRATION_SIZES = (64, 8192)
+CALIBRATION_REPEAT = 5
+
+# The engine chosen for a request, the number of pairs, the estimated fraction of repeated
+# pairs, and the predicted seconds of every available engine.
+Choice = namedtuple("Choice", ["engine", "pairs", "repeated", "estimates"])
+
+
+def _scalar(a: Sequence[float], b: Sequence[float]) -> ResultBatch:
+    # One call of every scalar function per pair.
+    n = len(a)
+    sums, differences, products, quotients = (
+        array("d", bytes(8 * n)) for _ in range(4)
+    )
+    division_errors = bytearray(n)
+    for i, (x, y) in enumerate(zip(a, b)):
+        sums[i] = add(x, y)
+        differences[i] = subtract(x, y)
+        products[i] = multiply(x, y)
+        try:
+            quotients[i] = divide(x, y)
+        except ZeroDivisionError:
+            quotients[i] = math.nan
+            division_errors[i] = 1
+    return ResultBatch(a, b, sums, differences, products, quotients, division_errors)
+
+
+def _cached(operations: CachedOperations, a, b) -> ResultBatch:
+    quotients, division_errors = operations.divide_batch(a, b)
+    return ResultBatch(
+        a,
+        b,
+        operations.add_batch(a, b),
+        operations.subtract_batch(a, b),
+        operations.multiply_batch(a, b),
+        quotients,
+        division_errors,
+    )
+
+
+def _threads(a, b, workers: int) -> ResultBatch:
+    from concurrent_operations import evaluate_threaded
+
+    return evaluate_threaded(a, b, workers)
+
+
+def _processes(a, b, workers: int) -> ResultBatch:
+    from parallel_operations import evaluate_parallel
+
+    return ResultBatch(a, b, *evaluate_parallel(a, b, workers))
+
+
+def host_info() -> Dict[str, Any]:
+    """
+    Describes what a profile depends on: a profile of another host is not reused.
+
+    Returns:
+        dict: The Python implementation and version, the machine, the number of CPUs and
+        whether the GIL is enabled.
+    """
+    # Imported here, like the parallel engines, so that importing the dispatcher does not load
+    # multiprocessing.
+    import platform
+
+    from concurrent_operations import gil_enabled
+
+    return {
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "machine": platform.machine(),
+        "cpus": os.cpu_count() or 1,
+        "gil": gil_enabled(),
+    }
+
+
+def available_engines(host: Optional[Dict[str, Any]] = None) -> tuple:
+    """
+    Returns the engines that can be faster than batch on a host.
+
+    Args:
+        host (dict, optional): The description returned by host_info. Defaults to this host.
+
+    Returns:
+        tuple of str: The engines, in the order of ENGINES.
+    """
+    host = host or host_info()
+    return tuple(
+        engine
+        for engine in ENGINES
+        if not (engine == "threads" and (host["gil"] or host["cpus"] < 2))
+        and not (engine == "processes" and host["cpus"] < 2)
+    )
+
+
+def _best_time(function, repeat: int) -> float:
+    # The best of several timed calls, in seconds.
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _fit(small: float, large: float, sizes=CALIBRATION_SIZES) -> Dict[str, float]:
+    # The fixed cost and the cost per pair of a line through two timings.
+    per_pair = max((large - small) / (sizes[1] - sizes[0]), 0.0)
+    return {"fixed": max(small - per_pair * sizes[0], 0.0), "per_pair": per_pair}
+
+
+def _operands(n: int):
+    # n different pairs whose divisors are never zero.
+    a = array("d", (1.0 + i * 0.37 for i in range(n)))
+    b = array("d", (2.0 + i * 0.11 for i in range(n)))
+    return a, b
+
+
+def _worker_startup(workers: int) -> float:
+    # Seconds to start and stop a pool of worker processes, per worker.
+    from multiprocessing import Pool
+
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        pool.map(abs, range(workers), chunksize=1)
+    return (time.perf_counter() - start) / workers
+
+
+def _thread_startup(workers: int) -> float:
+    # Seconds to start and stop a pool of threads, per thread.
+    from concurrent.futures import ThreadPoolExecutor
+
+    def run():
+        with ThreadPoolExecutor(workers) as pool:
+            list(pool.map(abs, range(workers)))
+
+    return _best_time(run, CALIBRATION_REPEAT) / workers
+
+
+def _memory_bandwidth() -> float:
+    # Bytes per second copied from one buffer into another.
+    source = bytearray(16 << 20)
+    target = bytearray(len(source))
+    view = memoryview(target)
+
+    def run():
+        view[:] = source
+
+    return len(source) / max(_best_time(run, CALIBRATION_REPEAT), 1e-9)
+
+
+def calibrate(
+    sizes=CALIBRATION_SIZES, repeat: int = CALIBRATION_REPEAT
+) -> Dict[str, Any]:
+    """
+    Times the engines on this host and builds a profile.
+
+    Args:
+        sizes (tuple of int): The two numbers of pairs every engine is timed with.
+        repeat (int): The number of runs at each size, keeping the best.
+
+    Returns:
+        dict: The profile: the host, the fixed cost and cost per pair of every engine, the
+        startup costs, the memory bandwidth and the crossover sizes.
+    """
+    from caching import CachedOperations
+
+    host = host_info()
+    workers = host["cpus"]
+    timings = {"scalar": [], "batch": [], "cached_miss": [], "cached_hit": []}
+    for n in sizes:
+        a, b = _operands(n)
+        timings["scalar"].append(_best_time(lambda: _scalar(a, b), repeat))
+        timings["batch"].append(_best_time(lambda: ResultBatch.compute(a, b), repeat))
+        # A new cache per run for misses, a cache holding every pair for hits.
+        timings["cached_miss"].append(
+            _best_time(lambda: _cached(CachedOperations(4 * n), a, b), repeat)
+        )
+        operations = CachedOperations(4 * n)
+        _cached(operations, a, b)
+        timings["cached_hit"].append(
+            _best_time(lambda: _cached(operations, a, b), repeat)
+        )
+    miss, hit = _fit(*timings["cached_miss"], sizes), _fit(
+        *timings["cached_hit"], sizes
+    )
+    engines = {
+        "scalar": _fit(*timings["scalar"], sizes),
+        "batch": _fit(*timings["batch"], sizes),
+        "cached": {
+            "fixed": miss["fixed"],
+            "per_pair": miss["per_pair"],
+            "per_repeated_pair": hit["per_pair"],
+        },
+    }
+    profile = {
+        "version": PROFILE_VERSION,
+        "host": host,
+        "created": time.time(),
+        "workers": workers,
+        "engines": engines,
+        "memory_bandwidth": _memory_bandwidth(),
+        "worker_startup": None,
+        "thread_startup": None,
+    }
+    batch = engines["batch"]
+    if "processes" in available_engines(host):
+        profile["worker_startup"] = _worker_startup(workers)
+        engines["processes"] = {
+            "fixed": batch["fixed"] + profile["worker_startup"] * workers,
+            "per_pair": batch["per_pair"] / workers
+            + PROCESS_BYTES_PER_PAIR / profile["memory_bandwidth"],
+        }
+    if "threads" in available_engines(host):
+        profile["thread_startup"] = _thread_startup(workers)
+        engines["threads"] = {
+            "fixed": batch["fixed"] + profile["thread_startup"] * workers,
+            "per_pair": batch["per_pair"] / workers,
+        }
+    profile["crossovers"] = crossovers(profile)
+    return profile
+
+
+def estimate(
+    profile: Dict[str, Any], engine: str, n: int, repeated: float = 0.0
+) -> float:
+    """
+    Predicts the seconds an engine takes for a request.
+
+    Args:
+        profile (dict): A profile returned by calibrate.
+        engine (str): One of the engines of the profile.
+        n (int): The number of pairs.
+        repeated (float): The fraction of pairs that repeat an earlier pair.
+
+    Returns:
+        float: The predicted seconds.
+    """
+    model = profile["engines"][engine]
+    per_pair = model["per_pair"]
+    if engine == "cached":
+        per_pair += (model["per_repeated_pair"] - per_pair) * repeated
+    return model["fixed"] + per_pair * n
+
+
+def _crossover(
+    profile: Dict[str, Any], engine: str, other: str, repeated: float
+) -> Optional[int]:
+    # The number of pairs from which other is predicted faster than engine, if any.
+    for exponent in range(0, 31):
+        n = 1 << exponent
+        if estimate(profile, other, n, repeated) < estimate(
+            profile, engine, n, repeated
+        ):
+            # Refine between the previous power of two and this one.
+            low, high = n >> 1, n
+            while high - low > 1:
+                middle = (low + high) // 2
+                if estimate(profile, other, middle, repeated) < estimate(
+                    profile, engine, middle, repeated
+                ):
+                    high = middle
+                else:
+                    low = middle
+            return high
+    return None
+
+
+def crossovers(profile: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """
+    Computes the sizes where the fastest engine changes, from the models of a profile.
+
+    Args:
+        profile (dict): A profile returned by calibrate.
+
+    Returns:
+        dict: For "scalar->batch", the number of pairs from which batch beats scalar; for
+        "batch->threads" and "batch->processes", from which the parallel engine beats batch;
+        for "batch->cached", from which the cache beats batch when every pair repeats. None
+        when it never does.
+    """
+    engines = profile["engines"]
+    result = {"scalar->batch": _crossover(profile, "scalar", "batch", 0.0)}
+    if "cached" in engines:
+        result["batch->cached"] = _crossover(profile, "batch", "cached", 1.0)
+    for engine in ("threads", "processes"):
+        if engine in engines:
+            result[f"batch->{engine}"] = _crossover(profile, "batch", engine, 0.0)
+    return result
+
+
+def profile_path(path: Optional[str] = None) -> str:
+    """
+    Returns the path of the profile file.
+
+    Args:
+        path (str, optional): An explicit path.
+
+    Returns:
+        str: path, else the MATH_OPERATIONS_PROFILE environment variable, else
+        DEFAULT_PROFILE_PATH.
+    """
+    return path or os.environ.get("MATH_OPERATIONS_PROFILE") or DEFAULT_PROFILE_PATH
+
+
+def save_profile(profile: Dict[str, Any], path: Optional[str] = None) -> str:
+    """
+    Saves a profile as JSON, replacing the previous one atomically.
+
+    Args:
+        profile (dict): A profile returned by calibrate.
+        path (str, optional): The file. Defaults to profile_path().
+
+    Returns:
+        str: The path written.
+    """
+    import json
+
+    path = profile_path(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+        f.write("\n")
+    os.replace(temporary, path)
+    return path
+
+
+def load_profile(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Loads a saved profile, if it was calibrated on this host.
+
+    Args:
+        path (str, optional): The file. Defaults to profile_path().
+
+    Returns:
+        dict or None: The profile, or None if there is none, it cannot be read, or it was
+        calibrated on another host or by another version of this module.
+    """
+    import json
+
+    try:
+        with open(profile_path(path), encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(profile, dict)
+        or profile.get("version") != PROFILE_VERSION
+        or profile.get("host") != host_info()
+    ):
+        return None
+    return profile
+
+
+def get_profile(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Loads the profile of this host, calibrating and saving it first if there is none.
+
+    Args:
+        path (str, optional): The file. Defaults to profile_path().
+
+    Returns:
+        dict: The profile.
+    """
+    profile = load_profile(path)
+    if profile is None:
+        profile = calibrate()
+        try:
+            save_profile(profile, path)
+        except OSError:
+            # A read-only home still gets the routing, only not the saved calibration.
+            pass
+    return profile
+
+
+def repeated_fraction(a: Sequence[float], b: Sequence[float]) -> float:
+    """
+    Estimates how often pairs repeat from the leading pairs of a request.
+
+    Args:
+        a (Sequence[float]): The first numbers.
+        b (Sequence[float]): The second numbers.
+
+    Returns:
+        float: The fraction of the sampled pairs that repeat an earlier sampled pair.
+    """
+    n = min(len(a), REPEAT_SAMPLE)
+    if n == 0:
+        return 0.0
+    return 1.0 - len(set(zip(a[:n], b[:n]))) / n
+
+
+class Dispatcher:
+    """
+    Evaluates requests with the engine predicted to be fastest for them.
+
+    Args:
+        profile (dict, optional): A profile returned by calibrate. Defaults to the saved
+            profile of this host, calibrated on first use.
+        engine (str, optional): An engine that every request is forced to, overriding the
+            profile, or "auto" to choose per request. Defaults to the MATH_OPERATIONS_ENGINE
+            environment variable, or to choosing per request.
+        workers (int, optional): The number of threads or processes of the parallel engines.
+            Defaults to the number of CPUs of the profile.
+
+    Attributes:
+        choices (Counter): The number of requests evaluated by every engine.
+        last_choice (Choice or None): The choice made for the last request.
+
+    Raises:
+        ValueError: If engine is not one of ENGINES or "auto".
+    """
+
+    def __init__(
+        self,
+        profile: Optional[Dict[str, Any]] = None,
+        engine: Optional[str] = None,
+        workers: Optional[int] = None,
+    ):
+        if engine is None:
+            engine = os.environ.get("MATH_OPERATIONS_ENGINE") or None
+        if engine == "auto":
+            engine = None
+        if engine is not None and engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}.")
+        self.engine = engine
+        self._profile = profile
+        self.workers = workers
+        self.choices = Counter()
+        self.last_choice = None
+        self._operations = None
+
+    @property
+    def profile(self) -> Dict[str, Any]:
+        """
+        dict: The profile routing the requests, loaded or calibrated on first use.
+        """
+        if self._profile is None:
+            self._profile = get_profile()
+        return self._profile
+
+    def choose(self, a: Sequence[float], b: Sequence[float]) -> Choice:
+        """
+        Chooses the engine of a request without evaluating it.
+
+        Args:
+            a (Sequence[float]): The first numbers.
+            b (Sequence[float]): The second numbers.
+
+        Returns:
+            Choice: The engine, and the predictions it was chosen from.
+        """
+        n = len(a)
+        if self.engine is not None:
+            return Choice(self.engine, n, None, {})
+        engines = self.profile["engines"]
+        # Sampling costs about as much as evaluating a small request, and only the cache
+        # depends on it.
+        threshold = self.profile["crossovers"].get("batch->cached")
+        repeated = 0.0
+        if threshold is not None and n >= threshold:
+            repeated = repeated_fraction(a, b)
+        estimates = {
+            engine: estimate(self.profile, engine, n, repeated)
+            for engine in ENGINES
+            if engine in engines
+        }
+        return Choice(min(estimates, key=estimates.get), n, repeated, estimates)
+
+    def evaluate(self, a: Sequence[float], b: Sequence[float]) -> ResultBatch:
+        """
+        Evaluates the four operations on two sequences of numbers with the chosen engine.
+
+        Args:
+            a (Sequence[float]): The first numbers.
+            b (Sequence[float]): The second numbers.
+
+        Returns:
+            ResultBatch: The results of every pair, the same whichever engine computes them.
+
+        Raises:
+            ValueError: If the sequences have different lengths.
+        """
+        if len(a) != len(b):
+            raise ValueError(
+                f"Operand sequences must have the same length ({len(a)} != {len(b)})."
+            )
+        choice = self.last_choice = self.choose(a, b)
+        self.choices[choice.engine] += 1
+        engine = choice.engine
+        if engine == "batch":
+            return ResultBatch.compute(a, b)
+        if engine == "scalar":
+            return _scalar(a, b)
+        if engine == "cached":
+            # One cache for every request, so that pairs repeating across requests hit it.
+            if self._operations is None:
+                from caching import CachedOperations
+
+                self._operations = CachedOperations()
+            return _cached(self._operations, a, b)
+        # A forced engine does not need a profile, so none is calibrated for it.
+        workers = self.workers or (self._profile or {}).get("workers") or os.cpu_count()
+        workers = workers or 1
+        if engine == "threads":
+            return _threads(a, b, workers)
+        return _processes(a, b, workers)
+
+    def __call__(self, a: Sequence[float], b: Sequence[float]) -> ResultBatch:
+        return self.evaluate(a, b)
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """
+    Formats a profile for reading.
+
+    Args:
+        profile (dict): A profile returned by calibrate.
+
+    Returns:
+        str: One line per engine and per measurement.
+    """
+    import json
+
+    lines = [f"host: {json.dumps(profile['host'])}"]
+    for engine, model in profile["engines"].items():
+        line = f"{engine:<10} {model['fixed'] * 1e6:10.1f} us + {model['per_pair'] * 1e9:8.1f} ns/pair"
+        if "per_repeated_pair" in model:
+            line += f" ({model['per_repeated_pair'] * 1e9:.1f} ns/repeated pair)"
+        lines.append(line)
+    lines.append(f"memory bandwidth: {profile['memory_bandwidth'] / 1e9:.2f} GB/s")
+    for name in ("worker_startup", "thread_startup"):
+        if profile.get(name) is not None:
+            lines.append(
+                f"{name.replace('_', ' ')}: {profile[name] * 1e3:.2f} ms/worker"
+            )
+    for name, n in profile["crossovers"].items():
+        lines.append(f"crossover {name}: {'never' if n is None else f'{n} pairs'}")
+    return "\n".join(lines)
+
+
+def run(argv=None) -> int:
+    """
+    Calibrates, shows the profile, or explains the choice for a number of pairs.
+
+    Args:
+        argv (list of str, optional): The command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit status.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Calibrate and inspect the engine profile of this host."
+    )
+    parser.add_argument("command", choices=("calibrate", "show", "explain"))
+    parser.add_argument("pairs", nargs="?", type=int, default=65536)
+    parser.add_argument(
+        "--repeated",
+        type=float,
+        default=0.0,
+        help="fraction of repeated pairs for explain (default: %(default)s)",
+    )
+    parser.add_argument("--profile", help=f"profile file (default: {profile_path()})")
+    args = parser.parse_args(argv)
+    if args.command == "calibrate":
+        profile = calibrate()
+        print(f"Saved {save_profile(profile, args.profile)}")
+    else:
+        profile = get_profile(args.profile)
+    if args.command == "explain":
+        estimates = {
+            engine: estimate(profile, engine, args.pairs, args.repeated)
+            for engine in ENGINES
+            if engine in profile["engines"]
+        }
+        for engine, seconds in sorted(estimates.items(), key=lambda item: item[1]):
+            print(f"{engine:<10} {seconds * 1e3:10.3f} ms")
+        return 0
+    print(format_profile(profile))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
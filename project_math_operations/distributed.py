@@ -0,0 +1,433 @@
+# distributed.py
+# This module spreads the evaluation of a file of operand pairs over worker processes on other
+# machines, connected over TCP.
+
+# Workers are started with "python main.py --worker HOST:PORT" (or run_worker) on every machine.
+# The coordinator, "python main.py --input FILE --output FILE --workers HOST:PORT,HOST:PORT",
+# splits the input into shards of about DEFAULT_SHARD_BYTES bytes, each ending at the end of a
+# line, and sends them to the workers, which parse, evaluate and render them with the batch
+# functions exactly like the file mode of main.py. The coordinator writes the rendered shards in
+# input order as soon as every shard before them is written, so the output is byte for byte
+# the output of the file mode.
+#
+# Protocol, over one connection per worker, shards pipelined one at a time:
+#   request:   {"shard": i, "format": fmt, "length": n}\n followed by n bytes of input lines
+#   response:  {"shard": i, "pairs": p, "skipped": s, "length": m}\n followed by m bytes of
+#              rendered results (UTF-8), or {"shard": i, "error": message}\n
+#
+# A worker that cannot be reached, drops its connection or does not answer within the timeout
+# is no longer used, and its shard goes back to the other workers. A shard is given up after
+# DEFAULT_ATTEMPTS failures. The input is read as the workers take shards, and only the shards
+# in flight or waiting for an earlier shard are held in memory, at most WINDOW_PER_WORKER per
+# worker.
+
+import asyncio
+import heapq
+import io
+import json
+from collections import namedtuple
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, Sequence, TextIO, Tuple
+
+from compressed_io import open_input, open_output
+from print_operations import FORMATS, OperationsWriter, render_batch
+from stream_operations import DEFAULT_CHUNK_SIZE, parse_pairs
+
+# Input bytes per shard, rounded up to the end of a line.
+DEFAULT_SHARD_BYTES = 4 << 20
+
+# Failures of a shard after which the run fails.
+DEFAULT_ATTEMPTS = 3
+
+# Seconds to connect to a worker, or for a worker to answer a shard.
+DEFAULT_TIMEOUT = 300.0
+
+# Shards per worker that are sent or waiting to be written at any time.
+WINDOW_PER_WORKER = 2
+
+# The totals of a distributed run: pairs evaluated, lines skipped, shards, and shards that had
+# to be sent again after a worker failed.
+RunStats = namedtuple("RunStats", ["pairs", "skipped", "shards", "retried"])
+
+
+class WorkerError(RuntimeError):
+    """
+    Raised when a worker cannot evaluate a shard: sending it again would fail the same way.
+    """
+
+
+def split_address(address: str) -> Tuple[str, int]:
+    """
+    Splits a TCP address.
+
+    Args:
+        address (str): "host:port", or ":port" for 127.0.0.1.
+
+    Returns:
+        tuple (str, int): The host and the port.
+
+    Raises:
+        ValueError: If the address has no port.
+    """
+    host, separator, port = address.rpartition(":")
+    if not separator or not port.isdigit():
+        raise ValueError(f"Expected a host:port address, not {address!r}.")
+    return host or "127.0.0.1", int(port)
+
+
+def evaluate_shard(
+    data: bytes, fmt: str = "text", chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[int, int, str]:
+    """
+    Evaluates the operand pairs of a shard and renders their results, like the file mode.
+
+    Args:
+        data (bytes): Whole lines of operand pairs, in UTF-8.
+        fmt (str): One of print_operations.FORMATS. Defaults to "text".
+        chunk_size (int): The number of lines evaluated at a time.
+
+    Returns:
+        tuple (int, int, str): The number of pairs evaluated, the number of lines skipped,
+        and the rendered results, without a header.
+    """
+    # Read like the text file mode reads lines, with universal newlines.
+    lines = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+    pairs = skipped = 0
+    parts = []
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return pairs, skipped, "".join(parts)
+        a, b, chunk_skipped = parse_pairs(chunk)
+        skipped += chunk_skipped
+        if a:
+            parts.append(render_batch(a, b, fmt))
+            pairs += len(a)
+
+
+def iter_shards(
+    infile: BinaryIO, shard_bytes: int = DEFAULT_SHARD_BYTES
+) -> Iterator[bytes]:
+    """
+    Reads a stream in shards of whole lines.
+
+    Args:
+        infile (BinaryIO): The stream of operand lines.
+        shard_bytes (int): The size a shard is rounded up from, to the end of a line.
+
+    Yields:
+        bytes: The shards, in order. Together they are the whole stream.
+    """
+    if shard_bytes < 1:
+        raise ValueError("shard_bytes must be at least 1.")
+    while True:
+        data = infile.read(shard_bytes)
+        if not data:
+            return
+        if not data.endswith(b"\n"):
+            data += infile.readline()
+        yield data
+
+
+async def _serve_connection(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    # Evaluates the shards sent on one connection until the coordinator closes it.
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            request = json.loads(line)
+            data = await reader.readexactly(request["length"])
+            try:
+                if request.get("format") not in FORMATS:
+                    raise ValueError(f"unknown format {request.get('format')!r}")
+                pairs, skipped, text = evaluate_shard(data, request["format"])
+            except ValueError as error:
+                # Also raised for input that is not UTF-8; no worker could evaluate it.
+                response = {"shard": request["shard"], "error": str(error)}
+                payload = b""
+            else:
+                payload = text.encode("utf-8")
+                response = {
+                    "shard": request["shard"],
+                    "pairs": pairs,
+                    "skipped": skipped,
+                    "length": len(payload),
+                }
+            writer.write(json.dumps(response).encode("utf-8") + b"\n" + payload)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError, KeyError):
+        # A coordinator that went away, or a malformed request: drop the connection.
+        pass
+    finally:
+        writer.close()
+
+
+async def start_worker(address: str) -> asyncio.AbstractServer:
+    """
+    Starts a worker serving shards on a TCP address.
+
+    Args:
+        address (str): "host:port"; port 0 picks a free port.
+
+    Returns:
+        asyncio.AbstractServer: The running server.
+    """
+    host, port = split_address(address)
+    return await asyncio.start_server(_serve_connection, host, port)
+
+
+def run_worker(address: str) -> None:
+    """
+    Runs a worker on a TCP address until interrupted.
+
+    Args:
+        address (str): "host:port".
+    """
+
+    async def serve():
+        server = await start_worker(address)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+class _Coordinator:
+    """
+    Hands the shards of a stream to workers and writes their results in order.
+
+    Args:
+        shards (Iterator[bytes]): The shards, read as they are handed out.
+        writer (OperationsWriter): Receives the rendered shards in order.
+        fmt (str): One of print_operations.FORMATS.
+        workers (int): The number of workers.
+        attempts (int): The failures of a shard after which the run fails.
+        timeout (float): Seconds to connect, or for a worker to answer a shard.
+    """
+
+    def __init__(self, shards, writer, fmt, workers, attempts, timeout):
+        self.shards = shards
+        self.writer = writer
+        self.format = fmt
+        self.attempts = attempts
+        self.timeout = timeout
+        self.window = asyncio.Semaphore(WINDOW_PER_WORKER * workers)
+        self.changed = asyncio.Event()
+        self.done = asyncio.Event()
+        self.alive = workers
+        self.error = None
+        self.exhausted = False
+        self.count = 0
+        self.next_write = 0
+        self.data: Dict[int, bytes] = {}
+        self.results: Dict[int, str] = {}
+        self.failures: Dict[int, int] = {}
+        self.retries = []
+        self.pairs = self.skipped = 0
+
+    async def _next_shard(self) -> int:
+        # The lowest shard to send again, else the next shard of the input. Waits while
+        # every shard is in flight, since one may still fail.
+        while True:
+            if self.retries:
+                return heapq.heappop(self.retries)
+            if not self.exhausted:
+                data = next(self.shards, None)
+                if data is not None:
+                    self.data[self.count] = data
+                    self.count += 1
+                    return self.count - 1
+                self.exhausted = True
+                self._check_done()
+            self.changed.clear()
+            await self.changed.wait()
+
+    def _check_done(self) -> None:
+        if self.exhausted and self.next_write == self.count:
+            self.done.set()
+
+    def _fail(self, message: str) -> None:
+        if self.error is None:
+            self.error = message
+        self.done.set()
+
+    def _store(self, index: int, response: dict, text: str) -> None:
+        # Writes the shards that are next in order.
+        self.results[index] = text
+        self.pairs += response["pairs"]
+        self.skipped += response["skipped"]
+        while self.next_write in self.results:
+            self.writer.write_text(self.results.pop(self.next_write))
+            del self.data[self.next_write]
+            self.next_write += 1
+            self.window.release()
+        self._check_done()
+
+    async def _exchange(self, reader, writer, index: int) -> Tuple[dict, str]:
+        # Sends a shard to a worker and reads back its results.
+        data = self.data[index]
+        header = {"shard": index, "format": self.format, "length": len(data)}
+        writer.write(json.dumps(header).encode("utf-8") + b"\n" + data)
+        await writer.drain()
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("The worker closed the connection.")
+        response = json.loads(line)
+        if not isinstance(response, dict) or response.get("shard") != index:
+            raise ConnectionError("The worker answered another shard.")
+        if "error" in response:
+            raise WorkerError(f"Shard {index}: {response['error']}")
+        # Anything else listening on the address is treated like a failed worker.
+        if not all(
+            type(response.get(key)) is int and response[key] >= 0
+            for key in ("pairs", "skipped", "length")
+        ):
+            raise ConnectionError("The worker sent a malformed response.")
+        text = await reader.readexactly(response["length"])
+        return response, text.decode("utf-8")
+
+    async def run_worker(self, address: str) -> None:
+        """
+        Sends shards to one worker until the run is done or the worker fails.
+
+        Args:
+            address (str): The "host:port" address of the worker.
+        """
+        writer = None
+        index = None
+        try:
+            host, port = split_address(address)
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), self.timeout
+            )
+            while True:
+                await self.window.acquire()
+                index = await self._next_shard()
+                response, text = await asyncio.wait_for(
+                    self._exchange(reader, writer, index), self.timeout
+                )
+                self._store(index, response, text)
+                index = None
+        except WorkerError as error:
+            self._fail(str(error))
+        except (OSError, EOFError, ValueError, asyncio.TimeoutError) as error:
+            # The worker failed: its shard goes to another one.
+            if index is not None:
+                self.failures[index] = self.failures.get(index, 0) + 1
+                if self.failures[index] >= self.attempts:
+                    self._fail(
+                        f"Shard {index} failed {self.attempts} times; last on {address}: "
+                        f"{error or type(error).__name__}"
+                    )
+                heapq.heappush(self.retries, index)
+                self.window.release()
+                self.changed.set()
+        except Exception as error:
+            # Any other error ends the run rather than leaving it waiting for the shard.
+            self._fail(f"Shard {index} on {address}: {error!r}")
+        finally:
+            if writer is not None:
+                writer.close()
+            self.alive -= 1
+            if self.alive == 0 and not self.done.is_set():
+                self._fail("Every worker failed before the input was evaluated.")
+
+
+async def coordinate(
+    infile: BinaryIO,
+    outfile: TextIO,
+    addresses: Sequence[str],
+    fmt: str = "text",
+    shard_bytes: int = DEFAULT_SHARD_BYTES,
+    attempts: int = DEFAULT_ATTEMPTS,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> RunStats:
+    """
+    Evaluates a stream of operand lines on workers and writes the results in input order.
+
+    Args:
+        infile (BinaryIO): The stream of operand lines.
+        outfile (TextIO): The stream the results are written to.
+        addresses (Sequence[str]): The "host:port" addresses of the workers.
+        fmt (str): One of print_operations.FORMATS. Defaults to "text".
+        shard_bytes (int): The input bytes per shard, rounded up to the end of a line.
+        attempts (int): The failures of a shard after which the run fails.
+        timeout (float): Seconds to connect, or for a worker to answer a shard.
+
+    Returns:
+        RunStats: The pairs evaluated, the lines skipped, the shards, and the shards sent
+        again after a failure.
+
+    Raises:
+        ValueError: If fmt is not a format or there is no worker.
+        RuntimeError: If a shard failed attempts times or every worker failed.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {FORMATS}.")
+    if not addresses:
+        raise ValueError("At least one worker address is required.")
+    with OperationsWriter(outfile, fmt) as writer:
+        coordinator = _Coordinator(
+            iter_shards(infile, shard_bytes),
+            writer,
+            fmt,
+            len(addresses),
+            attempts,
+            timeout,
+        )
+        tasks = [
+            asyncio.create_task(coordinator.run_worker(address))
+            for address in addresses
+        ]
+        await coordinator.done.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if coordinator.error is not None:
+            raise RuntimeError(coordinator.error)
+    return RunStats(
+        coordinator.pairs,
+        coordinator.skipped,
+        coordinator.count,
+        sum(coordinator.failures.values()),
+    )
+
+
+def evaluate_distributed(
+    input_path: str,
+    output_path: str,
+    addresses: Sequence[str],
+    fmt: str = "text",
+    shard_bytes: int = DEFAULT_SHARD_BYTES,
+    attempts: int = DEFAULT_ATTEMPTS,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> RunStats:
+    """
+    Evaluates every operand pair of a file on workers and writes the results to another file,
+    like stream_operations.evaluate_file.
+
+    Args:
+        input_path (str): Path of the CSV or newline-delimited file of operand pairs, which
+            may be gzip, bz2 or xz compressed.
+        output_path (str): Path of the file the results are written to, compressed if its
+            name ends with .gz, .bz2 or .xz.
+        addresses (Sequence[str]): The "host:port" addresses of the workers.
+        fmt (str): One of print_operations.FORMATS. Defaults to "text".
+        shard_bytes (int): The input bytes per shard, rounded up to the end of a line.
+        attempts (int): The failures of a shard after which the run fails.
+        timeout (float): Seconds to connect, or for a worker to answer a shard.
+
+    Returns:
+        RunStats: The pairs evaluated, the lines skipped, the shards and the shards sent
+        again.
+    """
+    with open_input(input_path, "rb") as infile, open_output(output_path) as outfile:
+        return asyncio.run(
+            coordinate(infile, outfile, addresses, fmt, shard_bytes, attempts, timeout)
+        )
@@ -0,0 +1,8 @@
+# engines.py
+# This module names the engines the operations can be evaluated by (see dispatcher.py).
+
+# It holds nothing else, so that main.py can accept an engine on its command line without
+# importing the dispatcher and everything it uses.
+
+# Names of the engines, in the order they are preferred when predicted to be as fast.
+ENGINES = ("batch", "scalar", "cached", "threads", "processes")
@@ -0,0 +1,282 @@
+# expressions.py
+# This module compiles arithmetic expressions built from the four math operations.
+
+# An expression such as "(a + b) * (a - b) / b" is parsed once and turned into generated Python
+# code that evaluates the whole expression in a single pass:
+# - for scalars, one function call that applies add, subtract, multiply and divide semantics
+#   (including the ZeroDivisionError raised by math_operations.divide);
+# - for columns, one list comprehension over all rows that writes straight into the result
+#   array, without materializing an intermediate array per operation.
+#
+# Grammar:
+#   expression := term (("+" | "-") term)*
+#   term       := factor (("*" | "/") factor)*
+#   factor     := ("+" | "-") factor | NUMBER | NAME | "(" expression ")"
+
+import keyword
+import math
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+from math_operations import divide
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|(?P<name>[A-Za-z]\w*)|(?P<op>[-+*/()]))"
+)
+
+# Python operators emitted for the binary operations. Division is emitted separately because
+# scalars go through math_operations.divide.
+_OPERATORS = {"+": "+", "-": "-", "*": "*"}
+
+
+def _tokenize(text: str) -> List[Tuple[str, str, int]]:
+    """
+    Splits an expression into tokens.
+
+    Args:
+        text (str): The expression.
+
+    Returns:
+        list of tuple: The kind ("number", "name" or "op"), text and position of every token.
+
+    Raises:
+        ValueError: If the expression contains a character that is not part of the grammar.
+    """
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            position += len(text[position:]) - len(text[position:].lstrip())
+            raise ValueError(
+                f"Unexpected character {text[position]!r} at position {position}."
+            )
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind), match.start(kind)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent parser producing a tree of tuples:
+    ("number", value), ("name", name), ("negate", node) or (operator, left, right).
+    """
+
+    def __init__(self, text: str, variables: Sequence[str]):
+        self.text = text
+        self.variables = variables
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    def _peek(self):
+        if self.index < len(self.tokens):
+            return self.tokens[self.index]
+        return ("end", "", len(self.text))
+
+    def _error(self, message: str) -> ValueError:
+        kind, token, position = self._peek()
+        found = "end of expression" if kind == "end" else repr(token)
+        return ValueError(f"{message} at position {position}, found {found}.")
+
+    def parse(self):
+        node = self._expression()
+        if self._peek()[0] != "end":
+            raise self._error("Expected an operator")
+        return node
+
+    def _expression(self):
+        node = self._term()
+        while self._peek()[1] in ("+", "-") and self._peek()[0] == "op":
+            operator = self.tokens[self.index][1]
+            self.index += 1
+            node = (operator, node, self._term())
+        return node
+
+    def _term(self):
+        node = self._factor()
+        while self._peek()[1] in ("*", "/") and self._peek()[0] == "op":
+            operator = self.tokens[self.index][1]
+            self.index += 1
+            node = (operator, node, self._factor())
+        return node
+
+    def _factor(self):
+        kind, token, _ = self._peek()
+        if kind == "op" and token in ("+", "-"):
+            self.index += 1
+            operand = self._factor()
+            return operand if token == "+" else ("negate", operand)
+        if kind == "number":
+            self.index += 1
+            value = float(token) if any(c in token for c in ".eE") else int(token)
+            return ("number", value)
+        if kind == "name":
+            if token not in self.variables:
+                raise self._error(
+                    f"Unknown variable (expected one of {tuple(self.variables)})"
+                )
+            self.index += 1
+            return ("name", token)
+        if kind == "op" and token == "(":
+            self.index += 1
+            node = self._expression()
+            if self._peek()[1] != ")":
+                raise self._error("Expected ')'")
+            self.index += 1
+            return node
+        raise self._error("Expected a number, a variable or '('")
+
+
+def _generate(node, constants: Dict[str, object], scalar: bool) -> str:
+    """
+    Generates the Python source of an expression tree.
+
+    Args:
+        node (tuple): The expression tree returned by _Parser.parse.
+        constants (dict): Receives the numeric constants, which are referenced by name.
+        scalar (bool): Whether division goes through math_operations.divide (scalars) or
+            the "/" operator (columns, where a ZeroDivisionError is handled per row).
+
+    Returns:
+        str: A fully parenthesized Python expression.
+    """
+    kind = node[0]
+    if kind == "number":
+        name = f"_c{len(constants)}"
+        constants[name] = node[1]
+        return name
+    if kind == "name":
+        return node[1]
+    if kind == "negate":
+        return f"(-{_generate(node[1], constants, scalar)})"
+    left = _generate(node[1], constants, scalar)
+    right = _generate(node[2], constants, scalar)
+    if kind == "/":
+        return f"_divide({left}, {right})" if scalar else f"({left} / {right})"
+    return f"({left} {_OPERATORS[kind]} {right})"
+
+
+class CompiledExpression:
+    """
+    An arithmetic expression compiled into a scalar function and a fused column kernel.
+
+    Calling the object evaluates the expression on scalars. evaluate_batch evaluates it on
+    columns of numbers in one pass.
+
+    Attributes:
+        text (str): The source expression.
+        variables (tuple of str): The variable names, in the order arguments are passed.
+        source (str): The generated Python expression used for scalars.
+    """
+
+    def __init__(self, text: str, variables: Sequence[str] = ("a", "b")):
+        for name in variables:
+            if not re.fullmatch(r"[A-Za-z]\w*", name) or keyword.iskeyword(name):
+                raise ValueError(f"Invalid variable name {name!r}.")
+        self.text = text
+        self.variables = tuple(variables)
+        tree = _Parser(text, self.variables).parse()
+        constants: Dict[str, object] = {}
+        self.source = _generate(tree, constants, scalar=True)
+        column_source = _generate(tree, {}, scalar=False)
+        parameters = ", ".join(self.variables)
+        columns = ", ".join(f"_{name}" for name in self.variables)
+        namespace = dict(constants, _divide=divide)
+        exec(
+            f"def _scalar({parameters}):\n"
+            f"    return {self.source}\n"
+            f"def _rows({columns}):\n"
+            f"    return [{column_source} for {parameters}, in zip({columns})]\n"
+            f"def _row({parameters}):\n"
+            f"    return {column_source}\n",
+            namespace,
+        )
+        self._scalar = namespace["_scalar"]
+        self._rows = namespace["_rows"]
+        self._row = namespace["_row"]
+
+    def __call__(self, *values: float) -> float:
+        """
+        Evaluates the expression on scalars.
+
+        Args:
+            *values (float): One value per variable, in the order of variables.
+
+        Returns:
+            float: The value of the expression.
+
+        Raises:
+            ZeroDivisionError: If a divisor evaluates to zero.
+        """
+        return self._scalar(*values)
+
+    def evaluate_batch(
+        self, *columns: Sequence[float], fill: float = math.nan
+    ) -> Tuple[array, bytearray]:
+        """
+        Evaluates the expression on columns of numbers in a single pass.
+
+        Like divide_batch, a zero divisor does not raise: the row is set to fill and flagged
+        in the returned mask.
+
+        Args:
+            *columns (Sequence[float]): One column per variable, all of the same length.
+            fill (float): The value stored for rows where a divisor is zero. Defaults to NaN.
+
+        Returns:
+            tuple (array, bytearray): An array('d') of results and a mask holding 1 for every
+            row where a divisor was zero and 0 otherwise.
+
+        Raises:
+            ValueError: If the number or the lengths of the columns do not match.
+        """
+        if len(columns) != len(self.variables):
+            raise ValueError(
+                f"Expected {len(self.variables)} columns, got {len(columns)}."
+            )
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("Columns must have the same length.")
+        try:
+            results = array("d", self._rows(*columns))
+            return results, bytearray(len(results))
+        except ZeroDivisionError:
+            pass
+        # Slow path, only taken when some row divides by zero.
+        results = array("d")
+        zero_mask = bytearray()
+        row = self._row
+        for values in zip(*columns):
+            try:
+                results.append(row(*values))
+                zero_mask.append(0)
+            except ZeroDivisionError:
+                results.append(fill)
+                zero_mask.append(1)
+        return results, zero_mask
+
+    def __repr__(self):
+        return f"CompiledExpression({self.text!r}, variables={self.variables!r})"
+
+
+@lru_cache(maxsize=256)
+def compile_expression(
+    text: str, variables: Tuple[str, ...] = ("a", "b")
+) -> CompiledExpression:
+    """
+    Parses and compiles an expression, reusing the result for repeated calls.
+
+    Args:
+        text (str): The expression, built from numbers, variables, + - * / and parentheses.
+        variables (tuple of str): The variable names. Defaults to ("a", "b").
+
+    Returns:
+        CompiledExpression: The compiled expression.
+
+    Raises:
+        ValueError: If the expression is not valid.
+    """
+    return CompiledExpression(text, variables)
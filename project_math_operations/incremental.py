@@ -0,0 +1,206 @@
+# incremental.py
+# This module re-evaluates only the parts of an operand file that changed since the last run.
+
+# The input file is cut into chunks of lines at content-defined boundaries: a chunk ends after a
+# line whose CRC-32 is a multiple of the average chunk length. Because boundaries depend only on
+# the lines around them, inserting, removing or editing a line changes the chunk that holds it and
+# leaves every other chunk, and its fingerprint, as it was.
+#
+# The rendered results of every chunk are kept in a cache directory: a pack file holding the
+# rendered text of every chunk of the last run, and an index mapping the BLAKE2 fingerprint of each
+# chunk and output format to its place in the pack. A run renders only the chunks missing from the
+# index and copies the others from the pack, so rerunning over a file where a few regions changed
+# costs about as much as evaluating those regions. Edits scattered over the whole file touch more
+# chunks; a smaller average chunk length keeps more of them.
+#
+# Every run writes a new pack holding exactly its own chunks, so the cache stays the size of one
+# output file. Use one cache directory per dataset; every output format has its own pack and index.
+
+import hashlib
+import json
+import os
+import zlib
+from contextlib import ExitStack
+from typing import Iterator, List, Tuple
+
+from compressed_io import open_input, open_output
+from print_operations import FORMATS, OperationsWriter, render_batch
+from stream_operations import IO_BUFFER_SIZE, parse_pairs
+
+# Average number of lines per chunk, and the most lines a chunk may hold, as a multiple of it.
+DEFAULT_AVERAGE_CHUNK_LINES = 256
+MAX_CHUNK_FACTOR = 4
+
+# Changing this invalidates every cached entry, e.g. when the rendering changes.
+CACHE_VERSION = b"1"
+
+
+def iter_chunks(
+    infile, average_lines: int = DEFAULT_AVERAGE_CHUNK_LINES
+) -> Iterator[List[bytes]]:
+    """
+    Cuts a binary stream of lines into chunks at content-defined boundaries.
+
+    Args:
+        infile (BinaryIO): The stream of lines, opened in binary mode.
+        average_lines (int): The average number of lines per chunk.
+
+    Yields:
+        list of bytes: The lines of a chunk, with their line endings.
+    """
+    if average_lines < 1:
+        raise ValueError("average_lines must be at least 1.")
+    max_lines = average_lines * MAX_CHUNK_FACTOR
+    crc32 = zlib.crc32
+    chunk = []
+    for line in infile:
+        chunk.append(line)
+        if crc32(line) % average_lines == 0 or len(chunk) >= max_lines:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def fingerprint(lines: List[bytes], fmt: str) -> str:
+    """
+    Returns the cache key of the rendered results of a chunk.
+
+    Args:
+        lines (list of bytes): The lines of the chunk.
+        fmt (str): The output format.
+
+    Returns:
+        str: A hexadecimal digest of the cache version, the format and the lines.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(CACHE_VERSION + b"\0" + fmt.encode() + b"\0")
+    digest.update(b"".join(lines))
+    return digest.hexdigest()
+
+
+def _load_index(cache_dir: str, fmt: str) -> dict:
+    # Returns the index of the last run, or an empty index if there is none or it is damaged.
+    try:
+        with open(os.path.join(cache_dir, f"{fmt}.index"), encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = None
+    if (
+        not isinstance(index, dict)
+        or not isinstance(index.get("chunks"), dict)
+        or not _is_pack_name(cache_dir, fmt, index.get("pack"))
+    ):
+        return {"pack": None, "chunks": {}}
+    return index
+
+
+def _is_pack_name(cache_dir: str, fmt: str, name) -> bool:
+    # Whether an index names a pack this module writes: a plain file name in cache_dir, so that
+    # a damaged or crafted index can never make a run read or remove another file.
+    if not isinstance(name, str) or not name.startswith(f"{fmt}-"):
+        return False
+    if not name.endswith(".pack") or os.path.basename(name) != name:
+        return False
+    if os.altsep and os.altsep in name:
+        return False
+    directory = os.path.realpath(cache_dir)
+    return os.path.dirname(os.path.realpath(os.path.join(directory, name))) == directory
+
+
+def _read_entry(pack, entry):
+    # Reads a chunk of the last pack, or returns None when its index entry is damaged.
+    try:
+        start, length, skipped = entry
+        if not all(type(n) is int and n >= 0 for n in entry):
+            return None
+        pack.seek(start)
+        data = pack.read(length)
+        if len(data) != length:
+            return None
+        return data, data.decode("utf-8"), skipped
+    except (TypeError, ValueError, OSError):
+        return None
+
+
+def evaluate_incremental(
+    input_path: str,
+    output_path: str,
+    cache_dir: str,
+    fmt: str = "text",
+    average_lines: int = DEFAULT_AVERAGE_CHUNK_LINES,
+) -> Tuple[int, int, int, int]:
+    """
+    Evaluates every operand pair in a file like stream_operations.evaluate_file, reusing the
+    cached results of the chunks that did not change since the last run.
+
+    Args:
+        input_path (str): Path of the CSV or newline-delimited file of operand pairs, which
+            may be gzip, bz2 or xz compressed.
+        output_path (str): Path of the file the results are written to, compressed if its
+            name ends with .gz, .bz2 or .xz.
+        cache_dir (str): The cache directory of this dataset. It is created if needed.
+        fmt (str): The output format, one of print_operations.FORMATS. Defaults to "text".
+        average_lines (int): The average number of lines per chunk.
+
+    Returns:
+        tuple (int, int, int, int): The number of pairs evaluated in this run, the number of
+        lines skipped, the number of chunks and the number of chunks reused from the cache.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {FORMATS}.")
+    os.makedirs(cache_dir, exist_ok=True)
+    old = _load_index(cache_dir, fmt)
+    pack_name = f"{fmt}-{os.getpid()}-{os.urandom(4).hex()}.pack"
+    chunks_index = {}
+    evaluated = skipped = chunks = reused = offset = 0
+    pack_path = os.path.join(cache_dir, pack_name)
+    try:
+        with ExitStack() as stack:
+            infile = stack.enter_context(open_input(input_path, "rb"))
+            outfile = stack.enter_context(open_output(output_path))
+            writer = stack.enter_context(OperationsWriter(outfile, fmt))
+            pack = stack.enter_context(open(pack_path, "wb", buffering=IO_BUFFER_SIZE))
+            old_pack = None
+            if old["pack"] and old["chunks"]:
+                try:
+                    old_pack = stack.enter_context(
+                        open(os.path.join(cache_dir, old["pack"]), "rb")
+                    )
+                except OSError:
+                    old["chunks"] = {}
+            for lines in iter_chunks(infile, average_lines):
+                key = fingerprint(lines, fmt)
+                chunks += 1
+                entry = old["chunks"].get(key)
+                cached = None if entry is None else _read_entry(old_pack, entry)
+                if cached is not None:
+                    data, text, chunk_skipped = cached
+                    reused += 1
+                else:
+                    text = b"".join(lines).decode("utf-8")
+                    a, b, chunk_skipped = parse_pairs(text.split("\n"))
+                    text = render_batch(a, b, fmt)
+                    data = text.encode("utf-8")
+                    evaluated += len(a)
+                writer.write_text(text)
+                pack.write(data)
+                chunks_index[key] = (offset, len(data), chunk_skipped)
+                offset += len(data)
+                skipped += chunk_skipped
+    except BaseException:
+        # A failed run leaves the cache of the last run as it was.
+        if os.path.exists(pack_path):
+            os.remove(pack_path)
+        raise
+    # The new index replaces the old one atomically, and only then the old pack is removed.
+    temporary = os.path.join(cache_dir, f"{fmt}.index.{os.getpid()}.tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({"pack": pack_name, "chunks": chunks_index}, f)
+    os.replace(temporary, os.path.join(cache_dir, f"{fmt}.index"))
+    if old["pack"] and old["pack"] != pack_name:
+        try:
+            os.remove(os.path.join(cache_dir, old["pack"]))
+        except OSError:
+            pass
+    return evaluated, skipped, chunks, reused
@@ -1,33 +1,312 @@
-def validate_float(input_str):
-    """
-    Validates if the provided string can be converted to a float.
-
-    Args:
-        input_str (str): The string to be validated.
-
-    Returns:
-        tuple (bool, float or None): A tuple containing a boolean indicating if the input is valid,
-        and the converted float or None if invalid.
-    """
-    try:
-        return True, float(input_str)
-    except ValueError:
-        return False, None
-
-
-def get_validated_float_input(prompt):
-    """
-    Repeatedly prompts the user for input until a valid float is entered.
-
-    Args:
-        prompt (str): The prompt to display to the user.
-
-    Returns:
-        float: The validated float input from the user.
-    """
-    while True:
-        user_input = input(prompt)
-        is_valid, number = validate_float(user_input)
-        if is_valid:
-            return number
-        print("Invalid input. Please enter a valid number.")
+# input_validation.py
+# This module validates numbers typed by the user or read in bulk from machine-generated data.
+
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from itertools import compress
+
+# For type checkers only, as in math_operations.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import BinaryIO, Iterator, Sequence, TextIO, Tuple, Union
+
+# Matches plain decimal text such as "5", "-3.25", ".5" or "1e-3". Tokens that match are known
+# to convert with float(); only the few other spellings float() accepts, see _may_be_float, go
+# through validate_float. It is compiled on first use, as re is slow to import.
+_DECIMAL = r"\s*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*"
+_decimal_match = None
+
+# The spellings of infinity and NaN accepted by float(), in lower case and without a sign.
+_SPECIAL_FLOATS = frozenset(["inf", "infinity", "nan"])
+
+
+# Printed when the user enters something that is not a number, before asking again.
+INVALID_INPUT_MESSAGE = "Invalid input. Please enter a valid number."
+
+# Most bytes read from a non-interactive stream at a time by iter_validated_batches.
+INPUT_BLOCK_SIZE = 1 << 16
+
+
+def validate_float(input_str):
+    """
+    Validates if the provided string can be converted to a float.
+
+    Args:
+        input_str (str): The string to be validated.
+
+    Returns:
+        tuple (bool, float or None): A tuple containing a boolean indicating if the input is valid,
+        and the converted float or None if invalid.
+    """
+    try:
+        return True, float(input_str)
+    except ValueError:
+        return False, None
+
+
+def validate_number(input_str, parse=float):
+    """
+    Validates if the provided string can be converted with a parser, such as the parse
+    function of a numeric backend.
+
+    Args:
+        input_str (str): The string to be validated.
+        parse (callable): Converts a string to a number, raising ValueError if it cannot.
+            Defaults to float.
+
+    Returns:
+        tuple (bool, number or None): A tuple containing a boolean indicating if the input is
+        valid, and the converted number or None if invalid.
+    """
+    try:
+        return True, parse(input_str)
+    except ValueError:
+        return False, None
+
+
+def get_validated_float_input(prompt, parse=float):
+    """
+    Repeatedly prompts the user for input until a valid float is entered.
+
+    Args:
+        prompt (str): The prompt to display to the user.
+        parse (callable): Converts the input to a number, raising ValueError if it cannot,
+            e.g. the parse function of a numeric backend. Defaults to float.
+
+    Returns:
+        float: The validated float input from the user, or the number returned by parse.
+    """
+    while True:
+        user_input = input(prompt)
+        if parse is float:
+            is_valid, number = validate_float(user_input)
+        else:
+            is_valid, number = validate_number(user_input, parse)
+        if is_valid:
+            return number
+        print(INVALID_INPUT_MESSAGE)
+
+
+def split_tokens(buffer: Union[str, bytes]) -> list:
+    """
+    Splits a buffer of text into number tokens separated by commas or whitespace.
+
+    Args:
+        buffer (str or bytes): The text to split. Bytes are decoded as UTF-8.
+
+    Returns:
+        list of str: The tokens found in the buffer.
+    """
+    if not isinstance(buffer, str):
+        buffer = bytes(buffer).decode("utf-8")
+    return buffer.replace(",", " ").split()
+
+
+def _may_be_float(token) -> bool:
+    # Whether float() may accept a token that is not plain decimal text: bytes, infinity and
+    # NaN, digits grouped with underscores, or other non-ASCII text such as Unicode spaces.
+    if type(token) is not str:
+        return True
+    if "_" in token or not token.isascii():
+        return True
+    return token.strip().lstrip("+-").lower() in _SPECIAL_FLOATS
+
+
+def validate_floats(
+    tokens: Union[str, bytes, Sequence[str]],
+) -> Tuple[array, bytearray]:
+    """
+    Validates many strings at once, giving the same result as validate_float for each one.
+
+    Every token is first classified with a regular expression: well-formed decimal text is
+    converted without ever raising, and only tokens that may still be floats in another
+    spelling, such as "inf" or "1_000", are checked with validate_float. The rest are
+    rejected without trying to convert them.
+
+    Args:
+        tokens (str, bytes or sequence of str): The strings to validate, or a buffer that is
+            split into tokens with split_tokens.
+
+    Returns:
+        tuple (array, bytearray): An array('d') of the converted numbers, holding NaN where
+        a token is invalid, and a mask holding 1 for every valid token and 0 otherwise.
+    """
+    if isinstance(tokens, (str, bytes, bytearray, memoryview)):
+        tokens = split_tokens(tokens)
+    global _decimal_match
+    if _decimal_match is None:
+        import re
+
+        _decimal_match = re.compile(_DECIMAL).fullmatch
+    decimal = [
+        type(token) is str and _decimal_match(token) is not None for token in tokens
+    ]
+    if all(decimal):
+        return array("d", map(float, tokens)), bytearray(b"\x01") * len(tokens)
+    values = array("d", bytes(8 * len(tokens)))
+    valid = bytearray(len(tokens))
+    for i, token in enumerate(tokens):
+        if decimal[i]:
+            values[i] = float(token)
+            valid[i] = 1
+        elif _may_be_float(token):
+            is_valid, number = validate_float(token)
+            values[i] = number if is_valid else math.nan
+            valid[i] = is_valid
+        else:
+            values[i] = math.nan
+    return values, valid
+
+
+def validate_numbers(
+    tokens: Union[str, bytes, Sequence[str]], parse=float
+) -> Tuple[Union[array, list], bytearray]:
+    """
+    Validates many strings at once with a parser, giving the same result as validate_number
+    for each one.
+
+    Args:
+        tokens (str, bytes or sequence of str): The strings to validate, or a buffer that is
+            split into tokens with split_tokens.
+        parse (callable): Converts a string to a number, raising ValueError if it cannot,
+            e.g. the parse function of a numeric backend. Defaults to float.
+
+    Returns:
+        tuple (array or list, bytearray): The converted numbers, holding None where a token is
+        invalid, and a mask holding 1 for every valid token and 0 otherwise. With float, the
+        result of validate_floats is returned.
+    """
+    if parse is float:
+        return validate_floats(tokens)
+    if isinstance(tokens, (str, bytes, bytearray, memoryview)):
+        tokens = split_tokens(tokens)
+    try:
+        # Fast path: the whole batch converts without a single invalid token.
+        values = list(map(parse, tokens))
+        return values, bytearray(b"\x01") * len(values)
+    except ValueError:
+        pass
+    values = []
+    valid = bytearray(len(tokens))
+    for i, token in enumerate(tokens):
+        is_valid, number = validate_number(token, parse)
+        values.append(number)
+        valid[i] = is_valid
+    return values, valid
+
+
+def _iter_token_blocks(
+    stream: BinaryIO, block_size: int = INPUT_BLOCK_SIZE
+) -> Iterator[list]:
+    """
+    Reads a binary stream in blocks and splits every block into number tokens.
+
+    read1 returns as soon as some data is available, so the tokens of a slow pipe are
+    yielded as they arrive instead of once a whole block is full.
+
+    Args:
+        stream (BinaryIO): The stream to read, e.g. sys.stdin.buffer. Text streams without a
+            binary buffer, such as io.StringIO, are read as UTF-8.
+        block_size (int): The most bytes read at a time.
+
+    Yields:
+        list of str: The complete tokens of every block.
+    """
+    read = getattr(stream, "read1", stream.read)
+    tail = b""
+    while True:
+        block = read(block_size)
+        if not block:
+            break
+        if isinstance(block, str):
+            block = block.encode("utf-8")
+        block = tail + block.replace(b",", b" ")
+        tokens = block.split()
+        # The last token may continue in the next block.
+        tail = b"" if not tokens or block[-1:].isspace() else tokens.pop()
+        if tokens:
+            yield b" ".join(tokens).decode("utf-8", "replace").split()
+    if tail:
+        yield tail.decode("utf-8", "replace").split()
+
+
+def iter_validated_batches(
+    stream: Union[BinaryIO, TextIO] = None,
+    parse=float,
+    block_size: int = INPUT_BLOCK_SIZE,
+) -> Iterator[Tuple[Sequence[float], Sequence[float]]]:
+    """
+    Reads numbers from a non-interactive stream, such as a pipe, without prompting, and yields
+    them in pairs, a batch per block read.
+
+    Numbers are separated by whitespace or commas, one pair per line or any other layout.
+    Like get_validated_float_input, an invalid number is reported and only that number is
+    read again: the next valid number takes its place in the pair. The message goes to
+    stderr, so that stdout only holds results. A number left without a second one at the
+    end of the stream is reported and dropped.
+
+    Args:
+        stream (BinaryIO or TextIO, optional): The stream to read. A text stream is read
+            through its binary buffer, and a gzip, bz2 or xz compressed stream is
+            decompressed in a background thread. Defaults to sys.stdin.
+        parse (callable): Converts a string to a number, raising ValueError if it cannot,
+            e.g. the parse function of a numeric backend. Defaults to float.
+        block_size (int): The most bytes read at a time.
+
+    Yields:
+        tuple (array or list, array or list): The first and second numbers of the pairs
+        read from a block, as array('d') with float and as lists otherwise.
+    """
+    if stream is None:
+        stream = sys.stdin
+    stream = getattr(stream, "buffer", stream)
+    # A compressed stream, e.g. a .gz file piped in, is recognized by its first bytes.
+    header = stream.peek(8)[:8] if hasattr(stream, "peek") else b""
+    if header[:1] in (b"\x1f", b"B", b"\xfd"):
+        import compressed_io
+
+        compression = compressed_io.detect_compression(header)
+        if compression is not None:
+            stream = compressed_io.decompressing_reader(stream, compression)
+    pending = array("d") if parse is float else []
+    for tokens in _iter_token_blocks(stream, block_size):
+        values, valid = validate_numbers(tokens, parse)
+        invalid = valid.count(0)
+        if invalid:
+            sys.stderr.write((INVALID_INPUT_MESSAGE + "\n") * invalid)
+            values = compress(values, valid)
+            values = array("d", values) if parse is float else list(values)
+        if pending:
+            values = pending + values
+        paired = len(values) & ~1
+        pending = values[paired:]
+        if paired:
+            yield values[0:paired:2], values[1:paired:2]
+    if pending:
+        print("Ignored a first number without a second number.", file=sys.stderr)
+
+
+def iter_validated_pairs(
+    stream: Union[BinaryIO, TextIO] = None,
+    parse=float,
+    block_size: int = INPUT_BLOCK_SIZE,
+) -> Iterator[Tuple[float, float]]:
+    """
+    Reads numbers from a non-interactive stream without prompting and yields them in pairs.
+
+    The stream is read in blocks and validated like in iter_validated_batches.
+
+    Args:
+        stream (BinaryIO or TextIO, optional): The stream to read. Defaults to sys.stdin.
+        parse (callable): Converts a string to a number, raising ValueError if it cannot.
+            Defaults to float.
+        block_size (int): The most bytes read at a time.
+
+    Yields:
+        tuple (float, float): The first and the second number of every pair.
+    """
+    for a, b in iter_validated_batches(stream, parse, block_size):
+        yield from zip(a, b)
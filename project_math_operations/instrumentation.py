@@ -0,0 +1,399 @@
+# instrumentation.py
+# This module records where time goes between parsing, computing and rendering.
+
+# Instrumentation is opt-in. enable() replaces the hot-path functions of the project modules with
+# wrappers that record call counts, latency histograms, items processed, divisions by zero and
+# characters written, per stage and operation; disable() puts the original functions back. While
+# disabled nothing is wrapped, so the hot paths run at full speed.
+#
+# The recorded metrics can be exported as a Prometheus text snapshot or as JSON, and profile_run
+# runs a single call under cProfile or any other profiler with enable/disable or start/stop methods.
+
+import cProfile
+import importlib
+import json
+import os
+import sys
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+
+
+# Counters extracted from the arguments and the result of an instrumented call.
+def _one(args, result):
+    return 1
+
+
+def _none(args, result):
+    return 0
+
+
+def _first_length(args, result):
+    return len(args[0])
+
+
+def _result_length(args, result):
+    return len(result)
+
+
+def _values_length(args, result):
+    return len(result[0])
+
+
+def _masked_zero_divisions(args, result):
+    return result[1].count(1)
+
+
+# Functions to instrument: module, attribute, stage, and how to count the items, the divisions
+# by zero and the characters of a call.
+_TARGETS: List[Tuple[str, str, str, Callable, Callable, Callable]] = [
+    ("input_validation", "validate_float", "parse", _one, _none, _none),
+    ("input_validation", "validate_floats", "parse", _values_length, _none, _none),
+    ("math_operations", "add", "compute", _one, _none, _none),
+    ("math_operations", "subtract", "compute", _one, _none, _none),
+    ("math_operations", "multiply", "compute", _one, _none, _none),
+    ("math_operations", "divide", "compute", _one, _none, _none),
+    ("math_operations", "add_batch", "compute", _first_length, _none, _none),
+    ("math_operations", "subtract_batch", "compute", _first_length, _none, _none),
+    ("math_operations", "multiply_batch", "compute", _first_length, _none, _none),
+    (
+        "math_operations",
+        "divide_batch",
+        "compute",
+        _first_length,
+        _masked_zero_divisions,
+        _none,
+    ),
+    ("print_operations", "render_pair", "render", _one, _none, _result_length),
+    (
+        "print_operations",
+        "render_batch",
+        "render",
+        _first_length,
+        _none,
+        _result_length,
+    ),
+    ("print_operations", "print_operations", "render", _one, _none, _none),
+]
+
+
+class OperationMetrics:
+    """
+    The metrics of one operation in one stage.
+
+    Attributes:
+        calls (int): The number of calls.
+        items (int): The number of operand pairs or tokens processed.
+        zero_divisions (int): The number of divisions by zero.
+        characters (int): The number of characters rendered or written.
+        seconds (float): The total time spent in the operation.
+        buckets (list of int): Calls per latency bucket; the last one counts slower calls.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.items = 0
+        self.zero_divisions = 0
+        self.characters = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._lock = threading.Lock()
+
+    def record(
+        self, seconds: float, items: int, zero_divisions: int = 0, characters: int = 0
+    ) -> None:
+        """
+        Records one call.
+
+        Args:
+            seconds (float): The duration of the call.
+            items (int): The number of items processed by the call.
+            zero_divisions (int): The number of divisions by zero in the call.
+            characters (int): The number of characters rendered or written by the call.
+        """
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            self.calls += 1
+            self.items += items
+            self.zero_divisions += zero_divisions
+            self.characters += characters
+            self.seconds += seconds
+            self.buckets[bucket] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the metrics as a dictionary.
+
+        Returns:
+            dict: The counters, the total time and the latency histogram.
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "items": self.items,
+                "zero_divisions": self.zero_divisions,
+                "characters": self.characters,
+                "seconds": self.seconds,
+                "latency_buckets": {
+                    **{
+                        repr(bound): n
+                        for bound, n in zip(LATENCY_BUCKETS, self.buckets)
+                    },
+                    "+Inf": self.buckets[-1],
+                },
+            }
+
+
+# Metrics per (stage, operation), and the original functions replaced by enable().
+_metrics: Dict[Tuple[str, str], OperationMetrics] = {}
+_metrics_lock = threading.Lock()
+_patched: List[Tuple[Any, str, Any]] = []
+
+
+def metrics_for(stage: str, operation: str) -> OperationMetrics:
+    """
+    Returns the metrics of an operation, creating them on first use.
+
+    Args:
+        stage (str): The stage, e.g. "parse", "compute", "render" or "write".
+        operation (str): The operation name.
+
+    Returns:
+        OperationMetrics: The metrics of the operation.
+    """
+    key = (stage, operation)
+    metrics = _metrics.get(key)
+    if metrics is None:
+        with _metrics_lock:
+            metrics = _metrics.setdefault(key, OperationMetrics())
+    return metrics
+
+
+def _instrument(
+    func: Callable, stage: str, operation: str, items, zero_divisions, characters
+) -> Callable:
+    metrics = metrics_for(stage, operation)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except ZeroDivisionError:
+            metrics.record(perf_counter() - start, 1, zero_divisions=1)
+            raise
+        metrics.record(
+            perf_counter() - start,
+            items(args, result),
+            zero_divisions(args, result),
+            characters(args, result),
+        )
+        return result
+
+    return wrapper
+
+
+def _instrument_flush(flush: Callable) -> Callable:
+    # OperationsWriter.flush: the characters written are the buffered ones before the call.
+    metrics = metrics_for("write", "OperationsWriter.flush")
+
+    @wraps(flush)
+    def wrapper(self):
+        buffered = self._buffered + len(self._pending_header)
+        start = perf_counter()
+        flush(self)
+        metrics.record(perf_counter() - start, 0, characters=buffered)
+
+    return wrapper
+
+
+def _project_modules() -> List[Any]:
+    """
+    Returns the loaded modules that live in this project directory.
+
+    Returns:
+        list of module: The modules whose file is in the same directory as this one.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    modules = []
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.dirname(os.path.abspath(path)) == directory:
+            modules.append(module)
+    return modules
+
+
+def is_enabled() -> bool:
+    """
+    Tells whether instrumentation is enabled.
+
+    Returns:
+        bool: True between enable() and disable().
+    """
+    return bool(_patched)
+
+
+def enable() -> None:
+    """
+    Replaces the hot-path functions with instrumented wrappers.
+
+    Every loaded project module that imported one of the functions by name gets the
+    wrapper too. Calling enable() again has no effect.
+    """
+    if _patched:
+        return
+    wrappers = {}
+    for module_name, attribute, stage, items, zero_divisions, characters in _TARGETS:
+        original = getattr(importlib.import_module(module_name), attribute)
+        wrappers[id(original)] = (
+            original,
+            _instrument(original, stage, attribute, items, zero_divisions, characters),
+        )
+    for module in _project_modules():
+        for name, value in list(vars(module).items()):
+            entry = wrappers.get(id(value))
+            if entry is not None and entry[0] is value:
+                _patched.append((module, name, value))
+                setattr(module, name, entry[1])
+    writer = importlib.import_module("print_operations").OperationsWriter
+    _patched.append((writer, "flush", writer.flush))
+    writer.flush = _instrument_flush(writer.flush)
+
+
+def disable() -> None:
+    """
+    Puts the original functions back. The recorded metrics are kept.
+    """
+    while _patched:
+        owner, name, original = _patched.pop()
+        setattr(owner, name, original)
+
+
+def reset() -> None:
+    """
+    Clears every recorded metric.
+    """
+    with _metrics_lock:
+        _metrics.clear()
+    # Wrappers hold their metrics objects, so re-create them if instrumentation is active.
+    if _patched:
+        disable()
+        enable()
+
+
+def snapshot() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Returns every recorded metric.
+
+    Returns:
+        dict: The metrics of every operation that was called, grouped by stage.
+    """
+    result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (stage, operation), metrics in sorted(_metrics.items()):
+        if metrics.calls:
+            result.setdefault(stage, {})[operation] = metrics.to_dict()
+    return result
+
+
+def to_json(indent: Optional[int] = 2) -> str:
+    """
+    Exports the recorded metrics as JSON.
+
+    Args:
+        indent (int, optional): The indentation of the JSON text. Defaults to 2.
+
+    Returns:
+        str: The JSON text of snapshot().
+    """
+    return json.dumps(snapshot(), indent=indent)
+
+
+def to_prometheus() -> str:
+    """
+    Exports the recorded metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: A snapshot with counters for calls, items, divisions by zero and characters,
+        and a latency histogram, labelled by stage and operation.
+    """
+    counters = [
+        ("calls", "Calls per stage and operation."),
+        ("items", "Operand pairs or tokens processed."),
+        ("zero_divisions", "Divisions by zero."),
+        ("characters", "Characters rendered or written."),
+    ]
+    data = [
+        (f'stage="{stage}",operation="{operation}"', metrics)
+        for stage, operations in snapshot().items()
+        for operation, metrics in operations.items()
+    ]
+    lines = []
+    for name, description in counters:
+        lines.append(f"# HELP math_operations_{name}_total {description}")
+        lines.append(f"# TYPE math_operations_{name}_total counter")
+        for labels, metrics in data:
+            lines.append(f"math_operations_{name}_total{{{labels}}} {metrics[name]}")
+    lines.append("# HELP math_operations_latency_seconds Latency per call.")
+    lines.append("# TYPE math_operations_latency_seconds histogram")
+    for labels, metrics in data:
+        cumulative = 0
+        for bound, count in metrics["latency_buckets"].items():
+            cumulative += count
+            lines.append(
+                f'math_operations_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(
+            f"math_operations_latency_seconds_sum{{{labels}}} {metrics['seconds']}"
+        )
+        lines.append(
+            f"math_operations_latency_seconds_count{{{labels}}} {metrics['calls']}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def write_snapshot(path: str) -> None:
+    """
+    Writes the recorded metrics to a file, as JSON if the name ends with .json and in the
+    Prometheus text format otherwise.
+
+    Args:
+        path (str): Path of the file to write.
+    """
+    with open(path, "w") as f:
+        f.write(to_json() if path.endswith(".json") else to_prometheus())
+
+
+@contextmanager
+def profile_run(profiler: Any = None, output_path: Optional[str] = None):
+    """
+    Profiles the code run inside the with block.
+
+    Args:
+        profiler (Any, optional): A profiler with enable/disable methods (like cProfile.Profile)
+            or start/stop methods (like most sampling profilers). Defaults to a new
+            cProfile.Profile.
+        output_path (str, optional): If given and the profiler has dump_stats, the statistics
+            are written there when the block exits.
+
+    Yields:
+        Any: The profiler, for inspecting the results after the block.
+    """
+    profiler = profiler if profiler is not None else cProfile.Profile()
+    start, stop = (
+        (profiler.enable, profiler.disable)
+        if hasattr(profiler, "enable")
+        else (profiler.start, profiler.stop)
+    )
+    start()
+    try:
+        yield profiler
+    finally:
+        stop()
+        if output_path and hasattr(profiler, "dump_stats"):
+            profiler.dump_stats(output_path)
@@ -1,48 +1,477 @@
-# main.py
-
-# Import the module that contains functions for printing operations
-import print_operations
-from input_validation import get_validated_float_input
-
-# Allows the user to re-enter only the invalid number.
-# The other number is kept as is.
-
-# Separate functions for getting user input for each number, especially if you
-# anticipate the need to handle more inputs in the future (e.g. a third number).
-# or if you want to add specific validation or processing for each input.
-# This approach increases modularity and reusability of your code.
-
-# Each function can be tailored for specific input requirements, making the code more maintainable and easier to update or extend.
-
-
-def get_user_input():
-    """
-    Prompts the user to enter two numbers and returns them as a tuple.
-
-    Returns:
-        tuple of float: A tuple containing two float numbers entered by the user.
-    """
-    a = get_validated_float_input("Enter the first number: ")
-    b = get_validated_float_input("Enter the second number: ")
-    return a, b
-
-
-# The main function of the script, which performs operations using the user's input.
-def main(a, b):
-    """
-    The main function of the script, performing print operations on given numbers.
-
-    Args:
-        a (float): The first number.
-        b (float): The second number.
-    """
-    print_operations.print_operations(a, b)
-
-
-if __name__ == "__main__":
-    # Entry point of the script. Gets user input and calls the main function.
-    # This last part of the script checks if this script is being run directly or being imported as a module.
-    # If it's being run directly, it calls the main function. This is a common Python idiom to prevent
-    # code from being run when the module is imported.
-    a, b = get_user_input()
-    main(a, b)
+# main.py
+
+import sys
+
+# Import the module that contains functions for printing operations
+import print_operations
+from input_validation import get_validated_float_input
+
+# The other subsystems (argument parsing, file, binary and service modes, instrumentation) are
+# imported inside the functions that need them, so every mode only pays for the modules it uses
+# and interactive runs start as fast as possible.
+
+# Allows the user to re-enter only the invalid number.
+# The other number is kept as is.
+
+# Separate functions for getting user input for each number, especially if you
+# anticipate the need to handle more inputs in the future (e.g. a third number).
+# or if you want to add specific validation or processing for each input.
+# This approach increases modularity and reusability of your code.
+
+# Each function can be tailored for specific input requirements, making the code more maintainable and easier to update or extend.
+
+
+def get_user_input(parse=float):
+    """
+    Prompts the user to enter two numbers and returns them as a tuple.
+
+    Args:
+        parse (callable): Converts the input to a number, e.g. the parse function of a
+            numeric backend. Defaults to float.
+
+    Returns:
+        tuple of float: A tuple containing two float numbers entered by the user.
+    """
+    a = get_validated_float_input("Enter the first number: ", parse)
+    b = get_validated_float_input("Enter the second number: ", parse)
+    return a, b
+
+
+def run_piped_input(backend=None):
+    """
+    Prints the results of every pair of numbers piped to stdin, without prompting.
+
+    stdin is read in large blocks and the pairs of every block are evaluated together, so a
+    whole file of pairs is processed by one process. Invalid numbers are reported on stderr
+    and skipped, the next number taking their place.
+
+    Args:
+        backend (NumericBackend, optional): The numeric backend parsing the input and
+            computing the results. Defaults to floats.
+    """
+    from input_validation import iter_validated_batches
+
+    parse = float if backend is None else backend.parse
+    write = sys.stdout.write
+    for a, b in iter_validated_batches(sys.stdin, parse):
+        write(print_operations.render_batch(a, b, backend=backend))
+
+
+def run_interactive(backend=None):
+    """
+    Prompts for two numbers and prints their results, or evaluates every pair piped to stdin
+    when stdin is not a terminal.
+
+    Args:
+        backend (NumericBackend, optional): The numeric backend parsing the input and
+            computing the results. Defaults to floats.
+    """
+    if not sys.stdin.isatty():
+        run_piped_input(backend)
+        return
+    a, b = get_user_input(float if backend is None else backend.parse)
+    main(a, b, backend)
+
+
+# The main function of the script, which performs operations using the user's input.
+def main(a, b, backend=None):
+    """
+    The main function of the script, performing print operations on given numbers.
+
+    Args:
+        a (float): The first number.
+        b (float): The second number.
+        backend (NumericBackend, optional): The numeric backend computing the results.
+            Defaults to floats.
+    """
+    print_operations.print_operations(a, b, backend)
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line arguments of the script.
+
+    Args:
+        argv (list of str, optional): The arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    import argparse
+
+    import numeric_backends
+    from engines import ENGINES
+    import stream_operations
+
+    parser = argparse.ArgumentParser(
+        description="Print the sum, difference, product and quotient of two numbers."
+    )
+    parser.add_argument(
+        "--input",
+        help="CSV, newline-delimited or binary file of operand pairs to evaluate instead of prompting",
+    )
+    parser.add_argument(
+        "--output", help="file the results are written to (required with --input)"
+    )
+    parser.add_argument(
+        "--to-binary",
+        metavar="PATH",
+        help="convert the text --input file to a binary operand file instead of evaluating it",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=stream_operations.DEFAULT_CHUNK_SIZE,
+        help="number of input lines evaluated at a time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=print_operations.FORMATS + ("binary", "arrow"),
+        default="text",
+        help="output format of the file mode; binary needs a binary --input, arrow writes an "
+        "Arrow IPC file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        help="reuse the results of the --input chunks that did not change since the last "
+        "run with the same cache directory (see incremental.py)",
+    )
+    parser.add_argument(
+        "--table",
+        nargs=2,
+        metavar=("A_FILE", "B_FILE"),
+        help="write the results of every number of A_FILE against every number of B_FILE "
+        "to --output (see operation_tables.py)",
+    )
+    parser.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="write running totals (count, sum, mean, variance, min and max of every result) "
+        "of the --input pairs to --output as JSON instead of the result of every pair",
+    )
+    parser.add_argument(
+        "--numeric",
+        choices=numeric_backends.BACKENDS,
+        default="float",
+        help="number type the operands are parsed into and computed with (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("auto",) + ENGINES,
+        help="engine evaluating the text --input: auto picks the fastest for every chunk from "
+        "the calibration profile of this host (see dispatcher.py); the default is batch",
+    )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        help="significant digits of the results with --numeric decimal (default: 28)",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="serve the operations on host:port or a Unix socket path (see service.py)",
+    )
+    parser.add_argument(
+        "--worker",
+        metavar="ADDRESS",
+        help="evaluate the shards sent by a --workers coordinator on host:port "
+        "(see distributed.py)",
+    )
+    parser.add_argument(
+        "--workers",
+        metavar="ADDRESSES",
+        help="comma-separated host:port addresses of --worker processes the text --input is "
+        "sharded over; the results are written in input order",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="record metrics of the hot paths and write them to PATH when done "
+        "(JSON if PATH ends with .json, Prometheus text otherwise)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="run under cProfile and write the statistics to PATH",
+    )
+    args = parser.parse_args(argv)
+    if args.serve and (args.input or args.output):
+        parser.error("--serve cannot be combined with --input or --output")
+    if args.worker and (args.input or args.output or args.serve or args.table):
+        parser.error(
+            "--worker cannot be combined with --input, --output, --serve or --table"
+        )
+    if args.to_binary and (not args.input or args.output):
+        parser.error("--to-binary needs --input and no --output")
+    if args.input and not args.output and not args.to_binary:
+        parser.error("--output is required with --input")
+    if args.table and (
+        args.input
+        or not args.output
+        or args.serve
+        or args.aggregate
+        or args.cache
+        or args.numeric != "float"
+    ):
+        parser.error(
+            "--table needs --output, and no --input, --serve, --aggregate, --cache or --numeric"
+        )
+    if args.output and not args.input and not args.table:
+        parser.error("--input or --table is required with --output")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if args.aggregate and (
+        not args.output or args.format != "text" or args.numeric != "float"
+    ):
+        parser.error(
+            "--aggregate needs --input and --output, and no --format or --numeric"
+        )
+    if args.cache and (
+        not args.output
+        or args.aggregate
+        or args.format in ("binary", "arrow")
+        or args.numeric != "float"
+    ):
+        parser.error(
+            "--cache needs --input and --output, and no --aggregate, --numeric or binary format"
+        )
+    if args.engine and (
+        not args.input
+        or args.to_binary
+        or args.aggregate
+        or args.cache
+        or args.format in ("binary", "arrow")
+        or args.numeric != "float"
+    ):
+        parser.error(
+            "--engine needs --input and --output, and no --to-binary, --aggregate, --cache, "
+            "--numeric or binary format"
+        )
+    if args.workers and (
+        not args.input
+        or args.to_binary
+        or args.aggregate
+        or args.cache
+        or args.engine
+        or args.format in ("binary", "arrow")
+        or args.numeric != "float"
+    ):
+        parser.error(
+            "--workers needs --input and --output, and no --to-binary, --aggregate, --cache, "
+            "--engine, --numeric or binary format"
+        )
+    if args.precision is not None and (args.numeric != "decimal" or args.precision < 1):
+        parser.error("--precision needs --numeric decimal and must be at least 1")
+    if args.numeric != "float" and (
+        args.serve or args.to_binary or args.format in ("binary", "arrow")
+    ):
+        parser.error("--numeric is not supported by --serve and the binary formats")
+    return args
+
+
+def get_backend(args):
+    """
+    Creates the numeric backend selected by the command line arguments.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments holding numeric and precision.
+
+    Returns:
+        NumericBackend or None: The backend, or None for floats, which use the functions of
+        math_operations directly.
+    """
+    if args.numeric == "float":
+        return None
+    import numeric_backends
+
+    if args.numeric == "decimal":
+        return numeric_backends.get_backend("decimal", precision=args.precision)
+    return numeric_backends.get_backend(args.numeric)
+
+
+def run_file_mode(args):
+    """
+    Evaluates every operand pair of the input file without prompting.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments holding input, output, to_binary,
+            chunk_size, format, numeric, precision, engine and workers.
+    """
+    import binary_format
+    import compressed_io
+    import stream_operations
+
+    skipped = 0
+    if args.aggregate:
+        skipped = run_aggregate_mode(args)
+    elif args.to_binary:
+        _, skipped = binary_format.convert_csv(
+            args.input, args.to_binary, args.chunk_size
+        )
+    elif args.format == "arrow":
+        import arrow_format
+
+        _, skipped = arrow_format.export_file(args.input, args.output, args.chunk_size)
+    elif binary_format.is_binary_file(args.input):
+        # Binary operand files are memory-mapped and evaluated without parsing.
+        if args.numeric != "float":
+            sys.exit("binary operand files hold floats; --numeric needs a text --input")
+        if args.cache:
+            sys.exit(
+                "--cache needs a text --input; binary operand files are not cached"
+            )
+        if args.engine or args.workers:
+            sys.exit("--engine and --workers need a text --input")
+        if args.format == "binary":
+            binary_format.evaluate_binary(args.input, args.output, args.chunk_size)
+        else:
+            with compressed_io.open_output(args.output) as outfile:
+                binary_format.render_binary(
+                    args.input, outfile, args.format, args.chunk_size
+                )
+    elif args.format == "binary":
+        sys.exit(
+            "--format binary needs a binary --input; convert it with --to-binary first"
+        )
+    elif args.cache:
+        import incremental
+
+        _, skipped, _, _ = incremental.evaluate_incremental(
+            args.input, args.output, args.cache, args.format
+        )
+    elif args.workers:
+        import distributed
+
+        try:
+            stats = distributed.evaluate_distributed(
+                args.input, args.output, args.workers.split(","), args.format
+            )
+        except (RuntimeError, ValueError) as error:
+            sys.exit(f"Distributed run failed: {error}")
+        skipped = stats.skipped
+        if stats.retried:
+            print(
+                f"Sent {stats.retried} of {stats.shards} shard(s) again after a worker failed.",
+                file=sys.stderr,
+            )
+    elif args.engine:
+        import dispatcher
+
+        engines = dispatcher.Dispatcher(engine=args.engine)
+        _, skipped = stream_operations.evaluate_file(
+            args.input, args.output, args.chunk_size, args.format, evaluate=engines
+        )
+        used = ", ".join(f"{name} x{count}" for name, count in engines.choices.items())
+        print(f"Engines used per chunk: {used or 'none'}", file=sys.stderr)
+    else:
+        _, skipped = stream_operations.evaluate_file(
+            args.input, args.output, args.chunk_size, args.format, get_backend(args)
+        )
+    if skipped:
+        print(f"Skipped {skipped} invalid line(s).", file=sys.stderr)
+
+
+def run_table_mode(args):
+    """
+    Writes the results of every number of one file against every number of another.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments holding table, output and format.
+    """
+    import compressed_io
+    import operation_tables
+
+    (a, a_skipped), (b, b_skipped) = map(operation_tables.read_operands, args.table)
+    if args.format == "binary":
+        operation_tables.write_table(a, b, args.output)
+    elif args.format == "arrow":
+        operation_tables.export_table(a, b, args.output)
+    else:
+        with compressed_io.open_output(args.output) as outfile:
+            operation_tables.render_table(a, b, outfile, args.format)
+    if a_skipped or b_skipped:
+        print(f"Skipped {a_skipped + b_skipped} invalid number(s).", file=sys.stderr)
+
+
+def run_aggregate_mode(args):
+    """
+    Writes the running totals of the results of every operand pair of the input file.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments holding input, output and chunk_size.
+
+    Returns:
+        int: The number of input lines skipped.
+    """
+    import json
+
+    import aggregates
+    import binary_format
+    import compressed_io
+
+    if binary_format.is_binary_file(args.input):
+        with binary_format.MappedColumns(args.input) as operands:
+            totals = aggregates.aggregate_columns(
+                binary_format.little_endian(operands.columns["a"]),
+                binary_format.little_endian(operands.columns["b"]),
+                args.chunk_size,
+            )
+    else:
+        with compressed_io.open_input(args.input) as infile:
+            totals = aggregates.aggregate_stream(infile, args.chunk_size)
+    with compressed_io.open_output(args.output) as outfile:
+        json.dump(totals.summary(), outfile, indent=2)
+        outfile.write("\n")
+    return totals.skipped
+
+
+def run(args):
+    """
+    Runs the mode selected by the command line arguments.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+    """
+    if args.serve:
+        # Service mode: answer requests from other processes until interrupted.
+        import service
+
+        service.serve(args.serve)
+    elif args.worker:
+        # Worker mode: evaluate the shards of a --workers coordinator until interrupted.
+        import distributed
+
+        distributed.run_worker(args.worker)
+    elif args.table:
+        # Table mode: every number of one file against every number of another.
+        run_table_mode(args)
+    elif args.input:
+        # Non-interactive mode: stream the results of a whole file of pairs to the output file.
+        run_file_mode(args)
+    else:
+        run_interactive(get_backend(args))
+
+
+if __name__ == "__main__":
+    # Entry point of the script. Gets user input and calls the main function.
+    # This last part of the script checks if this script is being run directly or being imported as a module.
+    # If it's being run directly, it calls the main function. This is a common Python idiom to prevent
+    # code from being run when the module is imported.
+    if len(sys.argv) == 1:
+        # Without arguments the script prompts for two numbers, or reads every pair piped to
+        # it; argparse is not even imported.
+        run_interactive()
+        sys.exit()
+    args = parse_args()
+    if args.metrics or args.profile:
+        import instrumentation
+    if args.metrics:
+        instrumentation.enable()
+    if args.profile:
+        with instrumentation.profile_run(output_path=args.profile):
+            run(args)
+    else:
+        run(args)
+    if args.metrics:
+        instrumentation.write_snapshot(args.metrics)
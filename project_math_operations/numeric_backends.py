@@ -0,0 +1,252 @@
+# numeric_backends.py
+# This module provides the four math operations for other number types than binary floats.
+
+# A backend bundles the parser, the four scalar operations and their batch versions for one number
+# type: 
+# - "float": binary floats, using the functions of math_operations themselves;
+# - "decimal": decimal.Decimal, rounded by a configurable decimal.Context;
+# - "fraction": fractions.Fraction, exact rational arithmetic;
+# - "int": Python integers, exact for sums, differences and products; quotients that are not whole
+#   numbers are returned as exact Fractions.
+#
+# Every operation of a backend is bound once, when the backend is created, to the function or
+# context method of its number type, so computing with a backend costs no type check per call.
+# Like math_operations.divide, divide raises ZeroDivisionError for a zero divisor, and divide_batch
+# fills and flags the elements whose divisor is zero.
+#
+# decimal and fractions are only imported when their backend is created.
+
+from __future__ import annotations
+
+import math
+from itertools import repeat
+from operator import add, eq, mul, sub, truediv
+
+import math_operations
+from math_operations import ZERO_DIVISION_MESSAGE, _check_lengths
+
+# For type checkers only, as in math_operations.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+# Names of the available backends, in the order they are listed on the command line.
+BACKENDS = ("float", "decimal", "fraction", "int")
+
+
+class NumericBackend:
+    """
+    The parser and the four math operations, scalar and batch, for one number type.
+
+    The batch functions of the float backend return array('d') like math_operations; the other
+    backends return lists.
+
+    Attributes:
+        name (str): The name of the backend, one of BACKENDS.
+        parse (callable): Converts a string to a number of the backend, raising ValueError if
+            the string is not a valid number.
+        add, subtract, multiply, divide (callable): The scalar operations.
+        add_batch, subtract_batch, multiply_batch, divide_batch (callable): The batch operations.
+        json_number (callable or None): Formats a number of the backend as a JSON value, or
+            None to format it like a float.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        parse: Callable[[str], Any],
+        add: Callable[[Any, Any], Any],
+        subtract: Callable[[Any, Any], Any],
+        multiply: Callable[[Any, Any], Any],
+        true_divide: Callable[[Any, Any], Any],
+        fill: Any = None,
+        json_number: Callable[[Any], str] = None,
+    ):
+        self.name = name
+        self.parse = parse
+        self.add = add
+        self.subtract = subtract
+        self.multiply = multiply
+        self.json_number = json_number
+
+        def divide(a, b):
+            if b != 0:
+                return true_divide(a, b)
+            raise ZeroDivisionError(ZERO_DIVISION_MESSAGE)
+
+        def add_batch(a, b):
+            _check_lengths(a, b)
+            return list(map(add, a, b))
+
+        def subtract_batch(a, b):
+            _check_lengths(a, b)
+            return list(map(subtract, a, b))
+
+        def multiply_batch(a, b):
+            _check_lengths(a, b)
+            return list(map(multiply, a, b))
+
+        def divide_batch(a, b, fill=fill):
+            _check_lengths(a, b)
+            zero_mask = bytearray(map(eq, b, repeat(0)))
+            if not any(zero_mask):
+                return list(map(true_divide, a, b)), zero_mask
+            return [
+                true_divide(x, y) if y != 0 else fill for x, y in zip(a, b)
+            ], zero_mask
+
+        self.divide = divide
+        self.add_batch = add_batch
+        self.subtract_batch = subtract_batch
+        self.multiply_batch = multiply_batch
+        self.divide_batch = divide_batch
+
+    def __repr__(self):
+        return f"<NumericBackend {self.name}>"
+
+
+def float_backend() -> NumericBackend:
+    """
+    Creates the binary float backend, which uses the functions of math_operations.
+
+    Returns:
+        NumericBackend: The float backend.
+    """
+    backend = NumericBackend("float", float, add, sub, mul, truediv, math.nan)
+    for name in ("add", "subtract", "multiply", "divide"):
+        setattr(backend, name, getattr(math_operations, name))
+        setattr(backend, f"{name}_batch", getattr(math_operations, f"{name}_batch"))
+    return backend
+
+
+def decimal_backend(
+    precision: int = None, rounding: str = None, context=None
+) -> NumericBackend:
+    """
+    Creates a decimal.Decimal backend.
+
+    Numbers are parsed exactly; every operation rounds its result with the context.
+    Invalid operations such as inf - inf give NaN and overflowing results give +-Infinity,
+    like floats, and signalling NaNs are rejected by parse.
+
+    Args:
+        precision (int, optional): The number of significant digits of the results.
+            Defaults to the precision of the context.
+        rounding (str, optional): A rounding mode of the decimal module, e.g. ROUND_HALF_EVEN.
+            Defaults to the rounding of the context.
+        context (decimal.Context, optional): The context to start from. Defaults to a copy
+            of decimal.DefaultContext.
+
+    Returns:
+        NumericBackend: The decimal backend.
+    """
+    import decimal
+
+    context = (context or decimal.DefaultContext).copy()
+    if precision is not None:
+        context.prec = precision
+    if rounding is not None:
+        context.rounding = rounding
+    # Like floats, inf - inf, 0 * inf and inf / inf give NaN, and results beyond the largest
+    # exponent give +-Infinity, instead of raising.
+    context.traps[decimal.InvalidOperation] = False
+    context.traps[decimal.Overflow] = False
+    Decimal = decimal.Decimal
+    InvalidOperation = decimal.InvalidOperation
+
+    def parse(text: str) -> decimal.Decimal:
+        try:
+            number = Decimal(text)
+        except InvalidOperation:
+            number = None
+        # Signalling NaNs raise even when compared to zero; float rejects them too.
+        if number is None or number.is_snan():
+            raise ValueError(f"could not convert string to Decimal: {text!r}")
+        return number
+
+    def json_number(x: decimal.Decimal) -> str:
+        if x.is_finite():
+            return str(x)
+        if x.is_nan():
+            return "NaN"
+        return "Infinity" if x > 0 else "-Infinity"
+
+    return NumericBackend(
+        "decimal",
+        parse,
+        context.add,
+        context.subtract,
+        context.multiply,
+        context.divide,
+        Decimal("NaN"),
+        json_number,
+    )
+
+
+def _fraction_json(x) -> str:
+    # JSON has no fractions: whole numbers are written as numbers, the others as strings.
+    return str(x) if x.denominator == 1 else f'"{x}"'
+
+
+def fraction_backend() -> NumericBackend:
+    """
+    Creates a fractions.Fraction backend. Every operation is exact.
+
+    Fractions that are not whole numbers are written to JSON as strings such as "1/3".
+
+    Returns:
+        NumericBackend: The fraction backend.
+    """
+    from fractions import Fraction
+
+    return NumericBackend(
+        "fraction", Fraction, add, sub, mul, truediv, None, _fraction_json
+    )
+
+
+def int_backend() -> NumericBackend:
+    """
+    Creates an integer backend, which parses only whole numbers such as "42".
+
+    Sums, differences and products are Python integers. Quotients are integers when the
+    division is exact and fractions.Fraction otherwise, so no result is ever rounded.
+
+    Returns:
+        NumericBackend: The int backend.
+    """
+    from fractions import Fraction
+
+    def true_divide(a: int, b: int):
+        quotient, remainder = divmod(a, b)
+        return Fraction(a, b) if remainder else quotient
+
+    return NumericBackend("int", int, add, sub, mul, true_divide, None, _fraction_json)
+
+
+_FACTORIES = {
+    "float": float_backend,
+    "decimal": decimal_backend,
+    "fraction": fraction_backend,
+    "int": int_backend,
+}
+
+
+def get_backend(name: str = "float", **options) -> NumericBackend:
+    """
+    Creates a backend by name.
+
+    Args:
+        name (str): One of BACKENDS. Defaults to "float".
+        **options: Options of the backend, e.g. precision and rounding for "decimal".
+
+    Returns:
+        NumericBackend: The backend.
+
+    Raises:
+        ValueError: If name is not one of BACKENDS.
+    """
+    if name not in _FACTORIES:
+        raise ValueError(
+            f"Unknown numeric backend {name!r}; expected one of {BACKENDS}."
+        )
+    return _FACTORIES[name](**options)
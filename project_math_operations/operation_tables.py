@@ -0,0 +1,249 @@
+# operation_tables.py
+# This module computes operation tables: every value of one operand vector against every value of
+# another.
+
+# A table of n first operands and m second operands has n * m cells, in row-major order: cell
+# i * m + j holds the sum, difference, product and quotient of a[i] and b[j]. Instead of one call
+# per cell, the table is computed a tile at a time. A tile is a band of rows against a band of
+# columns: the row operands are broadcast by repeating each one across the columns of the tile,
+# the column operands by repeating the band, and the batch functions then compute the four
+# results of the whole tile in one call each. The default tile of 16 x 1024 cells keeps the
+# operands and results of a tile in about 1 MiB, within a typical L2 cache.
+#
+# Divisions by zero do not raise: the quotient of the cell is NaN and the cell is flagged, like
+# math_operations.divide_batch does.
+#
+# write_table stores the table in a binary result file (see binary_format) whose rows are the
+# cells, writing every tile straight into the memory-mapped file, so tables much larger than
+# memory only ever hold one tile in memory. render_table writes the text of every cell, in the
+# order of nested loops over a and b, and export_table writes the cells to an Arrow IPC file.
+
+from array import array
+from typing import Iterator, Sequence, TextIO, Tuple
+
+from arrow_format import ArrowWriter
+from binary_format import RESULT_COLUMNS, create_columns, little_endian
+from compressed_io import open_input
+from input_validation import split_tokens, validate_floats
+from print_operations import OperationsWriter
+from results import ResultBatch
+
+# Rows and columns of a tile.
+DEFAULT_TILE_ROWS = 16
+DEFAULT_TILE_COLUMNS = 1024
+
+
+def _as_floats(values: Sequence[float]) -> array:
+    # The operands as an array('d'), which can be repeated and sliced without copying floats.
+    if isinstance(values, array) and values.typecode == "d":
+        return values
+    return array("d", values)
+
+
+def iter_tiles(
+    a: Sequence[float],
+    b: Sequence[float],
+    tile_rows: int = DEFAULT_TILE_ROWS,
+    tile_columns: int = DEFAULT_TILE_COLUMNS,
+) -> Iterator[Tuple[int, int, int, int, ResultBatch]]:
+    """
+    Computes the operation table of two operand vectors a tile at a time.
+
+    Tiles are yielded band by band of rows, and from left to right within a band. When a tile
+    spans every column, or a single row, the tiles are therefore in the row-major order of
+    the table.
+
+    Args:
+        a (Sequence[float]): The first operands, one per row.
+        b (Sequence[float]): The second operands, one per column.
+        tile_rows (int): The number of rows of a tile.
+        tile_columns (int): The number of columns of a tile.
+
+    Yields:
+        tuple (int, int, int, int, ResultBatch): The first and past-the-end row and column of
+        the tile, and the results of its cells in row-major order.
+
+    Raises:
+        ValueError: If tile_rows or tile_columns is less than 1.
+    """
+    if tile_rows < 1 or tile_columns < 1:
+        raise ValueError("tile_rows and tile_columns must be at least 1.")
+    a, b = _as_floats(a), _as_floats(b)
+    for row_start in range(0, len(a), tile_rows):
+        rows = a[row_start : row_start + tile_rows]
+        for column_start in range(0, len(b), tile_columns):
+            columns = b[column_start : column_start + tile_columns]
+            # Broadcast: every row operand repeated across the columns, and the columns
+            # repeated for every row.
+            first = array("d")
+            for x in rows:
+                first += array("d", (x,)) * len(columns)
+            yield (
+                row_start,
+                row_start + len(rows),
+                column_start,
+                column_start + len(columns),
+                ResultBatch.compute(first, columns * len(rows)),
+            )
+
+
+def _store(targets, tile: Tuple[int, int, int, int, ResultBatch], width: int) -> None:
+    # Copies the columns of a tile into the row-major target columns of a table of width columns.
+    row_start, row_stop, column_start, column_stop, results = tile
+    tile_width = column_stop - column_start
+    sources = results.columns()
+    if tile_width == width:
+        # The tile spans whole rows, so it is one contiguous range of cells.
+        start, stop = row_start * width, row_stop * width
+        for target, source in zip(targets, sources):
+            target[start:stop] = source
+        return
+    for r, row in enumerate(range(row_start, row_stop)):
+        start = row * width + column_start
+        for target, source in zip(targets, sources):
+            target[start : start + tile_width] = source[
+                r * tile_width : (r + 1) * tile_width
+            ]
+
+
+def compute_table(
+    a: Sequence[float],
+    b: Sequence[float],
+    tile_rows: int = DEFAULT_TILE_ROWS,
+    tile_columns: int = DEFAULT_TILE_COLUMNS,
+) -> ResultBatch:
+    """
+    Computes the operation table of two operand vectors in memory.
+
+    Args:
+        a (Sequence[float]): The first operands, one per row.
+        b (Sequence[float]): The second operands, one per column.
+        tile_rows (int): The number of rows of a tile.
+        tile_columns (int): The number of columns of a tile.
+
+    Returns:
+        ResultBatch: The results of the len(a) * len(b) cells in row-major order.
+    """
+    cells = len(a) * len(b)
+    targets = [array("d", bytes(8 * cells)) for _ in range(6)] + [bytearray(cells)]
+    for tile in iter_tiles(a, b, tile_rows, tile_columns):
+        _store(targets, tile, len(b))
+    return ResultBatch(*targets)
+
+
+def write_table(
+    a: Sequence[float],
+    b: Sequence[float],
+    path: str,
+    tile_rows: int = DEFAULT_TILE_ROWS,
+    tile_columns: int = DEFAULT_TILE_COLUMNS,
+) -> int:
+    """
+    Computes the operation table of two operand vectors into a binary result file.
+
+    The file has the columns of binary_format.RESULT_COLUMNS and one row per cell, in
+    row-major order. Tiles are written straight into the memory-mapped file.
+
+    Args:
+        a (Sequence[float]): The first operands, one per row.
+        b (Sequence[float]): The second operands, one per column.
+        path (str): Path of the binary result file to write.
+        tile_rows (int): The number of rows of a tile.
+        tile_columns (int): The number of columns of a tile.
+
+    Returns:
+        int: The number of cells written.
+    """
+    with create_columns(path, RESULT_COLUMNS, len(a) * len(b)) as table:
+        targets = [table.columns[name] for name in RESULT_COLUMNS]
+        for tile in iter_tiles(a, b, tile_rows, tile_columns):
+            # The binary format stores the division errors as floats.
+            *results, zero_mask = tile[4].columns()
+            columns = [
+                little_endian(c) for c in results + [array("d", list(zero_mask))]
+            ]
+            tile = tile[:4] + (ResultBatch(*columns),)
+            _store(targets, tile, len(b))
+    return len(a) * len(b)
+
+
+def render_table(
+    a: Sequence[float],
+    b: Sequence[float],
+    outfile: TextIO,
+    fmt: str = "text",
+    tile_rows: int = DEFAULT_TILE_ROWS,
+    tile_columns: int = DEFAULT_TILE_COLUMNS,
+) -> int:
+    """
+    Writes the results of every cell of the operation table of two operand vectors as text,
+    in the same order as nested loops over a and b calling print_operations.
+
+    Args:
+        a (Sequence[float]): The first operands, one per row.
+        b (Sequence[float]): The second operands, one per column.
+        outfile (TextIO): The stream the results are written to.
+        fmt (str): The output format, one of print_operations.FORMATS. Defaults to "text".
+        tile_rows (int): The number of rows of a tile, when a tile spans every column.
+        tile_columns (int): The number of columns of a tile.
+
+    Returns:
+        int: The number of cells written.
+    """
+    if len(b) > tile_columns:
+        # Tiles narrower than the table are only in row-major order one row at a time.
+        tile_rows = 1
+    with OperationsWriter(outfile, fmt) as writer:
+        for tile in iter_tiles(a, b, tile_rows, tile_columns):
+            writer.write_results(tile[4])
+    return len(a) * len(b)
+
+
+def export_table(
+    a: Sequence[float],
+    b: Sequence[float],
+    path: str,
+    tile_rows: int = DEFAULT_TILE_ROWS,
+    tile_columns: int = DEFAULT_TILE_COLUMNS,
+) -> int:
+    """
+    Computes the operation table of two operand vectors into an Arrow IPC file (see
+    arrow_format), one record batch per tile, in row-major order.
+
+    Args:
+        a (Sequence[float]): The first operands, one per row.
+        b (Sequence[float]): The second operands, one per column.
+        path (str): Path of the Arrow IPC file to write.
+        tile_rows (int): The number of rows of a tile, when a tile spans every column.
+        tile_columns (int): The number of columns of a tile.
+
+    Returns:
+        int: The number of cells written.
+    """
+    if len(b) > tile_columns:
+        # Tiles narrower than the table are only in row-major order one row at a time.
+        tile_rows = 1
+    with open(path, "wb") as outfile, ArrowWriter(outfile) as writer:
+        for tile in iter_tiles(a, b, tile_rows, tile_columns):
+            writer.write_results(tile[4])
+    return len(a) * len(b)
+
+
+def read_operands(path: str) -> Tuple[array, int]:
+    """
+    Reads an operand vector from a text file of numbers separated by whitespace or commas.
+
+    Args:
+        path (str): Path of the file, which may be gzip, bz2 or xz compressed.
+
+    Returns:
+        tuple (array, int): The valid numbers as an array('d'), and the number of invalid
+        tokens that were skipped.
+    """
+    with open_input(path, "rb") as f:
+        tokens = split_tokens(f.read())
+    values, valid = validate_floats(tokens)
+    skipped = valid.count(0)
+    if skipped:
+        values = array("d", (x for x, ok in zip(values, valid) if ok))
+    return values, skipped
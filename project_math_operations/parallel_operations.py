@@ -0,0 +1,178 @@
+# parallel_operations.py
+# This module evaluates the four math operations over large operand arrays on several CPU cores.
+
+# The operands are split into shards that worker processes evaluate with the batch functions from
+# math_operations. Operands and results live in one shared memory block, so nothing but the shard
+# bounds is pickled, and every shard writes to its own index range, which keeps the output order
+# identical to the input order.
+
+from __future__ import annotations
+
+import os
+from array import array
+from contextlib import ExitStack
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+from math_operations import add_batch, subtract_batch, multiply_batch, divide_batch
+
+# For type checkers only, as in input_validation.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Optional, Sequence, Tuple
+
+# Layout of the shared memory block: six float64 columns followed by the zero-divisor mask.
+_A, _B, _SUM, _DIFFERENCE, _PRODUCT, _QUOTIENT = range(6)
+_FLOAT_COLUMNS = 6
+_ITEM_SIZE = 8
+
+# Number of shards created per worker when no chunk size is given.
+SHARDS_PER_WORKER = 4
+
+
+def _open_columns(stack: ExitStack, buf: memoryview, n: int) -> List[memoryview]:
+    """
+    Returns views of the float columns and the mask stored in a shared memory block.
+
+    The views are registered with stack, so they are released before the block is closed.
+
+    Args:
+        stack (ExitStack): The exit stack that releases the views.
+        buf (memoryview): The buffer of the shared memory block.
+        n (int): The number of operand pairs.
+
+    Returns:
+        list of memoryview: Six float views followed by a byte view of the mask.
+    """
+    columns = []
+    for i in range(_FLOAT_COLUMNS):
+        raw = stack.enter_context(buf[i * n * _ITEM_SIZE : (i + 1) * n * _ITEM_SIZE])
+        columns.append(stack.enter_context(raw.cast("d")))
+    offset = _FLOAT_COLUMNS * n * _ITEM_SIZE
+    columns.append(stack.enter_context(buf[offset : offset + n]))
+    return columns
+
+
+def _to_array(column: memoryview) -> array:
+    """
+    Copies a float column out of a shared memory block.
+
+    Args:
+        column (memoryview): A float view returned by _open_columns.
+
+    Returns:
+        array: An array('d') holding the same numbers.
+    """
+    result = array("d")
+    with column.cast("B") as raw:
+        result.frombytes(raw)
+    return result
+
+
+def _evaluate_shard(task: Tuple[str, int, int, int]) -> None:
+    """
+    Evaluates one shard of a shared memory block inside a worker process.
+
+    Args:
+        task (tuple): The shared memory name, the number of pairs, and the start and stop
+            indices of the shard.
+    """
+    name, n, start, stop = task
+    shm = SharedMemory(name=name)
+    try:
+        with ExitStack() as stack:
+            columns = _open_columns(stack, shm.buf, n)
+            a = stack.enter_context(columns[_A][start:stop])
+            b = stack.enter_context(columns[_B][start:stop])
+            columns[_SUM][start:stop] = add_batch(a, b)
+            columns[_DIFFERENCE][start:stop] = subtract_batch(a, b)
+            columns[_PRODUCT][start:stop] = multiply_batch(a, b)
+            quotients, zero_mask = divide_batch(a, b)
+            columns[_QUOTIENT][start:stop] = quotients
+            columns[-1][start:stop] = zero_mask
+    finally:
+        shm.close()
+
+
+def shard_bounds(n: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits the indices 0 to n into consecutive shards.
+
+    Args:
+        n (int): The number of items.
+        chunk_size (int): The largest number of items per shard.
+
+    Returns:
+        list of tuple: The start and stop index of every shard, in order.
+    """
+    return [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+
+
+def evaluate_parallel(
+    a: Sequence[float],
+    b: Sequence[float],
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Tuple[array, array, array, array, bytearray]:
+    """
+    Evaluates the four operations on two sequences of numbers in a pool of worker processes.
+
+    The results are the same as those of the batch functions in math_operations, in the
+    same order as the operands.
+
+    Args:
+        a (Sequence[float]): The first numbers.
+        b (Sequence[float]): The second numbers.
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int, optional): The number of pairs per shard. Defaults to splitting the
+            operands into SHARDS_PER_WORKER shards per worker.
+
+    Returns:
+        tuple: Arrays('d') of the sums, differences, products and quotients, and the mask of
+        zero divisors, as returned by divide_batch.
+
+    Raises:
+        ValueError: If the sequences have different lengths, or workers or chunk_size is less than 1.
+    """
+    if len(a) != len(b):
+        raise ValueError(
+            f"Operand sequences must have the same length ({len(a)} != {len(b)})."
+        )
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    n = len(a)
+    if chunk_size is None:
+        chunk_size = max(1, -(-n // (workers * SHARDS_PER_WORKER)))
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    if n == 0:
+        return array("d"), array("d"), array("d"), array("d"), bytearray()
+
+    shm = SharedMemory(create=True, size=n * (_FLOAT_COLUMNS * _ITEM_SIZE + 1))
+    try:
+        with ExitStack() as stack:
+            columns = _open_columns(stack, shm.buf, n)
+            columns[_A][:] = (
+                a if isinstance(a, array) and a.typecode == "d" else array("d", a)
+            )
+            columns[_B][:] = (
+                b if isinstance(b, array) and b.typecode == "d" else array("d", b)
+            )
+            tasks = [
+                (shm.name, n, start, stop)
+                for start, stop in shard_bounds(n, chunk_size)
+            ]
+            with Pool(min(workers, len(tasks))) as pool:
+                pool.map(_evaluate_shard, tasks, chunksize=1)
+            return (
+                _to_array(columns[_SUM]),
+                _to_array(columns[_DIFFERENCE]),
+                _to_array(columns[_PRODUCT]),
+                _to_array(columns[_QUOTIENT]),
+                bytearray(columns[-1]),
+            )
+    finally:
+        shm.close()
+        shm.unlink()
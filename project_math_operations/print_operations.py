@@ -1,36 +1,348 @@
-# print_operations.py
-# This module uses functions from math_operations to perform and print the results.
-
-# Import math operations from the same source directory
-from math_operations import add, subtract, multiply, divide
-
-
-def print_operations(a: float, b: float) -> None:
-    """
-    Prints the results of various mathematical operations on two numbers.
-
-    This function uses the math_operations module to perform basic arithmetic
-    operations (addition, subtraction, multiplication, and division) on two
-    numbers and then prints the results.
-
-    Args:
-        a (float): The first number.
-        b (float): The second number.
-
-    Returns:
-        None
-    """
-    # Printing the sum of a and b
-    print(f"The sum of {a} and {b} is {add(a, b)}")
-
-    # Printing the difference between a and b
-    print(f"The difference between {a} and {b} is {subtract(a, b)}")
-
-    # Printing the product of a and b
-    print(f"The product of {a} and {b} is {multiply(a, b)}")
-
-    # Printing the division result of a by b. If b is zero, it prints an error message from the divide function.
-    try:
-        print(f"The division of {a} by {b} results in {divide(a, b)}")
-    except ZeroDivisionError as e:
-        print(e)
+# print_operations.py
+# This module uses functions from math_operations to perform and print the results.
+
+# Results are rendered with precompiled templates, one per output format, and can be written
+# in large blocks through OperationsWriter instead of one print call per line. Batches of results
+# are computed into the columns of a results.ResultBatch and only formatted when rendered.
+
+from __future__ import annotations
+
+from math import isfinite
+
+# Import math operations from the same source directory
+from math_operations import (
+    ZERO_DIVISION_MESSAGE,
+    add,
+    subtract,
+    multiply,
+    divide,
+)
+from results import ResultBatch
+
+# For type checkers only, as in math_operations.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator, Sequence, TextIO
+
+    from results import OperationResult
+
+# Output formats understood by render_pair and OperationsWriter.
+# "text" is the human readable text printed by print_operations.
+FORMATS = ("text", "csv", "jsonl")
+
+# Number of characters OperationsWriter collects before writing them to its stream.
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+CSV_HEADER = "a,b,sum,difference,product,quotient,division_error\n"
+
+# Precompiled templates. Each one renders every line of a pair with a single format call.
+_TEXT_LINES = (
+    "The sum of {0} and {1} is {2}\n"
+    "The difference between {0} and {1} is {3}\n"
+    "The product of {0} and {1} is {4}\n"
+)
+_TEXT = (_TEXT_LINES + "The division of {0} by {1} results in {5}\n").format
+_TEXT_ZERO = (_TEXT_LINES + ZERO_DIVISION_MESSAGE + "\n").format
+_CSV = "{0},{1},{2},{3},{4},{5},0\n".format
+_CSV_ZERO = "{0},{1},{2},{3},{4},,1\n".format
+_JSON_LINES = '{{"a": {0}, "b": {1}, "sum": {2}, "difference": {3}, "product": {4}, '
+_JSONL = (_JSON_LINES + '"quotient": {5}, "division_error": false}}\n').format
+_JSONL_ZERO = (_JSON_LINES + '"quotient": null, "division_error": true}}\n').format
+
+
+def _json_number(x: float) -> str:
+    """
+    Formats a number as a JSON value, spelling non-finite floats the way the json module does.
+
+    Args:
+        x (float): The number to format.
+
+    Returns:
+        str: The JSON text of the number.
+    """
+    if isfinite(x):
+        return repr(x)
+    if x != x:
+        return "NaN"
+    return "Infinity" if x > 0 else "-Infinity"
+
+
+def _text_row(a, b, s, d, p, q, zero):
+    return _TEXT_ZERO(a, b, s, d, p) if zero else _TEXT(a, b, s, d, p, q)
+
+
+def _csv_row(a, b, s, d, p, q, zero):
+    return _CSV_ZERO(a, b, s, d, p) if zero else _CSV(a, b, s, d, p, q)
+
+
+def _jsonl_row(a, b, s, d, p, q, zero, n=_json_number):
+    if zero:
+        return _JSONL_ZERO(n(a), n(b), n(s), n(d), n(p))
+    return _JSONL(n(a), n(b), n(s), n(d), n(p), n(q))
+
+
+# Row renderers take the operands, the four results and the zero-divisor flag of one pair.
+_ROW_RENDERERS = {"text": _text_row, "csv": _csv_row, "jsonl": _jsonl_row}
+_HEADERS = {"text": "", "csv": CSV_HEADER, "jsonl": ""}
+
+
+def _check_format(fmt: str) -> None:
+    """
+    Ensures the given output format is supported.
+
+    Args:
+        fmt (str): The output format name.
+
+    Raises:
+        ValueError: If fmt is not one of FORMATS.
+    """
+    if fmt not in _ROW_RENDERERS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {FORMATS}.")
+
+
+def _row_renderer(fmt: str, backend=None):
+    # JSON lines of a numeric backend format their numbers with the json_number of the backend.
+    if fmt == "jsonl" and backend is not None and backend.json_number is not None:
+        n = backend.json_number
+        return lambda a, b, s, d, p, q, zero: _jsonl_row(a, b, s, d, p, q, zero, n)
+    return _ROW_RENDERERS[fmt]
+
+
+def render_pair(a: float, b: float, fmt: str = "text", backend=None) -> str:
+    """
+    Renders the results of the four operations on two numbers.
+
+    Args:
+        a (float): The first number.
+        b (float): The second number.
+        fmt (str): One of FORMATS. Defaults to "text".
+        backend (NumericBackend, optional): The numeric backend computing the results, see
+            numeric_backends. Defaults to the float functions of math_operations.
+
+    Returns:
+        str: The rendered results, ending with a newline.
+    """
+    _check_format(fmt)
+    if backend is not None:
+        return _render_with(backend, a, b, fmt)
+    try:
+        quotient, zero = divide(a, b), False
+    except ZeroDivisionError:
+        quotient, zero = None, True
+    return _ROW_RENDERERS[fmt](
+        a, b, add(a, b), subtract(a, b), multiply(a, b), quotient, zero
+    )
+
+
+def _render_with(backend, a, b, fmt: str) -> str:
+    # render_pair with the scalar operations of a numeric backend.
+    try:
+        quotient, zero = backend.divide(a, b), False
+    except ZeroDivisionError:
+        quotient, zero = None, True
+    return _row_renderer(fmt, backend)(
+        a,
+        b,
+        backend.add(a, b),
+        backend.subtract(a, b),
+        backend.multiply(a, b),
+        quotient,
+        zero,
+    )
+
+
+def render_result(result: OperationResult, fmt: str = "text", backend=None) -> str:
+    """
+    Renders a result record.
+
+    Args:
+        result (OperationResult): The operands and results of one pair.
+        fmt (str): One of FORMATS. Defaults to "text".
+        backend (NumericBackend, optional): The numeric backend that computed the result,
+            used to format JSON numbers.
+
+    Returns:
+        str: The rendered result, ending with a newline.
+    """
+    _check_format(fmt)
+    return _row_renderer(fmt, backend)(*result)
+
+
+def iter_rendered(
+    results: ResultBatch, fmt: str = "text", backend=None
+) -> Iterator[str]:
+    """
+    Renders a batch of results one pair at a time, as the rows are consumed.
+
+    Args:
+        results (ResultBatch): The operands and results of many pairs.
+        fmt (str): One of FORMATS. Defaults to "text".
+        backend (NumericBackend, optional): The numeric backend that computed the results,
+            used to format JSON numbers.
+
+    Returns:
+        Iterator[str]: The rendered results of every pair, without a header.
+    """
+    _check_format(fmt)
+    return map(_row_renderer(fmt, backend), *results.columns())
+
+
+def render_results(results: ResultBatch, fmt: str = "text", backend=None) -> str:
+    """
+    Renders a batch of results.
+
+    Args:
+        results (ResultBatch): The operands and results of many pairs.
+        fmt (str): One of FORMATS. Defaults to "text".
+        backend (NumericBackend, optional): The numeric backend that computed the results,
+            used to format JSON numbers.
+
+    Returns:
+        str: The rendered results of every pair, without a header.
+    """
+    return "".join(iter_rendered(results, fmt, backend))
+
+
+def render_batch(
+    a: Sequence[float], b: Sequence[float], fmt: str = "text", backend=None
+) -> str:
+    """
+    Renders the results of the four operations on two sequences of numbers.
+
+    The results are computed with the batch functions of math_operations, so they are floats
+    even when the operands are integers, unless a numeric backend is given.
+
+    Args:
+        a (Sequence[float]): The first numbers.
+        b (Sequence[float]): The second numbers.
+        fmt (str): One of FORMATS. Defaults to "text".
+        backend (NumericBackend, optional): The numeric backend computing the results, see
+            numeric_backends. Defaults to the batch functions of math_operations.
+
+    Returns:
+        str: The rendered results of every pair, without a header.
+    """
+    _check_format(fmt)
+    return render_results(ResultBatch.compute(a, b, backend), fmt, backend)
+
+
+class OperationsWriter:
+    """
+    Writes the results of the four operations to a text stream in large blocks.
+
+    Rendered results are collected in a buffer that is written to the stream once it holds
+    buffer_size characters, when flush is called, or when the writer is used as a context
+    manager and the block exits. The CSV format starts with a header line.
+
+    Args:
+        stream (TextIO): The stream the results are written to.
+        fmt (str): One of FORMATS. Defaults to "text".
+        buffer_size (int): The number of characters buffered before writing.
+        backend (NumericBackend, optional): The numeric backend computing the results, see
+            numeric_backends. Defaults to the float functions of math_operations.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        fmt: str = "text",
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        backend=None,
+    ):
+        _check_format(fmt)
+        self.stream = stream
+        self.format = fmt
+        self.buffer_size = buffer_size
+        self.backend = backend
+        self._buffer = []
+        self._buffered = 0
+        self._pending_header = _HEADERS[fmt]
+
+    def _append(self, text: str) -> None:
+        if self._pending_header:
+            text = self._pending_header + text
+            self._pending_header = ""
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def write_pair(self, a: float, b: float) -> None:
+        """
+        Buffers the results of the four operations on two numbers.
+
+        Args:
+            a (float): The first number.
+            b (float): The second number.
+        """
+        self._append(render_pair(a, b, self.format, self.backend))
+
+    def write_batch(self, a: Sequence[float], b: Sequence[float]) -> None:
+        """
+        Buffers the results of the four operations on two sequences of numbers.
+
+        Args:
+            a (Sequence[float]): The first numbers.
+            b (Sequence[float]): The second numbers.
+        """
+        self._append(render_batch(a, b, self.format, self.backend))
+
+    def write_results(self, results: ResultBatch) -> None:
+        """
+        Buffers a batch of results that is already computed.
+
+        Args:
+            results (ResultBatch): The operands and results of many pairs.
+        """
+        self._append(render_results(results, self.format, self.backend))
+
+    def write_text(self, text: str) -> None:
+        """
+        Buffers results that are already rendered in the format of the writer, e.g. results
+        kept in a cache.
+
+        Args:
+            text (str): The rendered results, without a header.
+        """
+        self._append(text)
+
+    def flush(self) -> None:
+        """
+        Writes everything buffered so far to the stream.
+        """
+        if self._pending_header:
+            self._append("")
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+
+def print_operations(a: float, b: float, backend=None, file=None) -> None:
+    """
+    Prints the results of various mathematical operations on two numbers.
+
+    This function uses the math_operations module to perform basic arithmetic
+    operations (addition, subtraction, multiplication, and division) on two
+    numbers and then prints the results.
+
+    Args:
+        a (float): The first number.
+        b (float): The second number.
+        backend (NumericBackend, optional): The numeric backend computing the results, see
+            numeric_backends. Defaults to the float functions of math_operations.
+        file (TextIO, optional): The stream to print to. Defaults to sys.stdout. Threads
+            should each print to their own stream, see concurrent_operations.
+
+    Returns:
+        None
+    """
+    # The four lines (sum, difference, product and division, or the error message of the
+    # divide function if b is zero) are rendered together and printed with a single call.
+    print(render_pair(a, b, backend=backend), end="", file=file)
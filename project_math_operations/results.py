@@ -0,0 +1,251 @@
+# results.py
+# This module holds the results of the four math operations in compact records.
+
+# A single result is an OperationResult, a record with __slots__ and no per-instance dictionary.
+# The results of many pairs are a ResultBatch, which keeps one column per field instead of one
+# object per pair: the operands and the four results in array('d') columns of 8 bytes per value,
+# and the division errors in a bytearray of 1 byte per pair. A million pairs take 49 MB as a
+# ResultBatch, operands included, against about 250 MB as tuples of floats and 390 MB as text.
+#
+# Nothing is rendered here. The renderers of print_operations format a batch a row at a time,
+# when the text is needed, and indexing a batch only creates an OperationResult for that row.
+
+from __future__ import annotations
+
+from math_operations import (
+    add,
+    subtract,
+    multiply,
+    divide,
+    add_batch,
+    subtract_batch,
+    multiply_batch,
+    divide_batch,
+)
+
+# For type checkers only, as in math_operations.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator, Sequence
+
+# Names of the fields of a result, in the order the row renderers of print_operations take them.
+FIELDS = ("a", "b", "sum", "difference", "product", "quotient", "division_error")
+
+
+class OperationResult:
+    """
+    The operands and the results of the four operations on one pair of numbers.
+
+    Iterating over a result yields its fields in the order of FIELDS.
+
+    Attributes:
+        a (float): The first number.
+        b (float): The second number.
+        sum (float): The sum of a and b.
+        difference (float): The difference between a and b.
+        product (float): The product of a and b.
+        quotient (float or None): The quotient of a divided by b, or None if b is zero.
+        division_error (bool): True if b is zero.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        a: float,
+        b: float,
+        sum: float,
+        difference: float,
+        product: float,
+        quotient: float = None,
+        division_error: bool = False,
+    ):
+        self.a = a
+        self.b = b
+        self.sum = sum
+        self.difference = difference
+        self.product = product
+        self.quotient = quotient
+        self.division_error = division_error
+
+    @classmethod
+    def compute(cls, a: float, b: float, backend=None) -> OperationResult:
+        """
+        Computes the four operations on two numbers.
+
+        Args:
+            a (float): The first number.
+            b (float): The second number.
+            backend (NumericBackend, optional): The numeric backend computing the results, see
+                numeric_backends. Defaults to the float functions of math_operations.
+
+        Returns:
+            OperationResult: The results.
+        """
+        divide_ = divide if backend is None else backend.divide
+        try:
+            quotient, zero = divide_(a, b), False
+        except ZeroDivisionError:
+            quotient, zero = None, True
+        if backend is None:
+            return cls(a, b, add(a, b), subtract(a, b), multiply(a, b), quotient, zero)
+        return cls(
+            a,
+            b,
+            backend.add(a, b),
+            backend.subtract(a, b),
+            backend.multiply(a, b),
+            quotient,
+            zero,
+        )
+
+    def __iter__(self):
+        return iter(
+            (
+                self.a,
+                self.b,
+                self.sum,
+                self.difference,
+                self.product,
+                self.quotient,
+                self.division_error,
+            )
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, OperationResult):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(FIELDS, self))
+        return f"OperationResult({fields})"
+
+
+class ResultBatch:
+    """
+    The operands and the results of the four operations on many pairs, one column per field.
+
+    With the float functions of math_operations every column of numbers is an array('d');
+    with another numeric backend they are lists. The quotient of a pair whose divisor is zero
+    is stored as NaN (or the fill of the backend) and flagged in division_errors.
+
+    Attributes:
+        a (Sequence[float]): The first numbers.
+        b (Sequence[float]): The second numbers.
+        sums, differences, products, quotients (Sequence[float]): The results.
+        division_errors (bytearray): 1 for every pair whose divisor is zero, 0 otherwise.
+    """
+
+    __slots__ = (
+        "a",
+        "b",
+        "sums",
+        "differences",
+        "products",
+        "quotients",
+        "division_errors",
+    )
+
+    def __init__(self, a, b, sums, differences, products, quotients, division_errors):
+        self.a = a
+        self.b = b
+        self.sums = sums
+        self.differences = differences
+        self.products = products
+        self.quotients = quotients
+        self.division_errors = division_errors
+
+    @classmethod
+    def compute(
+        cls, a: Sequence[float], b: Sequence[float], backend=None
+    ) -> ResultBatch:
+        """
+        Computes the four operations on two sequences of numbers with the batch functions.
+
+        Args:
+            a (Sequence[float]): The first numbers.
+            b (Sequence[float]): The second numbers.
+            backend (NumericBackend, optional): The numeric backend computing the results, see
+                numeric_backends. Defaults to the batch functions of math_operations.
+
+        Returns:
+            ResultBatch: The results of every pair.
+        """
+        if backend is None:
+            quotients, division_errors = divide_batch(a, b)
+            return cls(
+                a,
+                b,
+                add_batch(a, b),
+                subtract_batch(a, b),
+                multiply_batch(a, b),
+                quotients,
+                division_errors,
+            )
+        quotients, division_errors = backend.divide_batch(a, b)
+        return cls(
+            a,
+            b,
+            backend.add_batch(a, b),
+            backend.subtract_batch(a, b),
+            backend.multiply_batch(a, b),
+            quotients,
+            division_errors,
+        )
+
+    def columns(self) -> tuple:
+        """
+        Returns the columns in the order of FIELDS, e.g. to map a row renderer over them.
+
+        Returns:
+            tuple: The seven columns of the batch.
+        """
+        return (
+            self.a,
+            self.b,
+            self.sums,
+            self.differences,
+            self.products,
+            self.quotients,
+            self.division_errors,
+        )
+
+    def __len__(self):
+        return len(self.division_errors)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResultBatch(*(column[index] for column in self.columns()))
+        zero = bool(self.division_errors[index])
+        return OperationResult(
+            self.a[index],
+            self.b[index],
+            self.sums[index],
+            self.differences[index],
+            self.products[index],
+            None if zero else self.quotients[index],
+            zero,
+        )
+
+    def __iter__(self) -> Iterator[OperationResult]:
+        for row in zip(*self.columns()):
+            if row[6]:
+                yield OperationResult(*row[:5], None, True)
+            else:
+                yield OperationResult(*row[:6], False)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        int: The size of the columns in bytes, or 0 if they are not arrays.
+        """
+        try:
+            return sum(
+                len(column) * column.itemsize for column in self.columns()[:6]
+            ) + len(self.division_errors)
+        except AttributeError:
+            return 0
+
+    def __repr__(self):
+        return f"<ResultBatch of {len(self)} pairs>"
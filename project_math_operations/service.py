@@ -0,0 +1,180 @@
+# service.py
+# This module serves the math operations to other processes over a TCP or Unix socket.
+
+# Protocol: the client sends one request per line, "<operation> <a> <b>\n", where operation is
+# add, subtract, multiply, divide or print. Requests can be pipelined; responses come back in
+# request order:
+#   "ok <result>\n"               for add, subtract, multiply and divide
+#   "ok <n>\n" followed by n lines for print, holding the text print_operations prints
+#   "error <message>\n"           for a malformed request or a division by zero
+#
+# Every burst of requests that arrives together is parsed and computed as one batch with the
+# bulk validator and the batch functions. When the client does not read its responses fast
+# enough, the server stops reading requests until the responses are drained.
+
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from input_validation import INVALID_INPUT_MESSAGE, validate_floats
+from math_operations import (
+    ZERO_DIVISION_MESSAGE,
+    add_batch,
+    subtract_batch,
+    multiply_batch,
+    divide_batch,
+)
+from print_operations import render_batch
+
+OPERATIONS = ("add", "subtract", "multiply", "divide", "print")
+
+# Longest request line accepted. Longer lines close the connection.
+MAX_LINE_LENGTH = 4096
+
+# Write buffer limits of a connection; reading pauses above the high mark.
+WRITE_BUFFER_HIGH = 1 << 20
+WRITE_BUFFER_LOW = 1 << 18
+
+_BATCH_FUNCTIONS = {
+    "add": add_batch,
+    "subtract": subtract_batch,
+    "multiply": multiply_batch,
+}
+
+
+def handle_requests(lines: List[bytes]) -> bytes:
+    """
+    Computes the responses to a batch of request lines.
+
+    Args:
+        lines (list of bytes): Request lines without their line endings.
+
+    Returns:
+        bytes: The responses, one per request, in request order.
+    """
+    requests = [line.decode("utf-8", "replace").split() for line in lines]
+    well_formed = [len(request) == 3 for request in requests]
+    a, a_valid = validate_floats(
+        [r[1] if ok else "" for r, ok in zip(requests, well_formed)]
+    )
+    b, b_valid = validate_floats(
+        [r[2] if ok else "" for r, ok in zip(requests, well_formed)]
+    )
+
+    responses: List[Optional[str]] = [None] * len(requests)
+    groups: Dict[str, List[int]] = {}
+    for i, request in enumerate(requests):
+        if not well_formed[i]:
+            responses[i] = "error expected '<operation> <a> <b>'\n"
+        elif request[0] not in OPERATIONS:
+            responses[i] = f"error unknown operation {request[0]!r}\n"
+        elif not (a_valid[i] and b_valid[i]):
+            responses[i] = f"error {INVALID_INPUT_MESSAGE}\n"
+        else:
+            groups.setdefault(request[0], []).append(i)
+
+    for operation, indices in groups.items():
+        group_a = [a[i] for i in indices]
+        group_b = [b[i] for i in indices]
+        if operation == "print":
+            lines_out = render_batch(group_a, group_b).splitlines(keepends=True)
+            for j, i in enumerate(indices):
+                responses[i] = "ok 4\n" + "".join(lines_out[4 * j : 4 * j + 4])
+        elif operation == "divide":
+            quotients, zero_mask = divide_batch(group_a, group_b)
+            for j, i in enumerate(indices):
+                responses[i] = (
+                    f"error {ZERO_DIVISION_MESSAGE}\n"
+                    if zero_mask[j]
+                    else f"ok {quotients[j]}\n"
+                )
+        else:
+            results = _BATCH_FUNCTIONS[operation](group_a, group_b)
+            for j, i in enumerate(indices):
+                responses[i] = f"ok {results[j]}\n"
+    return "".join(responses).encode("utf-8")
+
+
+class OperationsProtocol(asyncio.Protocol):
+    """
+    The server side of one client connection.
+    """
+
+    def __init__(self):
+        self.transport = None
+        self._pending = b""
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(WRITE_BUFFER_HIGH, WRITE_BUFFER_LOW)
+
+    def data_received(self, data: bytes):
+        data = self._pending + data
+        end = data.rfind(b"\n")
+        if end < 0:
+            self._pending = data
+        else:
+            self._pending = data[end + 1 :]
+            lines = data[:end].split(b"\n")
+            self.transport.write(
+                handle_requests([line.rstrip(b"\r") for line in lines])
+            )
+        if len(self._pending) > MAX_LINE_LENGTH:
+            self.transport.write(b"error request line too long\n")
+            self.transport.close()
+
+    def pause_writing(self):
+        # Backpressure: stop reading requests until the client has read the responses.
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+
+async def start_server(address: str) -> asyncio.AbstractServer:
+    """
+    Starts serving on a TCP address or a Unix socket.
+
+    Args:
+        address (str): "host:port" for TCP, with an IPv6 host in brackets as in "[::1]:8765",
+            or a filesystem path for a Unix socket.
+
+    Returns:
+        asyncio.AbstractServer: The running server.
+    """
+    loop = asyncio.get_running_loop()
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit() and os.sep not in address:
+        if host.startswith("[") and host.endswith("]"):
+            host = host[1:-1]
+        return await loop.create_server(
+            OperationsProtocol, host or "127.0.0.1", int(port)
+        )
+    return await loop.create_unix_server(OperationsProtocol, address)
+
+
+async def serve_forever(address: str) -> None:
+    """
+    Serves on a TCP address or a Unix socket until cancelled.
+
+    Args:
+        address (str): "host:port" for TCP, with an IPv6 host in brackets as in "[::1]:8765",
+            or a filesystem path for a Unix socket.
+    """
+    server = await start_server(address)
+    async with server:
+        await server.serve_forever()
+
+
+def serve(address: str) -> None:
+    """
+    Runs the server on a TCP address or a Unix socket until interrupted.
+
+    Args:
+        address (str): "host:port" for TCP, with an IPv6 host in brackets as in "[::1]:8765",
+            or a filesystem path for a Unix socket.
+    """
+    try:
+        asyncio.run(serve_forever(address))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,137 @@
+# stream_operations.py
+# This module evaluates the four math operations over a file of operand pairs.
+
+# Input is read in chunks of lines and every chunk is computed with the batch functions from
+# math_operations and written through an OperationsWriter, so memory use stays bounded no matter
+# how large the input file is.
+# Each line holds one pair, separated by a comma or whitespace (e.g. "5,3" or "5 3").
+# Blank lines are ignored; lines that do not hold exactly two valid numbers are skipped and counted.
+
+from __future__ import annotations
+
+from array import array
+from itertools import compress, islice
+from operator import and_
+
+from input_validation import validate_floats, validate_numbers
+from print_operations import OperationsWriter
+
+# For type checkers only, as in math_operations.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterable, TextIO, Tuple
+
+# Number of input lines evaluated per chunk.
+DEFAULT_CHUNK_SIZE = 65536
+
+# Buffer size used for the input and output files opened by evaluate_file.
+IO_BUFFER_SIZE = 1 << 20
+
+
+def parse_pairs(lines: Iterable[str], parse=float) -> Tuple[array, array, int]:
+    """
+    Parses lines of operand pairs into two arrays of floats.
+
+    Args:
+        lines (Iterable[str]): Lines of text, each holding two numbers separated by a comma or whitespace.
+        parse (callable): Converts a string to a number, raising ValueError if it cannot,
+            e.g. the parse function of a numeric backend. Defaults to float.
+
+    Returns:
+        tuple (array, array, int): The first numbers, the second numbers, and the number of
+        non-blank lines that were skipped because they were not a valid pair. With another
+        parser than float, the numbers are returned in lists.
+    """
+    rows = [line.replace(",", " ").split() for line in lines]
+    pairs = [row for row in rows if len(row) == 2]
+    skipped = len(rows) - rows.count([]) - len(pairs)
+    first, first_valid = validate_numbers([row[0] for row in pairs], parse)
+    second, second_valid = validate_numbers([row[1] for row in pairs], parse)
+    if first_valid.count(0) or second_valid.count(0):
+        valid = bytes(map(and_, first_valid, second_valid))
+        if parse is float:
+            first = array("d", compress(first, valid))
+            second = array("d", compress(second, valid))
+        else:
+            first = list(compress(first, valid))
+            second = list(compress(second, valid))
+        skipped += len(valid) - len(first)
+    return first, second, skipped
+
+
+def evaluate_stream(
+    infile: TextIO,
+    outfile: TextIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fmt: str = "text",
+    backend=None,
+    evaluate=None,
+) -> Tuple[int, int]:
+    """
+    Evaluates every operand pair read from infile and writes the results to outfile.
+
+    Args:
+        infile (TextIO): A text stream with one operand pair per line.
+        outfile (TextIO): A text stream the results are written to.
+        chunk_size (int): The number of lines read and evaluated at a time.
+        fmt (str): The output format, one of print_operations.FORMATS. Defaults to "text".
+        backend (NumericBackend, optional): The numeric backend parsing the operands and
+            computing the results, see numeric_backends. Defaults to floats.
+        evaluate (callable, optional): Computes the ResultBatch of the operands of a chunk,
+            e.g. a dispatcher.Dispatcher. Defaults to the batch functions.
+
+    Returns:
+        tuple (int, int): The number of pairs evaluated and the number of lines skipped.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    parse = float if backend is None else backend.parse
+    evaluated = skipped = 0
+    with OperationsWriter(outfile, fmt, backend=backend) as writer:
+        while True:
+            chunk = list(islice(infile, chunk_size))
+            if not chunk:
+                return evaluated, skipped
+            a, b, chunk_skipped = parse_pairs(chunk, parse)
+            skipped += chunk_skipped
+            if not a:
+                continue
+            if evaluate is None:
+                writer.write_batch(a, b)
+            else:
+                writer.write_results(evaluate(a, b))
+            evaluated += len(a)
+
+
+def evaluate_file(
+    input_path: str,
+    output_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fmt: str = "text",
+    backend=None,
+    evaluate=None,
+) -> Tuple[int, int]:
+    """
+    Evaluates every operand pair in a file and writes the results to another file.
+
+    Args:
+        input_path (str): Path of the CSV or newline-delimited file of operand pairs, which
+            may be gzip, bz2 or xz compressed.
+        output_path (str): Path of the file the results are written to, compressed if its
+            name ends with .gz, .bz2 or .xz.
+        chunk_size (int): The number of lines read and evaluated at a time.
+        fmt (str): The output format, one of print_operations.FORMATS. Defaults to "text".
+        backend (NumericBackend, optional): The numeric backend parsing the operands and
+            computing the results, see numeric_backends. Defaults to floats.
+        evaluate (callable, optional): Computes the ResultBatch of the operands of a chunk,
+            e.g. a dispatcher.Dispatcher. Defaults to the batch functions.
+
+    Returns:
+        tuple (int, int): The number of pairs evaluated and the number of lines skipped.
+    """
+    # Imported here, like main imports the modes, as the threads it brings are only needed
+    # for files.
+    from compressed_io import open_input, open_output
+
+    with open_input(input_path) as infile, open_output(output_path) as outfile:
+        return evaluate_stream(infile, outfile, chunk_size, fmt, backend, evaluate)
@@ -0,0 +1,173 @@
+# test_aggregates.py
+
+# This test module contains unit tests for the aggregates module.
+# Running statistics must match exact reference values, be numerically stable, and give the same
+# result whether a stream is aggregated at once, a value at a time, or in merged shards.
+
+import io
+import math
+import random
+import statistics
+import pytest
+from aggregates import OperationAggregates, RunningStats, aggregate_stream
+from math_operations import multiply
+
+
+def values(n=5000, seed=7):
+    """
+    Returns numbers of very different magnitudes.
+
+    Args:
+        n (int): The number of values.
+        seed (int): The random seed.
+
+    Returns:
+        list of float: The values.
+    """
+    rng = random.Random(seed)
+    return [rng.uniform(-1, 1) * 10 ** rng.randint(-8, 12) for _ in range(n)]
+
+
+def test_running_stats_match_reference():
+    """
+    Test the total, mean, variance, minimum and maximum against exact reference values.
+    """
+    xs = values()
+    stats = RunningStats()
+    stats.update_batch(xs[:1000])
+    for x in xs[1000:]:
+        stats.update(x)
+    assert stats.count == len(xs)
+    assert stats.total == math.fsum(xs)
+    assert stats.mean == pytest.approx(statistics.fmean(xs), rel=1e-12)
+    assert stats.variance == pytest.approx(statistics.pvariance(xs), rel=1e-12)
+    assert stats.sample_variance == pytest.approx(statistics.variance(xs), rel=1e-12)
+    assert (stats.minimum, stats.maximum) == (min(xs), max(xs))
+
+
+def test_compensated_sum_keeps_small_values():
+    """
+    Test that many small values added to a large one are not lost, unlike with sum().
+    """
+    stats = RunningStats()
+    stats.update(1e16)
+    for _ in range(10000):
+        stats.update(1.0)
+    assert sum([1e16] + [1.0] * 10000) == 1e16
+    assert stats.total == 1e16 + 10000
+
+
+def test_batch_sum_with_intermediate_overflow():
+    """
+    Test that a batch whose partial sums overflow, but whose total does not, keeps its total.
+    """
+    stats = RunningStats()
+    stats.update_batch([1e308, 1e308, -1e308])
+    assert stats.total == 1e308 and stats.mean == 1e308 / 3
+    stats.update_batch([1e308, 1e308])
+    assert stats.total == math.inf
+
+
+def test_batch_mean_when_the_total_overflows():
+    """
+    Test that a batch whose total overflows has the mean and variance of adding its values one
+    by one.
+    """
+    for values in ([1e308, 1e308], [1.5e308, 1.7e308, 1.6e308]):
+        batch, single = RunningStats(), RunningStats()
+        batch.update_batch(values)
+        for x in values:
+            single.update(x)
+        assert batch.total == single.total == math.inf
+        assert batch.mean == pytest.approx(single.mean, rel=1e-15)
+        assert math.isfinite(batch.mean)
+        assert batch.variance == pytest.approx(single.variance, rel=1e-12)
+
+
+@pytest.mark.parametrize(
+    "values", [[math.nan, 1.0, 2.0], [1.0, math.nan, 2.0], [1.0, 2.0, math.nan]]
+)
+def test_nan_extremes_do_not_depend_on_its_place(values):
+    """
+    Test that a NaN makes the minimum and maximum NaN wherever it is, whether the values are
+    added one by one, as a batch, or as merged shards.
+
+    Args:
+        values (list of float): Three values, one of them NaN.
+    """
+    single, batch, merged = RunningStats(), RunningStats(), RunningStats()
+    for x in values:
+        single.update(x)
+    batch.update_batch(values)
+    for x in values:
+        shard = RunningStats()
+        shard.update_batch([x])
+        merged.merge(shard)
+    for stats in (single, batch, merged):
+        assert math.isnan(stats.minimum) and math.isnan(stats.maximum)
+    clean = RunningStats()
+    clean.update_batch([1.0, 2.0])
+    assert (clean.minimum, clean.maximum) == (1.0, 2.0)
+
+
+def test_opposite_infinities_give_nan_totals():
+    """
+    Test that a batch holding inf and -inf gives a NaN total instead of raising.
+    """
+    totals = aggregate_stream(["inf,1\n", "-inf,1\n"])
+    summary = totals.summary()
+    assert summary["pairs"] == 2 and math.isnan(summary["sum"]["total"])
+    assert (summary["sum"]["minimum"], summary["sum"]["maximum"]) == (
+        -math.inf,
+        math.inf,
+    )
+
+
+def test_variance_is_stable_with_large_offset():
+    """
+    Test that a large common offset does not destroy the variance, as the naive formula does.
+    """
+    stats = RunningStats()
+    for x in (1e9 + 4, 1e9 + 7, 1e9 + 13, 1e9 + 16):
+        stats.update(x)
+    assert stats.variance == 22.5
+
+
+def test_merged_shards_match_single_pass():
+    """
+    Test that merging the states of shards, also through to_dict, gives the single-pass result.
+    """
+    rng = random.Random(3)
+    a = [rng.uniform(-1e6, 1e6) for _ in range(3000)]
+    b = [rng.choice([0.0, rng.uniform(-10, 10)]) for _ in range(3000)]
+    whole = OperationAggregates()
+    whole.update_batch(a, b)
+    merged = OperationAggregates()
+    for start in range(0, 3000, 700):
+        shard = OperationAggregates()
+        shard.update_batch(a[start : start + 700], b[start : start + 700])
+        merged.merge(OperationAggregates.from_dict(shard.to_dict()))
+    assert merged.pairs == whole.pairs == 3000
+    assert merged.zero_divisions == whole.zero_divisions == b.count(0.0)
+    for name, stats in whole.stats.items():
+        other = merged.stats[name]
+        assert other.count == stats.count
+        assert other.total == pytest.approx(stats.total, rel=1e-12)
+        assert other.variance == pytest.approx(stats.variance, rel=1e-9)
+        assert (other.minimum, other.maximum) == (stats.minimum, stats.maximum)
+    assert whole.stats["product"].total == math.fsum(map(multiply, a, b))
+
+
+def test_aggregate_stream():
+    """
+    Test aggregating a stream of lines, with a division by zero and a malformed line.
+    """
+    lines = io.StringIO("5,3\n\n2 0\nnot,a pair\n-1,4\n")
+    totals = aggregate_stream(lines, chunk_size=2)
+    assert (totals.pairs, totals.zero_divisions, totals.skipped) == (3, 1, 1)
+    summary = totals.summary()
+    assert summary["sum"]["total"] == 13.0
+    assert summary["difference"]["minimum"] == -5.0
+    assert summary["quotient"]["count"] == 2
+    assert summary["quotient"]["mean"] == pytest.approx((5 / 3 - 0.25) / 2)
+    assert "_m2" not in summary["product"]
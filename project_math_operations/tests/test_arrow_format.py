@@ -0,0 +1,151 @@
+# test_arrow_format.py
+
+# This test module contains unit tests for the arrow_format module.
+# An exported file must read back as exactly the results that were written, and must be a valid
+# Arrow IPC file for Arrow readers, when pyarrow is installed.
+
+import random
+from array import array
+import pytest
+from arrow_format import (
+    ArrowWriter,
+    _pack_bits,
+    _unpack_bits,
+    export_file,
+    is_arrow_file,
+    read_arrow,
+)
+from binary_format import convert_csv
+from operation_tables import compute_table, export_table
+from results import FIELDS, ResultBatch
+
+CSV_TEXT = "5,3\n5,0\nnot,a pair\n-1.5 0.25\n-0.0,-0.0\n"
+
+
+def results(n, seed=0):
+    """
+    Computes the results of random operand pairs, some with a zero divisor.
+
+    Args:
+        n (int): The number of pairs.
+        seed (int): The random seed.
+
+    Returns:
+        ResultBatch: The results.
+    """
+    rng = random.Random(seed)
+    a = array("d", (rng.uniform(-1e3, 1e3) for _ in range(n)))
+    b = array("d", (rng.choice([0.0, -0.0, rng.uniform(-9, 9)]) for _ in range(n)))
+    return ResultBatch.compute(a, b)
+
+
+def same_columns(x, y):
+    """
+    Tells whether two result batches hold the same bytes in every column, so that NaN and the
+    sign of zero are compared too.
+
+    Args:
+        x (ResultBatch): The first batch.
+        y (ResultBatch): The second batch.
+
+    Returns:
+        bool: True if every column is the same.
+    """
+    return [bytes(column) for column in x.columns()] == [
+        bytes(column) for column in y.columns()
+    ]
+
+
+@pytest.mark.parametrize("count", [0, 1, 7, 8, 9, 64, 1000])
+def test_bits_round_trip(count):
+    """
+    Test that flags packed into a bitmap, least significant bit first, unpack unchanged.
+    """
+    flags = bytearray(random.Random(count).choice([0, 1]) for _ in range(count))
+    bitmap = _pack_bits(flags)
+    assert len(bitmap) == (count + 7) // 8
+    assert all((bitmap[i // 8] >> (i % 8)) & 1 == flag for i, flag in enumerate(flags))
+    assert _unpack_bits(bitmap, count) == flags
+    assert _unpack_bits(_pack_bits(flags, invert=True), count) == bytearray(
+        1 - flag for flag in flags
+    )
+
+
+def test_round_trip(tmp_path):
+    """
+    Test that results written in several record batches read back unchanged and in order.
+    """
+    batch = results(3000)
+    path = str(tmp_path / "results.arrow")
+    with open(path, "wb") as f, ArrowWriter(f) as writer:
+        for start in range(0, 3000, 1234):
+            writer.write_results(batch[start : start + 1234])
+    assert writer.rows == 3000
+    assert is_arrow_file(path)
+    with open(path, "rb") as f:
+        assert f.read()[-6:] == b"ARROW1"
+    assert same_columns(read_arrow(path), batch)
+
+
+def test_export_text_and_binary_operands(tmp_path):
+    """
+    Test that a text operand file and its binary conversion export the same results.
+    """
+    (tmp_path / "pairs.csv").write_text(CSV_TEXT)
+    convert_csv(str(tmp_path / "pairs.csv"), str(tmp_path / "pairs.mops"))
+    text = export_file(str(tmp_path / "pairs.csv"), str(tmp_path / "text.arrow"), 2)
+    binary = export_file(str(tmp_path / "pairs.mops"), str(tmp_path / "bin.arrow"), 2)
+    assert text == (4, 1) and binary == (4, 0)
+    exported = read_arrow(str(tmp_path / "text.arrow"))
+    assert same_columns(exported, read_arrow(str(tmp_path / "bin.arrow")))
+    assert same_columns(
+        exported,
+        ResultBatch.compute(
+            array("d", [5, 5, -1.5, -0.0]), array("d", [3, 0, 0.25, -0.0])
+        ),
+    )
+
+
+def test_export_table(tmp_path):
+    """
+    Test that an exported operation table holds the cells of compute_table in row-major order.
+    """
+    a, b = array("d", range(-3, 4)), array("d", [0.5, 0, -2, 3])
+    path = str(tmp_path / "table.arrow")
+    assert export_table(a, b, path, tile_rows=2, tile_columns=3) == 28
+    assert same_columns(read_arrow(path), compute_table(a, b))
+
+
+def test_not_an_arrow_file(tmp_path):
+    """
+    Test that reading a file that is not an Arrow IPC file raises ValueError.
+    """
+    path = tmp_path / "pairs.csv"
+    path.write_text(CSV_TEXT)
+    assert not is_arrow_file(str(path))
+    with pytest.raises(ValueError):
+        read_arrow(str(path))
+
+
+def test_readable_by_pyarrow(tmp_path):
+    """
+    Test that pyarrow memory-maps an exported file and reads the same results, with null
+    quotients where the divisor is zero.
+    """
+    pa = pytest.importorskip("pyarrow")
+    batch = results(500)
+    path = str(tmp_path / "results.arrow")
+    with open(path, "wb") as f, ArrowWriter(f) as writer:
+        writer.write_results(batch[:200])
+        writer.write_results(batch[200:])
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    table.validate(full=True)
+    assert table.column_names == list(FIELDS)
+    assert table.column("sum").to_pylist() == list(batch.sums)
+    quotients = table.column("quotient").to_pylist()
+    for quotient, expected, error in zip(
+        quotients, batch.quotients, table.column("division_error").to_pylist()
+    ):
+        assert (quotient is None) == error
+        assert error or quotient == expected
@@ -0,0 +1,55 @@
+# test_benchmarks.py
+
+# This test module contains unit tests for the benchmark runner in the benchmarks package.
+# The suite itself is run with tiny sizes only; the tests check the measurements and the
+# regression check against a saved baseline, not the speed of this machine.
+
+import json
+from benchmarks.run_benchmarks import CASES, compare, run, run_suite
+
+
+def test_run_suite_covers_every_case():
+    """
+    Test that run_suite measures every registered case at every size.
+    """
+    report = run_suite(sizes=[1, 10], repeat=1)
+    assert set(report["results"]) == set(CASES)
+    for by_size in report["results"].values():
+        assert set(by_size) == {"1", "10"}
+        assert all(timing["ns_per_item"] > 0 for timing in by_size.values())
+
+
+def test_compare_flags_regressions():
+    """
+    Test that compare reports only cases slower than the baseline by more than the threshold.
+    """
+    baseline = {"results": {"add/scalar": {"10": {"ns_per_item": 100.0}}}}
+    slower = {"results": {"add/scalar": {"10": {"ns_per_item": 130.0}}}}
+    assert len(compare(slower, baseline, threshold=0.25)) == 1
+    assert compare(slower, baseline, threshold=0.5) == []
+    assert (
+        compare({"results": {"new/case": {"10": {"ns_per_item": 1.0}}}}, baseline) == []
+    )
+
+
+def test_run_saves_and_compares_baselines(tmp_path, capsys):
+    """
+    Test that the command line saves a JSON baseline and fails on a regression against it.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+        capsys (CaptureFixture): Pytest fixture to capture stdout and stderr.
+    """
+    baseline_path = tmp_path / "baseline.json"
+    argv = ["--sizes", "5", "--repeat", "1", "--only", "add/"]
+    assert run(argv + ["--save", str(baseline_path)]) == 0
+    baseline = json.loads(baseline_path.read_text())
+    assert set(baseline["results"]) == {"add/scalar", "add/batch"}
+
+    # Pretend the baseline was a thousand times faster than this run.
+    for by_size in baseline["results"].values():
+        for timing in by_size.values():
+            timing["ns_per_item"] /= 1000
+    baseline_path.write_text(json.dumps(baseline))
+    assert run(argv + ["--compare", str(baseline_path)]) == 1
+    assert "REGRESSION add/scalar" in capsys.readouterr().err
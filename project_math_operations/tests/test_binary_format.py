@@ -0,0 +1,141 @@
+# test_binary_format.py
+
+# This test module contains unit tests for the binary_format module.
+# Binary files must round-trip the operands exactly, and evaluating a mapped file must give the
+# same numbers as the batch functions and the same text as the text file mode.
+
+import io
+import math
+import sys
+from array import array
+import pytest
+from binary_format import (
+    RESULT_COLUMNS,
+    MappedColumns,
+    convert_csv,
+    evaluate_binary,
+    is_binary_file,
+    little_endian,
+    render_binary,
+    write_operands,
+)
+from math_operations import add_batch, divide_batch
+from stream_operations import evaluate_stream
+
+CSV_TEXT = "5,3\n5,0\nnot,a pair\n-1.5 0.25\n"
+
+
+@pytest.fixture
+def operand_file(tmp_path):
+    """
+    A pytest fixture that converts CSV_TEXT to a binary operand file.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+
+    Returns:
+        str: Path of the binary operand file.
+    """
+    csv_path = tmp_path / "pairs.csv"
+    csv_path.write_text(CSV_TEXT)
+    binary_path = str(tmp_path / "pairs.mops")
+    assert convert_csv(str(csv_path), binary_path, chunk_size=2) == (3, 1)
+    return binary_path
+
+
+def test_convert_csv(operand_file):
+    """
+    Test that convert_csv writes the valid pairs of the CSV file as binary columns.
+
+    Args:
+        operand_file (str): Path of the converted operand file.
+    """
+    assert is_binary_file(operand_file)
+    with MappedColumns(operand_file) as operands:
+        assert operands.rows == 3
+        assert operands.columns["a"].tolist() == [5.0, 5.0, -1.5]
+        assert operands.columns["b"].tolist() == [3.0, 0.0, 0.25]
+
+
+def test_evaluate_binary(tmp_path):
+    """
+    Test that evaluate_binary writes the same results as the batch functions.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    a = [1.0, -2.0, 0.0, 7.5]
+    b = [4.0, 0.0, -0.0, 2.5]
+    operand_path = str(tmp_path / "pairs.mops")
+    result_path = str(tmp_path / "results.mops")
+    write_operands(operand_path, a, b)
+    assert evaluate_binary(operand_path, result_path, chunk_size=3) == 4
+    with MappedColumns(result_path) as results:
+        assert results.names == RESULT_COLUMNS
+        assert results.columns["sum"].tolist() == list(add_batch(a, b))
+        quotients, zero_mask = divide_batch(a, b)
+        assert results.columns["division_error"].tolist() == [0.0, 1.0, 1.0, 0.0]
+        for q, expected, zero in zip(results.columns["quotient"], quotients, zero_mask):
+            assert math.isnan(q) if zero else q == expected
+
+
+def test_big_endian_hosts_swap_the_mapped_floats(tmp_path, monkeypatch):
+    """
+    Test that on a (simulated) big-endian host the files hold the same little-endian bytes,
+    and are evaluated and rendered to the same results.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+        monkeypatch (MonkeyPatch): Pytest fixture to patch attributes.
+    """
+    a, b = [1.0, -2.0, 0.0, 7.5, 1e300], [4.0, 0.0, -0.0, 2.5, 3.0]
+    values = array("d", a)
+    monkeypatch.setattr(sys, "byteorder", "little")
+    assert little_endian(values) is values
+    monkeypatch.setattr(sys, "byteorder", "big")
+    assert little_endian(little_endian(values)) == values != little_endian(values)
+    runs = {}
+    for byteorder in ("little", "big"):
+        # On this host, pretending to be big-endian stores every float swapped.
+        monkeypatch.setattr(sys, "byteorder", byteorder)
+        write_operands(str(tmp_path / f"{byteorder}.mops"), a, b)
+        evaluate_binary(
+            str(tmp_path / f"{byteorder}.mops"), str(tmp_path / f"{byteorder}.out"), 2
+        )
+        text = io.StringIO()
+        render_binary(str(tmp_path / f"{byteorder}.mops"), text, "csv", 2)
+        with MappedColumns(str(tmp_path / f"{byteorder}.out")) as results:
+            columns = [array("d", results.columns[name]) for name in RESULT_COLUMNS]
+        runs[byteorder] = columns, text.getvalue()
+    for column in runs["big"][0]:
+        column.byteswap()
+    assert list(map(bytes, runs["big"][0])) == list(map(bytes, runs["little"][0]))
+    assert runs["big"][1] == runs["little"][1]
+
+
+def test_render_binary_matches_text_mode(operand_file):
+    """
+    Test that rendering a binary operand file gives the same text as the text file mode.
+
+    Args:
+        operand_file (str): Path of the converted operand file.
+    """
+    expected = io.StringIO()
+    evaluate_stream(io.StringIO(CSV_TEXT), expected)
+    rendered = io.StringIO()
+    assert render_binary(operand_file, rendered) == 3
+    assert rendered.getvalue() == expected.getvalue()
+
+
+def test_not_a_binary_file(tmp_path):
+    """
+    Test that a text file is not mistaken for a binary column file.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    path = tmp_path / "pairs.csv"
+    path.write_text(CSV_TEXT)
+    assert not is_binary_file(str(path))
+    with pytest.raises(ValueError):
+        MappedColumns(str(path))
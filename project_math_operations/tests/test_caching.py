@@ -0,0 +1,114 @@
+# test_caching.py
+
+# This test module contains unit tests for the caching module.
+# Cached results must be identical to uncached ones, including the type of the result
+# and the sign of zero, and the counters must reflect every lookup.
+
+import math
+import threading
+from decimal import Decimal
+import pytest
+from caching import CachedOperations, LRUCache, memoize
+from math_operations import divide, divide_batch, multiply
+
+
+def test_lru_eviction_and_counters():
+    """
+    Test that the least recently used entry is evicted and the counters are updated.
+    """
+    cache = LRUCache(capacity=2)
+    cache.put("x", 1)
+    cache.put("y", 2)
+    assert cache.get("x") == 1  # "y" is now the least recently used entry
+    cache.put("z", 3)
+    assert cache.get("y") is None
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+        "size": 2,
+        "capacity": 2,
+    }
+    with pytest.raises(ValueError):
+        LRUCache(capacity=0)
+
+
+def test_memoize_keys():
+    """
+    Test that 5 and 5.0, and -0.0 and 0.0, are cached separately.
+    """
+    cached_multiply = memoize(multiply)
+    assert type(cached_multiply(5, 2)) is int
+    assert type(cached_multiply(5.0, 2)) is float
+    assert math.copysign(1, cached_multiply(0.0, 1.0)) == 1
+    assert math.copysign(1, cached_multiply(-0.0, 1.0)) == -1
+    assert cached_multiply(-0.0, 1.0) == 0.0
+    assert cached_multiply.cache.stats()["hits"] == 1
+    assert cached_multiply.cache.stats()["misses"] == 4
+
+
+def test_memoize_keys_of_float_subclasses_and_decimals():
+    """
+    Test that signed zeros of float subclasses and decimals, and decimals that differ only in
+    their exponent, are cached separately.
+    """
+
+    class Length(float):
+        pass
+
+    cached_multiply = memoize(multiply)
+    assert math.copysign(1, cached_multiply(Length(0.0), 1.0)) == 1
+    assert math.copysign(1, cached_multiply(Length(-0.0), 1.0)) == -1
+    assert str(cached_multiply(Decimal("0"), Decimal(1))) == "0"
+    assert str(cached_multiply(Decimal("-0"), Decimal(1))) == "-0"
+    assert str(cached_multiply(Decimal("1.0"), Decimal(1))) == "1.0"
+    assert str(cached_multiply(Decimal("1"), Decimal(1))) == "1"
+    assert str(cached_multiply(Decimal("NaN"), Decimal(1))) == "NaN"
+    assert cached_multiply(Decimal("NaN"), Decimal(1)).is_nan()
+    assert cached_multiply.cache.stats()["hits"] == 1
+
+
+def test_memoize_does_not_cache_errors():
+    """
+    Test that a division by zero raises on every call and is never cached.
+    """
+    cached_divide = memoize(divide)
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            cached_divide(1, 0)
+    assert len(cached_divide.cache) == 0
+
+
+def test_cached_batch_matches_batch():
+    """
+    Test that the cached divide_batch gives the same result as math_operations.divide_batch.
+    """
+    operations = CachedOperations(capacity=8)
+    a = [1.0, 2.0, 1.0, 3.0, 1.0]
+    b = [4.0, 0.0, 4.0, 0.0, 4.0]
+    quotients, zero_mask = operations.divide_batch(a, b)
+    expected, expected_mask = divide_batch(a, b)
+    assert zero_mask == expected_mask
+    assert quotients[0::2] == expected[0::2]
+    assert operations.stats()["hits"] == 2
+    assert list(operations.add_batch(a, b)) == [5.0, 2.0, 5.0, 3.0, 5.0]
+
+
+def test_cache_shared_across_threads():
+    """
+    Test that a cache shared by several threads keeps consistent counters.
+    """
+    operations = CachedOperations(capacity=16)
+
+    def work():
+        for i in range(1000):
+            assert operations.divide(i % 32, 4) == (i % 32) / 4
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = operations.stats()
+    assert stats["hits"] + stats["misses"] == 4000
+    assert stats["size"] <= 16
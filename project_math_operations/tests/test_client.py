@@ -0,0 +1,221 @@
+# test_client.py
+
+# This test module contains unit tests for the client module.
+# The client must print exactly what main.py prints, whether the result comes from a running
+# daemon or, when no daemon can be reached, from the client itself.
+
+import asyncio
+import io
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import pytest
+import client
+from print_operations import render_pair
+from service import start_server
+
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def serve_in_thread(address):
+    """
+    Starts the service on a Unix socket in a background thread.
+
+    Args:
+        address (str): The Unix socket path.
+
+    Returns:
+        callable: A function that stops the service.
+    """
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    stopping = asyncio.Event()
+
+    async def serve():
+        async with await start_server(address):
+            started.set()
+            await stopping.wait()
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(serve(),))
+    thread.start()
+    started.wait(5)
+
+    def stop():
+        loop.call_soon_threadsafe(stopping.set)
+        thread.join(5)
+        loop.close()
+
+    return stop
+
+
+def test_request_print_matches_print_operations(tmp_path):
+    """
+    Test that the daemon answers with the text of print_operations, including a zero divisor.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    address = str(tmp_path / "daemon.sock")
+    stop = serve_in_thread(address)
+    try:
+        for a, b in [(5.0, 3.0), (0.1, -0.0), (1e300, 1e-300), (7.0, 0.0)]:
+            assert client.request_print(a, b, address) == render_pair(a, b)
+    finally:
+        stop()
+
+
+def test_client_falls_back_without_daemon(tmp_path, monkeypatch, capsys):
+    """
+    Test that the client computes the result itself when no daemon can be reached.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+        monkeypatch (MonkeyPatch): Pytest fixture to patch attributes.
+        capsys (CaptureFixture): Pytest fixture to capture stdout and stderr.
+    """
+    monkeypatch.setattr(client, "start_daemon", lambda address: None)
+    monkeypatch.setattr(client, "DAEMON_START_TIMEOUT", 0.05)
+    client.print_operations(5.0, 0.0, str(tmp_path / "missing.sock"))
+    assert capsys.readouterr().out == render_pair(5.0, 0.0)
+
+
+def test_piped_pairs_share_one_connection(tmp_path, monkeypatch, capsys):
+    """
+    Test that piped pairs are sent over a single connection in batches, zero divisors and
+    invalid numbers included.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+        monkeypatch (MonkeyPatch): Pytest fixture to patch attributes.
+        capsys (CaptureFixture): Pytest fixture to capture stdout and stderr.
+    """
+    address = str(tmp_path / "daemon.sock")
+    connections = []
+    connect = client.DaemonClient._connect
+
+    def counting_connect(self):
+        connections.append(self.address)
+        return connect(self)
+
+    monkeypatch.setattr(client.DaemonClient, "_connect", counting_connect)
+    pairs = [(i * 0.5, i % 7 - 3.0) for i in range(1000)]
+    text = "".join(f"{a},{b}\n" for a, b in pairs) + "x y\n"
+    stop = serve_in_thread(address)
+    try:
+        client.print_piped_operations(io.BytesIO(text.encode()), address)
+    finally:
+        stop()
+    captured = capsys.readouterr()
+    assert captured.out == "".join(render_pair(a, b) for a, b in pairs)
+    assert connections == [address]
+
+
+def test_unavailable_daemon_is_started_once(tmp_path, monkeypatch, capsys):
+    """
+    Test that the client stops trying the daemon for the rest of the run once it cannot be
+    started, instead of waiting for it again for every pair.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+        monkeypatch (MonkeyPatch): Pytest fixture to patch attributes.
+        capsys (CaptureFixture): Pytest fixture to capture stdout and stderr.
+    """
+    started = []
+    monkeypatch.setattr(client, "start_daemon", started.append)
+    monkeypatch.setattr(client, "DAEMON_START_TIMEOUT", 0.05)
+    pairs = [(float(i), 2.0) for i in range(3 * client.PIPELINE_SIZE)]
+    text = "".join(f"{a} {b}\n" for a, b in pairs)
+    address = str(tmp_path / "missing.sock")
+    client.print_piped_operations(io.StringIO(text), address)
+    assert capsys.readouterr().out == "".join(render_pair(a, b) for a, b in pairs)
+    assert started == [address]
+
+
+def test_client_falls_back_on_error_replies(tmp_path, monkeypatch, capsys):
+    """
+    Test that the client computes the result itself when the daemon answers with an error.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+        monkeypatch (MonkeyPatch): Pytest fixture to patch attributes.
+        capsys (CaptureFixture): Pytest fixture to capture stdout and stderr.
+    """
+    address = str(tmp_path / "daemon.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(address)
+    server.listen()
+
+    def answer():
+        connection, _ = server.accept()
+        connection.recv(4096)
+        connection.sendall(b"error the daemon is shutting down\n")
+        connection.close()
+
+    thread = threading.Thread(target=answer)
+    thread.start()
+    monkeypatch.setattr(client, "start_daemon", lambda address: None)
+    try:
+        client.print_operations(2.0, 4.0, address)
+    finally:
+        thread.join(5)
+        server.close()
+    assert capsys.readouterr().out == render_pair(2.0, 4.0)
+
+
+def test_client_without_unix_sockets(monkeypatch, capsys):
+    """
+    Test that the client computes the result itself on platforms without Unix sockets or
+    user ids, such as Windows.
+
+    Args:
+        monkeypatch (MonkeyPatch): Pytest fixture to patch attributes.
+        capsys (CaptureFixture): Pytest fixture to capture stdout and stderr.
+    """
+    monkeypatch.setattr(client, "UNIX_SOCKETS", False)
+    monkeypatch.delattr(os, "getuid")
+    monkeypatch.delenv("MATH_OPERATIONS_SOCKET", raising=False)
+    monkeypatch.setenv("USERNAME", "someone")
+    monkeypatch.setattr(client, "start_daemon", pytest.fail)
+    assert client.default_socket().endswith("math_operations-someone.sock")
+    client.print_operations(1.0, 0.0)
+    assert capsys.readouterr().out == render_pair(1.0, 0.0)
+
+
+def test_client_output_matches_main(tmp_path):
+    """
+    Test that the client script prints exactly what main.py prints for the same input.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    address = str(tmp_path / "daemon.sock")
+    daemon = subprocess.Popen(
+        [sys.executable, "main.py", "--serve", address], cwd=PROJECT_DIRECTORY
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(address) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        answers = "2.5\nnot a number\n-4\n"
+        expected = subprocess.run(
+            [sys.executable, "main.py"],
+            cwd=PROJECT_DIRECTORY,
+            input=answers,
+            capture_output=True,
+            text=True,
+        ).stdout
+        actual = subprocess.run(
+            [sys.executable, "client.py", address],
+            cwd=PROJECT_DIRECTORY,
+            input=answers,
+            capture_output=True,
+            text=True,
+        ).stdout
+    finally:
+        daemon.terminate()
+        daemon.wait(5)
+    assert actual == expected
+    assert "The division of 2.5 by -4.0 results in -0.625" in actual
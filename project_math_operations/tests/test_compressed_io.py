@@ -0,0 +1,150 @@
+# test_compressed_io.py
+
+# This test module contains unit tests for the compressed_io module.
+# Whatever the compression and however many members a file has, reading it must give back
+# exactly the bytes that were compressed, and the file modes must write the same results as
+# with plain files.
+
+import bz2
+import gzip
+import io
+import lzma
+import pytest
+import compressed_io
+from compressed_io import detect_compression, open_input, open_output
+from input_validation import iter_validated_pairs
+from stream_operations import evaluate_file
+
+COMPRESS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+
+
+def operand_text(n):
+    """
+    Returns lines of operand pairs, one with a zero divisor and one malformed.
+
+    Args:
+        n (int): The number of lines.
+
+    Returns:
+        str: The text.
+    """
+    lines = [f"{i * 0.5},{i % 7 - 3}\n" for i in range(n)]
+    lines[3] = "not a pair\n"
+    return "".join(lines)
+
+
+@pytest.mark.parametrize("compression", compressed_io.COMPRESSIONS)
+def test_detect_compression(compression):
+    """
+    Test that compressed data is recognized by its first bytes, and plain text is not.
+    """
+    assert detect_compression(COMPRESS[compression](b"1,2\n")) == compression
+    assert detect_compression(b"1,2\n") is None
+    assert detect_compression(b"") is None
+
+
+@pytest.mark.parametrize("compression", compressed_io.COMPRESSIONS)
+def test_round_trip(tmp_path, compression):
+    """
+    Test that text written to a compressed file is read back unchanged.
+    """
+    path = str(tmp_path / f"pairs.csv{SUFFIXES[compression]}")
+    text = operand_text(20000)
+    with open_output(path) as f:
+        f.write(text)
+    with open(path, "rb") as f:
+        assert detect_compression(f.read(8)) == compression
+    with open_input(path) as f:
+        assert f.read() == text
+
+
+@pytest.mark.parametrize("compression", compressed_io.COMPRESSIONS)
+def test_multiple_members_are_decompressed_in_order(tmp_path, compression):
+    """
+    Test that a file of many members, decompressed in parallel, is read in member order.
+    """
+    parts = [operand_text(500).replace("0.5", str(i)).encode() for i in range(40)]
+    path = tmp_path / "pairs.csv.z"
+    path.write_bytes(b"".join(COMPRESS[compression](part) for part in parts))
+    with open_input(str(path), "rb", workers=4) as f:
+        assert f.read() == b"".join(parts)
+
+
+def test_false_member_starts_are_merged(tmp_path):
+    """
+    Test that a gzip header inside the data of a member is not taken for the start of one.
+    Stored (level 0) members hold their data uncompressed, header bytes included.
+    """
+    parts = [b"1,2\n" * 100 + b"\x1f\x8b\x08" + bytes([i]) * 50 for i in range(10)]
+    path = tmp_path / "pairs.gz"
+    path.write_bytes(
+        b"".join(gzip.compress(part, compresslevel=0) for part in parts) + bytes(8)
+    )
+    with open_input(str(path), "rb", workers=3) as f:
+        assert f.read() == b"".join(parts)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_truncated_file_raises(tmp_path, workers):
+    """
+    Test that a file ending inside a member raises EOFError instead of reading short.
+    """
+    data = b"".join(gzip.compress(operand_text(2000).encode()) for _ in range(3))
+    path = tmp_path / "pairs.gz"
+    path.write_bytes(data[:-20])
+    with open_input(str(path), "rb", workers=workers) as f:
+        with pytest.raises(EOFError):
+            f.read()
+
+
+def test_close_before_the_end(tmp_path):
+    """
+    Test that closing a stream before reading it all stops its background thread.
+    """
+    path = tmp_path / "pairs.gz"
+    path.write_bytes(gzip.compress(operand_text(200000).encode(), compresslevel=1))
+    f = open_input(str(path))
+    assert f.readline() == "0.0,-3\n"
+    f.close()
+    assert f.closed
+
+
+def test_plain_files_are_opened_directly(tmp_path):
+    """
+    Test that files that are neither compressed nor named like it are plain file objects.
+    """
+    path = str(tmp_path / "pairs.csv")
+    with open_output(path) as f:
+        assert isinstance(f, io.TextIOWrapper) and f.name == path
+        f.write("1,2\n")
+    with open_input(path) as f:
+        assert f.name == path and f.read() == "1,2\n"
+    with pytest.raises(ValueError):
+        open_input(path, workers=0)
+
+
+def test_evaluate_compressed_file(tmp_path):
+    """
+    Test that evaluating a compressed file into a compressed file writes the same results as
+    with plain files.
+    """
+    text = operand_text(5000)
+    (tmp_path / "pairs.csv").write_text(text)
+    (tmp_path / "pairs.csv.bz2").write_bytes(bz2.compress(text.encode()))
+    plain = evaluate_file(str(tmp_path / "pairs.csv"), str(tmp_path / "out.txt"))
+    compressed = evaluate_file(
+        str(tmp_path / "pairs.csv.bz2"), str(tmp_path / "out.txt.gz")
+    )
+    assert compressed == plain == (4999, 1)
+    assert gzip.decompress((tmp_path / "out.txt.gz").read_bytes()) == (
+        (tmp_path / "out.txt").read_bytes()
+    )
+
+
+def test_piped_compressed_input():
+    """
+    Test that compressed piped input is decompressed before it is validated.
+    """
+    stream = io.BufferedReader(io.BytesIO(lzma.compress(b"1 2\n3,4\n5")))
+    assert list(iter_validated_pairs(stream)) == [(1.0, 2.0), (3.0, 4.0)]
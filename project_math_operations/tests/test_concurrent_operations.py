@@ -0,0 +1,139 @@
+# test_concurrent_operations.py
+
+# This test module contains stress tests for the concurrent_operations module.
+# Threads evaluating and printing at the same time must produce exactly the output of a single
+# thread, and on a free-threaded build the thread pool must scale with the number of threads.
+
+import io
+import os
+import random
+import threading
+import time
+from array import array
+import pytest
+from concurrent_operations import (
+    ThreadSinks,
+    evaluate_threaded,
+    gil_enabled,
+    render_threaded,
+    write_threaded,
+)
+from print_operations import CSV_HEADER, render_batch, render_pair
+from results import ResultBatch
+
+
+def operands(n, seed=0):
+    """
+    Returns two arrays of random operands, some of the divisors being zero.
+
+    Args:
+        n (int): The number of pairs.
+        seed (int): The random seed.
+
+    Returns:
+        tuple (array, array): The first and second numbers.
+    """
+    rng = random.Random(seed)
+    a = array("d", (rng.uniform(-1e6, 1e6) for _ in range(n)))
+    b = array("d", (rng.choice([0.0, rng.uniform(-1e3, 1e3)]) for _ in range(n)))
+    return a, b
+
+
+def test_thread_sinks_do_not_interleave():
+    """
+    Test that many threads printing at once each get exactly their own output.
+    """
+    sinks = ThreadSinks()
+    threads = 16
+    barrier = threading.Barrier(threads)
+    expected = {}
+
+    def work(seed):
+        a, b = operands(300, seed)
+        barrier.wait()
+        for x, y in zip(a, b):
+            sinks.print_operations(x, y)
+        expected[seed] = "".join(map(render_pair, a, b))
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert sorted(sinks.getvalues().values()) == sorted(expected.values())
+
+
+def test_thread_sinks_keep_the_output_of_finished_threads():
+    """
+    Test that a thread reusing the identifier of a finished thread gets a stream of its own.
+    """
+    sinks = ThreadSinks()
+    for i in range(5):
+        thread = threading.Thread(target=sinks.print_operations, args=(i, 1))
+        thread.start()
+        thread.join()
+    assert sinks.getvalues() == {i: render_pair(i, 1) for i in range(5)}
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, None), (4, None), (8, 37)])
+def test_threaded_results_are_ordered(workers, chunk_size):
+    """
+    Test that the thread pool returns and writes the same results as a single batch.
+
+    Args:
+        workers (int): The number of threads.
+        chunk_size (int): The number of pairs per shard.
+    """
+    a, b = operands(5000)
+    expected = ResultBatch.compute(a, b)
+    results = evaluate_threaded(a, b, workers, chunk_size)
+    # Compared as bytes, since the NaN quotients of zero divisors never compare equal.
+    assert [bytes(c) for c in results.columns()] == [
+        bytes(c) for c in expected.columns()
+    ]
+    text = "".join(render_threaded(a, b, "csv", workers, chunk_size))
+    assert text == render_batch(a, b, "csv")
+    stream = io.StringIO()
+    write_threaded(stream, a, b, "csv", workers, chunk_size)
+    assert stream.getvalue() == CSV_HEADER + text
+    assert len(evaluate_threaded([], [], workers)) == 0
+    with pytest.raises(ValueError):
+        evaluate_threaded(a, b[:-1], workers)
+
+
+@pytest.mark.parametrize("workers", [0, -1])
+def test_workers_below_one_are_refused(workers):
+    """
+    Test that an explicit number of threads below 1 is refused rather than replaced.
+
+    Args:
+        workers (int): The number of threads.
+    """
+    a, b = operands(10)
+    with pytest.raises(ValueError):
+        evaluate_threaded(a, b, workers)
+
+
+def test_throughput_scales_with_threads():
+    """
+    Stress test: measures the throughput of the thread pool with 1, 2 and 4 threads.
+
+    Scaling is only asserted without the GIL; with it the threads take turns and the test
+    reports the measured throughputs instead.
+    """
+    a, b = operands(20000)
+    throughputs = {}
+    for workers in (1, 2, 4):
+        best = float("inf")
+        for _ in range(2):
+            start = time.perf_counter()
+            for _ in render_threaded(a, b, "text", workers, 2000):
+                pass
+            best = min(best, time.perf_counter() - start)
+        throughputs[workers] = len(a) / best
+    report = ", ".join(f"{w} threads: {t:,.0f} pairs/s" for w, t in throughputs.items())
+    if gil_enabled():
+        pytest.skip(f"scaling needs a free-threaded build ({report})")
+    if (os.cpu_count() or 1) < 4:
+        pytest.skip(f"scaling needs 4 CPUs ({report})")
+    assert throughputs[4] > 2 * throughputs[1], report
@@ -0,0 +1,113 @@
+# test_differential.py
+
+# This test module runs the differential harness over every registered fast path, and checks
+# that the harness itself reports implementations that differ from the scalar reference.
+
+import math
+from array import array
+import pytest
+import differential
+from differential import (
+    EDGE_VALUES,
+    IMPLEMENTATIONS,
+    format_report,
+    generate_operands,
+    generate_tokens,
+    register,
+    run_checks,
+    same_float,
+)
+from input_validation import validate_floats
+from math_operations import add_batch, divide_batch, multiply_batch
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """
+    A pytest fixture that lets a test register implementations without keeping them.
+
+    Returns:
+        dict: A copy of IMPLEMENTATIONS, installed for the duration of the test.
+    """
+    copy = {
+        kind: dict(implementations) for kind, implementations in IMPLEMENTATIONS.items()
+    }
+    monkeypatch.setattr(differential, "IMPLEMENTATIONS", copy)
+    return copy
+
+
+def test_same_float():
+    """
+    Test that same_float tells signed zeros apart and treats every NaN as the same result.
+    """
+    assert same_float(math.nan, -math.nan)
+    assert not same_float(0.0, -0.0)
+    assert not same_float(math.nan, 0.0) and not same_float(0.0, math.nan)
+    assert same_float(-math.inf, -math.inf)
+
+
+def test_generated_inputs_cover_edge_cases():
+    """
+    Test that the generated operands start with every pair of edge values and are reproducible.
+    """
+    a, b = generate_operands(1000, seed=3)
+    assert len(a) == len(b) == 1000
+    assert (math.inf, -0.0) in set(zip(a, b))
+    assert b.count(0.0) > len(EDGE_VALUES)
+    assert [bytes(c) for c in generate_operands(1000, seed=3)] == [bytes(a), bytes(b)]
+    tokens = generate_tokens(500, seed=3)
+    assert "1_000" in tokens and len(tokens) == 500
+
+
+@pytest.mark.parametrize(
+    "name",
+    [name for implementations in IMPLEMENTATIONS.values() for name in implementations],
+)
+def test_fast_paths_match_reference(name):
+    """
+    Test that a registered implementation matches the scalar reference functions.
+
+    Args:
+        name (str): The name of the implementation.
+    """
+    report = run_checks(size=3000, seed=11, names=[name])
+    assert report == {name: []}, format_report(report)
+
+
+def test_mismatches_are_reported(registry):
+    """
+    Test that the harness reports a lost sign, a missed zero divisor, a rendering difference
+    and a validator that accepts too much.
+
+    Args:
+        registry (dict): The temporary registry of implementations.
+    """
+
+    @register("operations", "signless")
+    def signless(a, b):
+        # Drops the sign of zero differences and ignores divisions by negative zero.
+        differences = array("d", (x - y if x != y else 0.0 for x, y in zip(a, b)))
+        quotients, zero_mask = divide_batch(a, b)
+        zero_mask = bytearray(
+            z and math.copysign(1.0, y) > 0 for z, y in zip(zero_mask, b)
+        )
+        return add_batch(a, b), differences, multiply_batch(a, b), quotients, zero_mask
+
+    @register("renderers", "rounded")
+    def rounded(a, b, fmt):
+        return "".join(f"{x:.3f}\n" for x in a)
+
+    @register("validators", "lenient")
+    def lenient(tokens):
+        # Accepts every token, converting the invalid ones to zero.
+        values, valid = validate_floats(tokens)
+        return array(
+            "d", (x if ok else 0.0 for x, ok in zip(values, valid))
+        ), bytearray(b"\x01") * len(tokens)
+
+    report = run_checks(size=500, names=["signless", "rounded", "lenient"])
+    assert any("difference of (-0.0, 0.0)" in line for line in report["signless"])
+    assert any("did not report the zero divisor" in line for line in report["signless"])
+    assert len(report["rounded"]) == len(differential.FORMATS)
+    assert "lenient: '1__0' is valid, expected invalid" in format_report(report)
+    assert differential.run(["--size", "500", "--only", "lenient"]) == 1
@@ -0,0 +1,163 @@
+# test_dispatcher.py
+
+# This test module contains unit tests for the dispatcher module.
+# Every engine must give the same results as the batch functions, and a dispatcher must route a
+# request to the engine its profile predicts to be the fastest, unless the engine is forced.
+
+import io
+import os
+import subprocess
+import sys
+from array import array
+import pytest
+import dispatcher
+import engines
+from dispatcher import Dispatcher, calibrate, crossovers, load_profile, save_profile
+from results import ResultBatch
+from stream_operations import evaluate_stream
+
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A profile of a 4-CPU host where scalar calls win up to 100 pairs, the cache wins when most
+# pairs repeat, and the process pool wins from about 700000 pairs.
+PROFILE = {
+    "version": dispatcher.PROFILE_VERSION,
+    "host": {"python": "CPython 3.13.0", "machine": "x86_64", "cpus": 4, "gil": True},
+    "workers": 4,
+    "engines": {
+        "scalar": {"fixed": 0.0, "per_pair": 400e-9},
+        "batch": {"fixed": 20e-6, "per_pair": 200e-9},
+        "cached": {"fixed": 0.0, "per_pair": 1000e-9, "per_repeated_pair": 50e-9},
+        "processes": {"fixed": 0.1, "per_pair": 60e-9},
+    },
+    "memory_bandwidth": 10e9,
+    "worker_startup": 0.025,
+    "thread_startup": None,
+}
+
+
+def operands():
+    """
+    Returns operands with zero divisors of both signs and a negative zero dividend.
+
+    Returns:
+        tuple (array, array): The first and second numbers.
+    """
+    a = array("d", [5, -0.0, 7.5, 1e308, -3, 0.0] * 50)
+    b = array("d", [3, 2, 0.0, 10, -0.0, 0.25] * 50)
+    return a, b
+
+
+@pytest.mark.parametrize("engine", dispatcher.ENGINES)
+def test_engines_give_the_batch_results(engine):
+    """
+    Test that every engine, when forced, gives the results of ResultBatch.compute.
+    """
+    a, b = operands()
+    engines = Dispatcher(PROFILE, engine=engine, workers=2)
+    results = engines.evaluate(a, b)
+    expected = ResultBatch.compute(a, b)
+    assert [bytes(column) for column in results.columns()] == [
+        bytes(column) for column in expected.columns()
+    ]
+    assert engines.choices == {engine: 1} and engines.last_choice.engine == engine
+
+
+def test_routing_by_size_and_repetition():
+    """
+    Test that requests go to the engine predicted to be fastest for their size and shape.
+    """
+    engines = Dispatcher(dict(PROFILE, crossovers=crossovers(PROFILE)))
+    assert engines.choose(array("d", [1.0] * 10), array("d", range(1, 11))).engine == (
+        "scalar"
+    )
+    distinct = array("d", range(1, 5001))
+    assert engines.choose(distinct, distinct).engine == "batch"
+    repeated = engines.choose(array("d", [1.0, 2.0] * 2500), array("d", [3.0] * 5000))
+    assert repeated.engine == "cached" and repeated.repeated > 0.99
+    large = array("d", range(1, 1_000_001))
+    choice = engines.choose(large, large)
+    assert choice.engine == "processes"
+    assert choice.estimates["processes"] < choice.estimates["batch"]
+
+
+def test_crossovers():
+    """
+    Test that the crossover sizes are where the predicted fastest engine changes.
+    """
+    assert crossovers(PROFILE) == {
+        "scalar->batch": 101,
+        "batch->cached": 1,
+        "batch->processes": 714143,
+    }
+
+
+def test_forced_engine_from_the_environment(monkeypatch):
+    """
+    Test that MATH_OPERATIONS_ENGINE forces the engine unless one is given, and that unknown
+    engines are refused.
+    """
+    monkeypatch.setenv("MATH_OPERATIONS_ENGINE", "scalar")
+    large = array("d", range(1, 100_001))
+    assert Dispatcher(PROFILE).choose(large, large).engine == "scalar"
+    # An explicit engine, including auto, wins over the environment.
+    assert Dispatcher(PROFILE, engine="batch").choose(large, large).engine == "batch"
+    profile = dict(PROFILE, crossovers=crossovers(PROFILE))
+    assert Dispatcher(profile, engine="auto").choose(large, large).engine == "batch"
+    with pytest.raises(ValueError):
+        Dispatcher(PROFILE, engine="gpu")
+
+
+def test_main_parses_engines_without_the_dispatcher():
+    """
+    Test that the engines main.py accepts are those of the dispatcher, which parsing the
+    arguments does not import, and that importing the dispatcher does not load the modules
+    only some of its functions use.
+    """
+    code = (
+        "import sys, main; main.parse_args(['--input', 'x', '--output', 'y', "
+        "'--engine', 'auto']); print('dispatcher' in sys.modules)",
+        "import sys, dispatcher; "
+        "print(sorted({'argparse', 'json', 'caching'} & set(sys.modules)))",
+    )
+    output = [
+        subprocess.run(
+            [sys.executable, "-c", line],
+            cwd=PROJECT_DIRECTORY,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for line in code
+    ]
+    assert output == ["False\n", "[]\n"]
+    assert dispatcher.ENGINES is engines.ENGINES
+
+
+def test_calibrated_profile_is_saved_for_this_host(tmp_path):
+    """
+    Test that a calibrated profile is reused on this host only.
+    """
+    profile = calibrate(sizes=(8, 64), repeat=1)
+    assert {"scalar", "batch", "cached"} <= set(profile["engines"])
+    assert profile["memory_bandwidth"] > 0
+    assert "scalar->batch" in profile["crossovers"]
+    path = str(tmp_path / "profile.json")
+    save_profile(profile, path)
+    assert load_profile(path) == profile
+    save_profile(dict(profile, host=PROFILE["host"]), path)
+    assert load_profile(path) is None
+    assert load_profile(str(tmp_path / "missing.json")) is None
+
+
+def test_evaluate_stream_with_a_dispatcher():
+    """
+    Test that a file evaluated through a dispatcher is written like with the batch functions.
+    """
+    text = "".join(f"{i},{i % 5 - 2}\n" for i in range(1000))
+    default, dispatched = io.StringIO(), io.StringIO()
+    evaluate_stream(io.StringIO(text), default, chunk_size=64, fmt="csv")
+    engines = Dispatcher(dict(PROFILE, crossovers=crossovers(PROFILE)))
+    evaluate_stream(io.StringIO(text), dispatched, 64, "csv", evaluate=engines)
+    assert dispatched.getvalue() == default.getvalue()
+    assert sum(engines.choices.values()) == 16
@@ -0,0 +1,288 @@
+# test_distributed.py
+
+# This test module contains unit tests for the distributed module.
+# Several workers run on localhost in background threads. The coordinator must write exactly
+# what the file mode writes, in input order, and must send the shards of a failed worker to the
+# other workers.
+
+import asyncio
+import io
+import json
+import threading
+import pytest
+import main
+from distributed import (
+    coordinate,
+    evaluate_distributed,
+    evaluate_shard,
+    iter_shards,
+    start_worker,
+)
+from stream_operations import evaluate_file
+
+
+def run_in_thread(start):
+    """
+    Runs a server in a background thread with its own event loop.
+
+    Args:
+        start (callable): A coroutine function starting the server, e.g. start_worker.
+
+    Returns:
+        tuple (str, callable): The "host:port" address of the server and a function that
+        stops it.
+    """
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    stopping = asyncio.Event()
+    address = []
+
+    async def serve():
+        async with await start() as server:
+            address.append("127.0.0.1:%d" % server.sockets[0].getsockname()[1])
+            started.set()
+            await stopping.wait()
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(serve(),))
+    thread.start()
+    started.wait(5)
+
+    def stop():
+        loop.call_soon_threadsafe(stopping.set)
+        thread.join(5)
+        loop.close()
+
+    return address[0], stop
+
+
+def start_workers(count):
+    """
+    Starts workers on free localhost ports.
+
+    Args:
+        count (int): The number of workers.
+
+    Returns:
+        tuple (list of str, list of callable): Their addresses and the functions stopping them.
+    """
+    workers = [run_in_thread(lambda: start_worker("127.0.0.1:0")) for _ in range(count)]
+    return [address for address, _ in workers], [stop for _, stop in workers]
+
+
+async def start_failing_worker():
+    """
+    Starts a worker that reads one shard request and drops the connection.
+
+    Returns:
+        asyncio.AbstractServer: The running server.
+    """
+
+    async def fail(reader, writer):
+        await reader.readline()
+        writer.close()
+
+    return await asyncio.start_server(fail, "127.0.0.1", 0)
+
+
+async def start_malformed_worker():
+    """
+    Starts a server that answers every shard request with valid JSON that is not a response.
+
+    Returns:
+        asyncio.AbstractServer: The running server.
+    """
+
+    async def answer(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            await reader.readexactly(json.loads(line)["length"])
+            writer.write(b'{"shard": %d}\n[1, 2]\n' % json.loads(line)["shard"])
+            await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(answer, "127.0.0.1", 0)
+
+
+def write_input(path, count=3000):
+    """
+    Writes a file of operand pairs with zero divisors and invalid lines.
+
+    Args:
+        path (Path): The file path.
+        count (int): The number of lines.
+    """
+    lines = [f"{i * 0.5},{i % 7 - 3}\n" for i in range(count)]
+    lines[10] = "not,a number\n"
+    lines[count // 2] = "1,2,3\n"
+    path.write_text("".join(lines))
+
+
+def test_iter_shards_splits_at_line_ends():
+    """
+    Test that the shards hold whole lines and together the whole stream.
+    """
+    data = b"".join(b"%d,%d\n" % (i, i) for i in range(100)) + b"7,8"
+    shards = list(iter_shards(io.BytesIO(data), 37))
+    assert b"".join(shards) == data
+    assert all(shard.endswith(b"\n") for shard in shards[:-1])
+    assert all(len(shard) >= 37 for shard in shards[:-1])
+
+
+def test_evaluate_shard_renders_like_the_file_mode(tmp_path):
+    """
+    Test that a shard is rendered like the file mode renders its lines, without a header.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    write_input(tmp_path / "pairs.csv", 200)
+    evaluate_file(str(tmp_path / "pairs.csv"), str(tmp_path / "out.txt"))
+    data = (tmp_path / "pairs.csv").read_bytes()
+    assert evaluate_shard(data, chunk_size=16) == (
+        198,
+        2,
+        (tmp_path / "out.txt").read_text(),
+    )
+
+
+@pytest.mark.parametrize("fmt", ["text", "csv", "jsonl"])
+def test_output_matches_the_file_mode(tmp_path, fmt):
+    """
+    Test that the results of three workers are written like the file mode writes them.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+        fmt (str): The output format.
+    """
+    write_input(tmp_path / "pairs.csv")
+    evaluate_file(str(tmp_path / "pairs.csv"), str(tmp_path / "expected"), fmt=fmt)
+    addresses, stops = start_workers(3)
+    try:
+        stats = evaluate_distributed(
+            str(tmp_path / "pairs.csv"),
+            str(tmp_path / "out"),
+            addresses,
+            fmt,
+            shard_bytes=1000,
+        )
+    finally:
+        for stop in stops:
+            stop()
+    assert (tmp_path / "out").read_text() == (tmp_path / "expected").read_text()
+    assert stats.pairs == 2998 and stats.skipped == 2
+    assert stats.shards > 20 and stats.retried == 0
+
+
+def test_shards_of_failed_workers_are_retried(tmp_path):
+    """
+    Test that the shards of a worker dropping its connection and of a worker that cannot be
+    reached are evaluated by the others.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    write_input(tmp_path / "pairs.csv")
+    evaluate_file(str(tmp_path / "pairs.csv"), str(tmp_path / "expected"))
+    addresses, stops = start_workers(2)
+    failing, stop_failing = run_in_thread(start_failing_worker)
+    # Nothing listens on the port of a stopped worker.
+    refused, stop_refused = run_in_thread(lambda: start_worker("127.0.0.1:0"))
+    stop_refused()
+    try:
+        stats = evaluate_distributed(
+            str(tmp_path / "pairs.csv"),
+            str(tmp_path / "out"),
+            [failing, refused] + addresses,
+            shard_bytes=1000,
+        )
+    finally:
+        for stop in stops + [stop_failing]:
+            stop()
+    assert (tmp_path / "out").read_text() == (tmp_path / "expected").read_text()
+    assert stats.retried == 1 and stats.pairs == 2998
+
+
+def test_malformed_responses_are_retried(tmp_path):
+    """
+    Test that the shard of a server answering with malformed responses goes to a real worker.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    write_input(tmp_path / "pairs.csv")
+    evaluate_file(str(tmp_path / "pairs.csv"), str(tmp_path / "expected"))
+    addresses, stops = start_workers(1)
+    malformed, stop_malformed = run_in_thread(start_malformed_worker)
+    try:
+        stats = evaluate_distributed(
+            str(tmp_path / "pairs.csv"),
+            str(tmp_path / "out"),
+            [malformed] + addresses,
+            shard_bytes=1000,
+            timeout=10,
+        )
+    finally:
+        for stop in stops + [stop_malformed]:
+            stop()
+    assert (tmp_path / "out").read_text() == (tmp_path / "expected").read_text()
+    assert stats.retried == 1
+
+
+def test_run_fails_when_every_worker_fails(tmp_path):
+    """
+    Test that the run fails when no worker is left to evaluate the shards.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    failing = [run_in_thread(start_failing_worker) for _ in range(2)]
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(
+                coordinate(
+                    io.BytesIO(b"1,2\n3,4\n" * 100),
+                    io.StringIO(),
+                    [address for address, _ in failing],
+                    shard_bytes=100,
+                )
+            )
+    finally:
+        for _, stop in failing:
+            stop()
+
+
+def test_main_with_workers(tmp_path):
+    """
+    Test that main --workers writes the results of the file mode.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    write_input(tmp_path / "pairs.csv")
+    evaluate_file(str(tmp_path / "pairs.csv"), str(tmp_path / "expected"), fmt="csv")
+    addresses, stops = start_workers(2)
+    try:
+        main.run(
+            main.parse_args(
+                [
+                    "--input",
+                    str(tmp_path / "pairs.csv"),
+                    "--output",
+                    str(tmp_path / "out.csv"),
+                    "--format",
+                    "csv",
+                    "--workers",
+                    ",".join(addresses),
+                ]
+            )
+        )
+    finally:
+        for stop in stops:
+            stop()
+    assert (tmp_path / "out.csv").read_text() == (tmp_path / "expected").read_text()
+    with pytest.raises(SystemExit):
+        main.parse_args(
+            ["--input", "x", "--output", "y", "--workers", "a:1", "--cache", "c"]
+        )
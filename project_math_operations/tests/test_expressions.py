@@ -0,0 +1,84 @@
+# test_expressions.py
+
+# This test module contains unit tests for the expressions module.
+# Compiled expressions must give the same values as composing the math_operations functions.
+
+import math
+import pytest
+from expressions import compile_expression
+from math_operations import add, subtract, multiply, divide
+
+
+@pytest.fixture(params=[(5.0, 3.0), (-2, 4), (0.5, -0.25)])
+def operands(request: pytest.FixtureRequest):
+    """
+    A pytest fixture that provides pairs of numbers with a non-zero divisor.
+
+    Returns:
+        tuple: A pair of numbers.
+    """
+    return request.param
+
+
+def test_scalar_matches_composed_operations(operands):
+    """
+    Test that a compiled expression equals the composition of the math_operations functions.
+
+    Args:
+        operands (tuple): A pair of numbers provided by the operands fixture.
+    """
+    a, b = operands
+    expression = compile_expression("(a + b) * (a - b) / b")
+    assert expression(a, b) == divide(multiply(add(a, b), subtract(a, b)), b)
+    assert compile_expression("-a * 2 + b / .5 - 1e1")(a, b) == add(
+        multiply(-a, 2), subtract(divide(b, 0.5), 10.0)
+    )
+
+
+def test_precedence_and_parentheses():
+    """
+    Test that * and / bind tighter than + and -, and that parentheses override it.
+    """
+    assert compile_expression("a + b * 2")(1, 3) == 7
+    assert compile_expression("(a + b) * 2")(1, 3) == 8
+    assert compile_expression("a - b - 1")(10, 3) == 6
+    assert compile_expression("a / b / 2")(8, 2) == 2
+
+
+def test_scalar_zero_division():
+    """
+    Test that a zero divisor raises the same ZeroDivisionError as math_operations.divide.
+    """
+    with pytest.raises(ZeroDivisionError, match="Cannot divide by zero!"):
+        compile_expression("a / (b - b)")(1.0, 2.0)
+
+
+def test_evaluate_batch():
+    """
+    Test that evaluate_batch matches the scalar results and flags zero divisors per row.
+    """
+    expression = compile_expression("(a + b) * (a - b) / b")
+    a = [5.0, 1.0, 2.0, -3.0]
+    b = [3.0, 0.0, 4.0, -0.0]
+    results, zero_mask = expression.evaluate_batch(a, b)
+    assert list(zero_mask) == [0, 1, 0, 1]
+    assert results[0] == expression(5.0, 3.0) and results[2] == expression(2.0, 4.0)
+    assert math.isnan(results[1]) and math.isnan(results[3])
+
+    results, zero_mask = compile_expression("a * b").evaluate_batch([2.0], [4.0])
+    assert list(results) == [8.0] and list(zero_mask) == [0]
+
+    with pytest.raises(ValueError):
+        expression.evaluate_batch([1.0], [1.0, 2.0])
+
+
+@pytest.mark.parametrize("text", ["", "a +", "(a", "a b", "a $ b", "c * 2", "a ** b"])
+def test_invalid_expressions(text):
+    """
+    Test that malformed expressions are rejected with a ValueError.
+
+    Args:
+        text (str): An invalid expression.
+    """
+    with pytest.raises(ValueError):
+        compile_expression(text)
@@ -0,0 +1,159 @@
+# test_incremental.py
+
+# This test module contains unit tests for the incremental module.
+# An incremental run must write exactly what stream_operations.evaluate_file writes, and rerunning
+# over a slightly changed file must only evaluate the chunks that changed.
+
+import io
+import json
+import os
+import random
+import pytest
+from incremental import evaluate_incremental, iter_chunks
+from stream_operations import evaluate_file
+
+
+def write_lines(path, lines):
+    """
+    Writes lines of operand pairs to a file.
+
+    Args:
+        path (Path): The file to write.
+        lines (list of str): The lines, with their line endings.
+    """
+    with open(path, "w") as f:
+        f.writelines(lines)
+
+
+def operand_lines(n, seed=0):
+    """
+    Returns lines of random operand pairs, some with a zero divisor or malformed.
+
+    Args:
+        n (int): The number of lines.
+        seed (int): The random seed.
+
+    Returns:
+        list of str: The lines.
+    """
+    rng = random.Random(seed)
+    lines = [
+        f"{rng.uniform(-1e3, 1e3)},{rng.choice([0, rng.uniform(-9, 9)])}\n"
+        for _ in range(n)
+    ]
+    lines[7] = "not a pair\n"
+    lines[8] = "\n"
+    return lines
+
+
+def test_chunk_boundaries_resynchronize():
+    """
+    Test that inserting a line only changes the chunk it is inserted into.
+    """
+    lines = [line.encode() for line in operand_lines(5000)]
+    before = list(iter_chunks(io.BytesIO(b"".join(lines)), 64))
+    after = list(
+        iter_chunks(io.BytesIO(b"".join(lines[:2500] + [b"1,2\n"] + lines[2500:])), 64)
+    )
+    assert sum(map(len, before)) == 5000
+    changed = [chunk for chunk in after if chunk not in before]
+    assert len(changed) == 1 and b"1,2\n" in changed[0]
+    assert max(map(len, before)) <= 64 * 4
+
+
+@pytest.mark.parametrize("fmt", ["text", "csv", "jsonl"])
+def test_rerun_evaluates_only_changed_chunks(tmp_path, fmt):
+    """
+    Test that reruns write the same output as a full evaluation, reusing unchanged chunks.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+        fmt (str): The output format.
+    """
+    source, cache = tmp_path / "pairs.csv", str(tmp_path / "cache")
+    incremental_out, full_out = tmp_path / "incremental.out", tmp_path / "full.out"
+    lines = operand_lines(20000)
+    write_lines(source, lines)
+
+    evaluated, skipped, chunks, reused = evaluate_incremental(
+        source, incremental_out, cache, fmt, average_lines=64
+    )
+    assert (evaluated, skipped, reused) == (19999 - 1, 1, 0)
+    assert evaluate_incremental(source, incremental_out, cache, fmt, 64)[0] == 0
+
+    # Change 1% of the file: a block of 150 lines and 50 appended lines.
+    lines[10000:10150] = [f"{i},{i + 1}\n" for i in range(150)]
+    write_lines(source, lines + [f"{i},0\n" for i in range(50)])
+    evaluated, skipped, chunks, reused = evaluate_incremental(
+        source, incremental_out, cache, fmt, 64
+    )
+    assert evaluated < 20000 * 0.05 and reused > chunks * 0.9
+    evaluate_file(source, full_out, fmt=fmt)
+    assert incremental_out.read_text() == full_out.read_text()
+    # Only the index and the pack of the last run are kept.
+    assert sorted(name.split("-")[0] for name in os.listdir(cache)) == [
+        fmt,
+        f"{fmt}.index",
+    ]
+
+
+def test_damaged_index_is_rebuilt(tmp_path):
+    """
+    Test that a damaged cache index makes the run evaluate everything instead of failing.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    source, cache = tmp_path / "pairs.csv", tmp_path / "cache"
+    write_lines(source, operand_lines(1000))
+    evaluate_incremental(source, tmp_path / "out", cache)
+    (cache / "text.index").write_text("{not json")
+    assert evaluate_incremental(source, tmp_path / "out", cache)[3] == 0
+    assert evaluate_incremental(source, tmp_path / "out", cache)[0] == 0
+
+
+@pytest.mark.parametrize(
+    "pack", ["../victim.pack", "{victim}", "text-x/../../victim.pack", 7]
+)
+def test_index_cannot_name_files_outside_the_cache(tmp_path, pack):
+    """
+    Test that a pack named by a crafted index outside the cache directory is neither read nor
+    removed, and that the run evaluates everything instead.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+        pack (str or int): The pack name written to the index, where {victim} stands for the
+            absolute path of a file outside the cache.
+    """
+    source, cache = tmp_path / "pairs.csv", tmp_path / "cache"
+    write_lines(source, operand_lines(1000))
+    evaluate_incremental(source, tmp_path / "out", cache)
+    victim = tmp_path / "victim.pack"
+    victim.write_text("keep me")
+    index = json.loads((cache / "text.index").read_text())
+    index["pack"] = pack.format(victim=victim) if isinstance(pack, str) else pack
+    (cache / "text.index").write_text(json.dumps(index))
+    assert evaluate_incremental(source, tmp_path / "out", cache)[3] == 0
+    assert victim.read_text() == "keep me"
+
+
+def test_damaged_entries_are_cache_misses(tmp_path):
+    """
+    Test that index entries of the wrong shape or pointing past the pack are evaluated again.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    source, cache = tmp_path / "pairs.csv", tmp_path / "cache"
+    write_lines(source, operand_lines(1000))
+    evaluate_file(str(source), str(tmp_path / "expected"))
+    chunks = evaluate_incremental(source, tmp_path / "out", cache, average_lines=64)[2]
+    assert chunks > 6
+    index = json.loads((cache / "text.index").read_text())
+    damaged = [None, 5, [0, 1], ["0", 1, 0], [-1, 4, 0], [10**9, 10, 0]]
+    for key, entry in zip(list(index["chunks"]), damaged):
+        index["chunks"][key] = entry
+    (cache / "text.index").write_text(json.dumps(index))
+    reused = evaluate_incremental(source, tmp_path / "out", cache, average_lines=64)[3]
+    assert reused == chunks - len(damaged)
+    assert (tmp_path / "out").read_text() == (tmp_path / "expected").read_text()
@@ -0,0 +1,171 @@
+# test_input_validation.py
+
+# This test module contains unit tests for the input_validation module.
+# The bulk validator must agree with validate_float on every token, valid or not.
+
+import io
+import math
+from fractions import Fraction
+import pytest
+import input_validation
+from input_validation import (
+    INVALID_INPUT_MESSAGE,
+    iter_validated_batches,
+    iter_validated_pairs,
+    split_tokens,
+    validate_float,
+    validate_floats,
+)
+
+TOKENS = [
+    "5",
+    "-3.25",
+    ".5",
+    "5.",
+    "1e-3",
+    "+2E+10",
+    " 7 ",
+    "1e400",
+    "inf",
+    "-Infinity",
+    "nan",
+    "1_000",
+    "٣",
+    "",
+    "abc",
+    "1.2.3",
+    "--1",
+    "e5",
+    "0x10",
+    "+NaN",
+    "--inf",
+    "_1",
+    "1_",
+    b"2.5",
+]
+
+
+def assert_matches_validate_float(tokens, values, valid):
+    """
+    Asserts that bulk results agree with validate_float for every token.
+
+    Args:
+        tokens (list of str): The validated tokens.
+        values (array): The numbers returned by validate_floats.
+        valid (bytearray): The validity mask returned by validate_floats.
+    """
+    assert len(values) == len(valid) == len(tokens)
+    for token, value, is_valid in zip(tokens, values, valid):
+        expected_valid, expected = validate_float(token)
+        assert bool(is_valid) == expected_valid, token
+        if not expected_valid:
+            assert math.isnan(value)
+        elif math.isnan(expected):
+            assert math.isnan(value)
+        else:
+            assert value == expected and math.copysign(1, value) == math.copysign(
+                1, expected
+            )
+
+
+def test_validate_floats_matches_validate_float():
+    """
+    Test that validate_floats gives the same result as validate_float on mixed input.
+    """
+    values, valid = validate_floats(TOKENS)
+    assert_matches_validate_float(TOKENS, values, valid)
+
+
+def test_validate_floats_converts_only_possible_floats(monkeypatch):
+    """
+    Test that validate_floats classifies tokens before converting them: only tokens that are
+    not plain decimal text but may be floats in another spelling reach validate_float.
+
+    Args:
+        monkeypatch (MonkeyPatch): Pytest fixture to patch attributes.
+    """
+    checked = []
+
+    def recording_validate_float(token):
+        checked.append(token)
+        return validate_float(token)
+
+    monkeypatch.setattr(input_validation, "validate_float", recording_validate_float)
+    values, valid = validate_floats(TOKENS)
+    assert_matches_validate_float(TOKENS, values, valid)
+    assert checked == [
+        "inf",
+        "-Infinity",
+        "nan",
+        "1_000",
+        "+NaN",
+        "--inf",
+        "_1",
+        "1_",
+        b"2.5",
+    ]
+
+
+@pytest.mark.parametrize("buffer", ["1, 2.5\n-3 4e2", b"1, 2.5\n-3 4e2"])
+def test_validate_floats_buffer(buffer):
+    """
+    Test that validate_floats splits a str or bytes buffer into tokens.
+
+    Args:
+        buffer (str or bytes): The buffer to validate.
+    """
+    values, valid = validate_floats(buffer)
+    assert list(values) == [1.0, 2.5, -3.0, 400.0]
+    assert list(valid) == [1, 1, 1, 1]
+
+
+def test_split_tokens():
+    """
+    Test that split_tokens separates tokens on commas and whitespace.
+    """
+    assert split_tokens("1,2 3\t4\n") == ["1", "2", "3", "4"]
+
+
+class TrickleStream(io.BytesIO):
+    """
+    A binary stream returning at most a few bytes per read, like a slow pipe.
+    """
+
+    def read1(self, size=-1):
+        return super().read1(3)
+
+
+def test_iter_validated_pairs_retries_only_the_invalid_number(capsys):
+    """
+    Test that an invalid number is reported and replaced by the next one, keeping the other
+    number of the pair.
+
+    Args:
+        capsys (CaptureFixture): Pytest fixture to capture stdout and stderr.
+    """
+    stream = TrickleStream(b"5\nabc\n3\n1.5, -2e1\n\n7 oops 0.25\n9")
+    assert list(iter_validated_pairs(stream)) == [(5.0, 3.0), (1.5, -20.0), (7.0, 0.25)]
+    errors = capsys.readouterr().err.splitlines()
+    assert errors[:2] == [INVALID_INPUT_MESSAGE] * 2 and len(errors) == 3
+
+
+def test_iter_validated_batches_blocks():
+    """
+    Test that a large stream is read in blocks, with pairs and tokens spanning block ends.
+    """
+    numbers = [f"{i}.{i % 7}" for i in range(10001)]
+    stream = io.BytesIO(" ".join(numbers).encode())
+    batches = list(iter_validated_batches(stream, block_size=1000))
+    assert len(batches) > 10
+    first = [x for a, _ in batches for x in a]
+    second = [x for _, b in batches for x in b]
+    assert first == [float(x) for x in numbers[0:10000:2]]
+    assert second == [float(x) for x in numbers[1:10000:2]]
+
+
+def test_iter_validated_pairs_with_parser():
+    """
+    Test reading pairs from a text stream with the parser of a numeric backend.
+    """
+    pairs = list(iter_validated_pairs(io.StringIO("1/3 2\nx 4 5"), Fraction))
+    assert pairs == [(Fraction(1, 3), Fraction(2)), (Fraction(4), Fraction(5))]
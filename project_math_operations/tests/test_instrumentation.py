@@ -0,0 +1,108 @@
+# test_instrumentation.py
+
+# This test module contains unit tests for the instrumentation module.
+# Instrumentation must count calls, items, divisions by zero and characters per stage, and
+# disabling it must restore the original functions everywhere they were imported.
+
+import io
+import json
+import pytest
+import instrumentation
+import math_operations
+import print_operations
+from print_operations import OperationsWriter
+
+
+@pytest.fixture
+def instrumented():
+    """
+    A pytest fixture that enables instrumentation with fresh metrics for one test.
+
+    Yields:
+        module: The instrumentation module.
+    """
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+
+
+def test_enable_and_disable_restore_functions():
+    """
+    Test that enable wraps the functions imported by name and disable puts them back.
+    """
+    originals = (math_operations.add, print_operations.add, OperationsWriter.flush)
+    instrumentation.enable()
+    try:
+        assert instrumentation.is_enabled()
+        assert math_operations.add is not originals[0]
+        assert print_operations.add is math_operations.add
+    finally:
+        instrumentation.disable()
+    assert not instrumentation.is_enabled()
+    assert (
+        math_operations.add,
+        print_operations.add,
+        OperationsWriter.flush,
+    ) == originals
+
+
+def test_counters_per_stage(instrumented, capsys):
+    """
+    Test the counters recorded for parsing, computing, rendering and writing.
+
+    Args:
+        instrumented (module): The instrumentation module, enabled by the fixture.
+        capsys (CaptureFixture): Pytest fixture to capture stdout and stderr.
+    """
+    print_operations.print_operations(5, 0)
+    text = capsys.readouterr().out
+    math_operations.divide_batch([1.0, 2.0, 3.0], [0.0, 1.0, 0.0])
+    stream = io.StringIO()
+    with OperationsWriter(stream) as writer:
+        writer.write_batch([1.0], [2.0])
+
+    metrics = instrumented.snapshot()
+    assert metrics["compute"]["divide"]["zero_divisions"] == 1
+    assert metrics["compute"]["divide_batch"]["calls"] == 2
+    assert metrics["compute"]["divide_batch"]["items"] == 4
+    assert metrics["compute"]["divide_batch"]["zero_divisions"] == 2
+    assert metrics["render"]["render_pair"]["characters"] == len(text)
+    assert metrics["write"]["OperationsWriter.flush"]["characters"] == len(
+        stream.getvalue()
+    )
+    latency = metrics["compute"]["add"]["latency_buckets"]
+    assert sum(latency.values()) == metrics["compute"]["add"]["calls"] == 1
+
+
+def test_exports(instrumented):
+    """
+    Test the JSON and Prometheus exports of the recorded metrics.
+
+    Args:
+        instrumented (module): The instrumentation module, enabled by the fixture.
+    """
+    math_operations.add(1, 2)
+    assert json.loads(instrumented.to_json())["compute"]["add"]["calls"] == 1
+    text = instrumented.to_prometheus()
+    assert 'math_operations_calls_total{stage="compute",operation="add"} 1' in text
+    assert (
+        'math_operations_latency_seconds_bucket{stage="compute",operation="add",le="+Inf"} 1'
+        in text
+    )
+
+
+def test_profile_run(tmp_path):
+    """
+    Test that profile_run profiles the block and writes the statistics.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    output = tmp_path / "run.prof"
+    with instrumentation.profile_run(output_path=str(output)):
+        math_operations.add_batch([1.0] * 100, [2.0] * 100)
+    assert output.stat().st_size > 0
@@ -1,99 +1,152 @@
-# test_math_operations.py
-
-# This test module contains unit tests for the math_operations module.
-# It tests basic arithmetic functions including addition, subtraction, multiplication, and division.
-# Contains unit tests for basic arithmetic functions (addition, subtraction, multiplication, division) in the math_operations module.
-# Focuses solely on the correctness of mathematical operations.
-
-from typing import Any
-import pytest
-from math_operations import add, subtract, multiply, divide
-
-
-# Test cases for add function
-def test_add():
-    """
-    Test the add function from the math_operations module.
-
-    Ensures that:
-    - Positive numbers are added correctly.
-    - Negative numbers are added correctly.
-    - Adding opposite numbers yields zero.
-    """
-    assert add(1, 2) == 3
-    assert add(-1, -2) == -3
-    assert add(-1, 1) == 0
-
-
-# Test cases for subtract function
-def test_subtract():
-    """
-    Test the subtract function from the math_operations module.
-
-    Ensures that:
-    - One number is subtracted from another correctly.
-    - Negative numbers are subtracted correctly.
-    - Subtracting a number from itself yields zero.
-    """
-    assert subtract(3, 2) == 1
-    assert subtract(-2, -1) == -1
-    assert subtract(-1, 1) == -2
-
-
-# Test cases for multiply function
-def test_multiply():
-    """
-    Test the multiply function from the math_operations module.
-
-    Ensures that:
-    - Positive numbers are multiplied correctly.
-    - Negative numbers are multiplied correctly.
-    - Multiplying a number by its additive inverse yields -1.
-    """
-    assert multiply(3, 2) == 6
-    assert multiply(-2, -1) == 2
-    assert multiply(-1, 1) == -1
-
-
-# Test cases for divide function
-def test_divide():
-    """
-    Test the divide function from the math_operations module.
-
-    Ensures that:
-    - Division is performed correctly when denominator is not zero.
-    - Division by zero is handled and returns a defined error value.
-    """
-    assert divide(4, 2) == 2
-    assert divide(-2, -1) == 2
-    assert divide(-1, 1) == -1
-    assert divide(0, 1) == 0
-
-
-# Use pytest fixture to handle the expected exception for zero division
-@pytest.fixture(params=[(1, 0), (0, 0)])
-def zero_division_cases(request: pytest.FixtureRequest) -> Any:
-    """
-    A pytest fixture that provides test cases for division by zero.
-
-    Args:
-    - request: The pytest fixture request context.
-
-    Returns:
-    - A tuple of two integers where the second integer is zero.
-    """
-    return request.param
-
-
-def test_divide_zero(zero_division_cases: Any):
-    """
-    Test the divide function from the math_operations module for zero division cases.
-
-    Ensures that a ZeroDivisionError is raised when attempting to divide by zero.
-
-    Args:
-    - zero_division_cases (tuple): A tuple of two integers provided by the zero_division_cases fixture.
-    """
-    a, b = zero_division_cases
-    with pytest.raises(ZeroDivisionError):
-        divide(a, b)
+# test_math_operations.py
+
+# This test module contains unit tests for the math_operations module.
+# It tests basic arithmetic functions including addition, subtraction, multiplication, and division.
+# Contains unit tests for basic arithmetic functions (addition, subtraction, multiplication, division) in the math_operations module.
+# Focuses solely on the correctness of mathematical operations.
+
+from typing import Any
+import pytest
+import math
+from math_operations import (
+    add,
+    subtract,
+    multiply,
+    divide,
+    add_batch,
+    subtract_batch,
+    multiply_batch,
+    divide_batch,
+)
+
+
+# Test cases for add function
+def test_add():
+    """
+    Test the add function from the math_operations module.
+
+    Ensures that:
+    - Positive numbers are added correctly.
+    - Negative numbers are added correctly.
+    - Adding opposite numbers yields zero.
+    """
+    assert add(1, 2) == 3
+    assert add(-1, -2) == -3
+    assert add(-1, 1) == 0
+
+
+# Test cases for subtract function
+def test_subtract():
+    """
+    Test the subtract function from the math_operations module.
+
+    Ensures that:
+    - One number is subtracted from another correctly.
+    - Negative numbers are subtracted correctly.
+    - Subtracting a number from itself yields zero.
+    """
+    assert subtract(3, 2) == 1
+    assert subtract(-2, -1) == -1
+    assert subtract(-1, 1) == -2
+
+
+# Test cases for multiply function
+def test_multiply():
+    """
+    Test the multiply function from the math_operations module.
+
+    Ensures that:
+    - Positive numbers are multiplied correctly.
+    - Negative numbers are multiplied correctly.
+    - Multiplying a number by its additive inverse yields -1.
+    """
+    assert multiply(3, 2) == 6
+    assert multiply(-2, -1) == 2
+    assert multiply(-1, 1) == -1
+
+
+# Test cases for divide function
+def test_divide():
+    """
+    Test the divide function from the math_operations module.
+
+    Ensures that:
+    - Division is performed correctly when denominator is not zero.
+    - Division by zero is handled and returns a defined error value.
+    """
+    assert divide(4, 2) == 2
+    assert divide(-2, -1) == 2
+    assert divide(-1, 1) == -1
+    assert divide(0, 1) == 0
+
+
+# Use pytest fixture to handle the expected exception for zero division
+@pytest.fixture(params=[(1, 0), (0, 0)])
+def zero_division_cases(request: pytest.FixtureRequest) -> Any:
+    """
+    A pytest fixture that provides test cases for division by zero.
+
+    Args:
+    - request: The pytest fixture request context.
+
+    Returns:
+    - A tuple of two integers where the second integer is zero.
+    """
+    return request.param
+
+
+def test_divide_zero(zero_division_cases: Any):
+    """
+    Test the divide function from the math_operations module for zero division cases.
+
+    Ensures that a ZeroDivisionError is raised when attempting to divide by zero.
+
+    Args:
+    - zero_division_cases (tuple): A tuple of two integers provided by the zero_division_cases fixture.
+    """
+    a, b = zero_division_cases
+    with pytest.raises(ZeroDivisionError):
+        divide(a, b)
+
+
+# Test cases for the batch functions
+def test_batch_operations_match_scalar():
+    """
+    Test the add, subtract and multiply batch functions against their scalar versions.
+
+    Ensures that every element of a batch result equals the scalar result for the same pair.
+    """
+    a = [1, -2, 3.5, 0, 1e300]
+    b = [2, -1, 0.5, -0.0, 1e300]
+    assert list(add_batch(a, b)) == [add(x, y) for x, y in zip(a, b)]
+    assert list(subtract_batch(a, b)) == [subtract(x, y) for x, y in zip(a, b)]
+    assert list(multiply_batch(a, b)) == [multiply(x, y) for x, y in zip(a, b)]
+
+
+def test_divide_batch_zero_divisors():
+    """
+    Test the divide_batch function from the math_operations module with zero divisors.
+
+    Ensures that:
+    - Zero divisors are flagged in the mask instead of raising ZeroDivisionError.
+    - Flagged elements hold the fill value and the others hold the scalar quotient.
+    """
+    quotients, zero_mask = divide_batch([4, 1, 0, -3], [2, 0, 0.0, 3])
+    assert list(zero_mask) == [0, 1, 1, 0]
+    assert quotients[0] == divide(4, 2)
+    assert quotients[3] == divide(-3, 3)
+    assert math.isnan(quotients[1]) and math.isnan(quotients[2])
+
+    quotients, zero_mask = divide_batch([1, 2], [0, 4], fill=0.0)
+    assert list(quotients) == [0.0, 0.5]
+    assert list(zero_mask) == [1, 0]
+
+
+def test_batch_length_mismatch():
+    """
+    Test that the batch functions reject operand sequences of different lengths.
+    """
+    with pytest.raises(ValueError):
+        add_batch([1, 2], [1])
+    with pytest.raises(ValueError):
+        divide_batch([1], [1, 2])
@@ -0,0 +1,167 @@
+# test_numeric_backends.py
+
+# This test module contains unit tests for the numeric_backends module.
+# Every backend must parse into its own number type, compute exactly or with its context, and
+# give batch results that agree with its scalar operations.
+
+import json
+import pytest
+from decimal import ROUND_DOWN, Decimal
+from fractions import Fraction
+import math_operations
+from input_validation import get_validated_float_input, validate_numbers
+from numeric_backends import BACKENDS, get_backend
+from print_operations import render_batch, render_pair
+from stream_operations import parse_pairs
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_batch_matches_scalar(name):
+    """
+    Test that the batch operations of every backend agree with its scalar operations.
+
+    Args:
+        name (str): The name of the backend.
+    """
+    backend = get_backend(name)
+    a = [backend.parse(x) for x in ("7", "-3", "12", "0")]
+    b = [backend.parse(x) for x in ("2", "5", "0", "4")]
+    for batch, scalar in [
+        (backend.add_batch, backend.add),
+        (backend.subtract_batch, backend.subtract),
+        (backend.multiply_batch, backend.multiply),
+    ]:
+        assert list(batch(a, b)) == [scalar(x, y) for x, y in zip(a, b)]
+    quotients, zero_mask = backend.divide_batch(a, b)
+    assert list(zero_mask) == [0, 0, 1, 0]
+    assert [quotients[i] for i in (0, 1, 3)] == [
+        backend.divide(a[i], b[i]) for i in (0, 1, 3)
+    ]
+    with pytest.raises(ZeroDivisionError, match="Cannot divide by zero!"):
+        backend.divide(a[2], b[2])
+
+
+def test_exact_backends():
+    """
+    Test that the decimal, fraction and int backends do not drift like binary floats.
+    """
+    decimal = get_backend("decimal")
+    assert decimal.add(decimal.parse("0.1"), decimal.parse("0.2")) == Decimal("0.3")
+    fraction = get_backend("fraction")
+    third = fraction.divide(fraction.parse("1"), fraction.parse("3"))
+    assert fraction.multiply(third, 3) == 1 and third == Fraction(1, 3)
+    integer = get_backend("int")
+    assert integer.multiply(10**30, 10**30) == 10**60
+    assert integer.divide(12, 4) == 3 and type(integer.divide(12, 4)) is int
+    assert integer.divide(7, 2) == Fraction(7, 2)
+
+
+def test_decimal_context():
+    """
+    Test that the precision and rounding of the decimal backend apply to every operation.
+    """
+    backend = get_backend("decimal", precision=4, rounding=ROUND_DOWN)
+    assert backend.divide(Decimal(2), Decimal(3)) == Decimal("0.6666")
+    assert backend.add_batch([Decimal("1.23456")], [Decimal(0)]) == [Decimal("1.234")]
+
+
+@pytest.mark.parametrize("a, b", [("inf", "inf"), ("0", "inf"), ("-inf", "inf")])
+def test_decimal_infinities_give_nan_like_floats(a, b):
+    """
+    Test that decimal operations on infinities give NaN where floats do, instead of raising.
+
+    Args:
+        a (str): The first number.
+        b (str): The second number.
+    """
+    decimal = get_backend("decimal")
+    x, y = decimal.parse(a), decimal.parse(b)
+    results = [
+        decimal.add(x, y),
+        decimal.subtract(x, y),
+        decimal.multiply(x, y),
+        decimal.divide(x, y),
+    ]
+    expected = [
+        math_operations.add(float(a), float(b)),
+        math_operations.subtract(float(a), float(b)),
+        math_operations.multiply(float(a), float(b)),
+        math_operations.divide(float(a), float(b)),
+    ]
+    assert [r.is_nan() for r in results] == [e != e for e in expected]
+    assert [r for r in results if not r.is_nan()] == [e for e in expected if e == e]
+    quotients, zero_mask = decimal.divide_batch([x], [y])
+    assert quotients[0].compare_total(results[3]) == 0 and list(zero_mask) == [0]
+    assert render_pair(x, y, backend=decimal).count("\n") == 4
+
+
+def test_decimal_overflow_gives_infinity_like_floats():
+    """
+    Test that decimal sums and products beyond the largest exponent give +-Infinity instead
+    of raising decimal.Overflow.
+    """
+    decimal = get_backend("decimal")
+    x, y = decimal.parse("9e999999"), decimal.parse("-9e999999")
+    assert decimal.add(x, x) == Decimal("Infinity")
+    assert decimal.subtract(y, x) == Decimal("-Infinity")
+    assert decimal.multiply(x, y) == Decimal("-Infinity")
+    assert decimal.divide(x, decimal.parse("1e-999999")) == Decimal("Infinity")
+    assert decimal.add_batch([x], [x]) == [Decimal("Infinity")]
+    assert render_pair(x, x, backend=decimal).splitlines()[0].endswith("is Infinity")
+
+
+def test_decimal_rejects_signalling_nan():
+    """
+    Test that a signalling NaN such as in the pair 1,sNaN is invalid input, like for floats.
+    """
+    decimal = get_backend("decimal")
+    with pytest.raises(ValueError):
+        decimal.parse("sNaN")
+    a, b, skipped = parse_pairs(["1,sNaN\n", "1,NaN\n"], decimal.parse)
+    assert len(a) == 1 and b[0].is_qnan() and skipped == 1
+
+
+def test_float_backend_uses_math_operations():
+    """
+    Test that the float backend is made of the math_operations functions themselves.
+    """
+    backend = get_backend("float")
+    assert backend.add is math_operations.add
+    assert backend.divide_batch is math_operations.divide_batch
+    with pytest.raises(ValueError):
+        get_backend("complex")
+
+
+def test_parsing_into_backend_types(monkeypatch):
+    """
+    Test that input validation parses straight into the type of a backend.
+
+    Args:
+        monkeypatch (MonkeyPatch): Pytest fixture to patch attributes.
+    """
+    decimal = get_backend("decimal")
+    values, valid = validate_numbers(["1.10", "abc", "2"], decimal.parse)
+    assert values == [Decimal("1.10"), None, Decimal(2)] and list(valid) == [1, 0, 1]
+    a, b, skipped = parse_pairs(["1/3,1/6\n", "1,x\n"], get_backend("fraction").parse)
+    assert (a, b, skipped) == ([Fraction(1, 3)], [Fraction(1, 6)], 1)
+    answers = iter(["2.5", "42"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    assert get_validated_float_input("> ", get_backend("int").parse) == 42
+
+
+def test_rendering_with_backends():
+    """
+    Test the text and JSON lines rendered with the decimal and fraction backends.
+    """
+    decimal = get_backend("decimal")
+    a, b = decimal.parse("0.1"), decimal.parse("0.2")
+    assert render_pair(0.1, 0.2).splitlines()[0].endswith("is 0.30000000000000004")
+    assert (
+        render_pair(a, b, backend=decimal).splitlines()[0]
+        == "The sum of 0.1 and 0.2 is 0.3"
+    )
+    row = json.loads(render_batch([a], [b], "jsonl", decimal))
+    assert row["sum"] == 0.3 and row["quotient"] == 0.5
+    fraction = get_backend("fraction")
+    row = json.loads(render_pair(Fraction(1, 3), Fraction(1), "jsonl", fraction))
+    assert row["a"] == "1/3" and row["b"] == 1 and row["quotient"] == "1/3"
@@ -0,0 +1,133 @@
+# test_operation_tables.py
+
+# This test module contains unit tests for the operation_tables module.
+# Every cell of a table must hold what print_operations gives for its pair of operands, whatever
+# the tile size, in the order of nested loops over the two operand vectors.
+
+import io
+import sys
+from array import array
+from contextlib import redirect_stdout
+import pytest
+from binary_format import RESULT_COLUMNS, MappedColumns
+from operation_tables import (
+    compute_table,
+    iter_tiles,
+    read_operands,
+    render_table,
+    write_table,
+)
+from print_operations import print_operations
+from results import OperationResult
+
+A = [5.0, -1.5, 0.0, 2.0, 7.25]
+B = [3.0, 0.0, -0.0, 4.0, 1e-300, -2.0, 8.0]
+
+
+@pytest.mark.parametrize("tile_rows, tile_columns", [(16, 1024), (2, 3), (1, 1)])
+def test_table_cells(tile_rows, tile_columns):
+    """
+    Test that every cell holds the results of its operands, zero divisors being flagged.
+
+    Args:
+        tile_rows (int): The number of rows of a tile.
+        tile_columns (int): The number of columns of a tile.
+    """
+    table = compute_table(A, B, tile_rows, tile_columns)
+    assert list(table) == [OperationResult.compute(a, b) for a in A for b in B]
+    assert table[len(B) + 1].division_error and not table[0].division_error
+
+
+def test_tiles_cover_the_table():
+    """
+    Test that the tiles cover every cell exactly once, with the requested size at most.
+    """
+    cells = set()
+    for row_start, row_stop, column_start, column_stop, results in iter_tiles(
+        A, B, 2, 3
+    ):
+        assert row_stop - row_start <= 2 and column_stop - column_start <= 3
+        assert len(results) == (row_stop - row_start) * (column_stop - column_start)
+        cells.update(
+            (i, j)
+            for i in range(row_start, row_stop)
+            for j in range(column_start, column_stop)
+        )
+    assert cells == {(i, j) for i in range(len(A)) for j in range(len(B))}
+    with pytest.raises(ValueError):
+        next(iter_tiles(A, B, 0, 3))
+
+
+@pytest.mark.parametrize("tile_columns", [1024, 3])
+def test_render_table_matches_nested_loops(tile_columns):
+    """
+    Test that the rendered table is the output of nested loops calling print_operations.
+
+    Args:
+        tile_columns (int): The number of columns of a tile.
+    """
+    expected = io.StringIO()
+    with redirect_stdout(expected):
+        for a in A:
+            for b in B:
+                print_operations(a, b)
+    out = io.StringIO()
+    assert render_table(A, B, out, tile_columns=tile_columns) == len(A) * len(B)
+    assert out.getvalue() == expected.getvalue()
+
+
+def test_write_table_to_binary_file(tmp_path):
+    """
+    Test that a table written tile by tile to a binary file holds every cell.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    path = str(tmp_path / "table.bin")
+    a = [float(i) for i in range(-20, 21)]
+    b = [float(i) / 4 for i in range(-30, 31)]
+    assert write_table(a, b, path, tile_rows=3, tile_columns=8) == len(a) * len(b)
+    expected = compute_table(a, b)
+    with MappedColumns(path) as table:
+        assert table.rows == len(a) * len(b)
+        # Compared as bytes, since the NaN quotients of zero divisors never compare equal.
+        for name, column in zip(table.names[:-1], expected.columns()):
+            assert bytes(table.columns[name]) == bytes(column)
+        assert list(table.columns["division_error"]) == list(
+            map(float, expected.division_errors)
+        )
+        assert list(table.columns["division_error"]).count(1.0) == len(a)
+
+
+def test_write_table_on_big_endian_hosts(tmp_path, monkeypatch):
+    """
+    Test that a table written on a (simulated) big-endian host holds little-endian floats.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+        monkeypatch (MonkeyPatch): Pytest fixture to patch attributes.
+    """
+    a, b = [1.0, -2.5, 3.0], [0.0, 0.5]
+    write_table(a, b, str(tmp_path / "little.bin"), tile_rows=2, tile_columns=1)
+    monkeypatch.setattr(sys, "byteorder", "big")
+    write_table(a, b, str(tmp_path / "big.bin"), tile_rows=2, tile_columns=1)
+    little, big = (tmp_path / "little.bin").read_bytes(), (
+        tmp_path / "big.bin"
+    ).read_bytes()
+    header = len(little) - 6 * len(RESULT_COLUMNS) * 8
+    swapped = array("d", big[header:])
+    swapped.byteswap()
+    assert big[:header] == little[:header] and bytes(swapped) == little[header:]
+
+
+def test_read_operands(tmp_path):
+    """
+    Test reading an operand vector, skipping invalid numbers.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    path = tmp_path / "a.txt"
+    path.write_text("1, 2.5\n-3 x\n4e2\n")
+    values, skipped = read_operands(str(path))
+    assert list(values) == [1.0, 2.5, -3.0, 400.0] and skipped == 1
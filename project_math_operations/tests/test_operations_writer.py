@@ -0,0 +1,95 @@
+# test_operations_writer.py
+
+# This test module contains unit tests for the OperationsWriter in the print_operations module.
+# The text format must stay byte-for-byte identical to what print_operations prints,
+# and the CSV and JSON Lines formats must read back into the same numbers.
+
+import csv
+import io
+import json
+import math
+import pytest
+from print_operations import OperationsWriter, print_operations, render_pair
+
+PAIRS = [(5.0, 3.0), (5, 0), (-1.5, 0.25), (1e308, 10.0)]
+
+
+def test_text_format_matches_print_operations(capsys):
+    """
+    Test that the text format of write_pair and write_batch matches print_operations exactly.
+
+    Args:
+        capsys (CaptureFixture): Pytest fixture to capture stdout and stderr.
+    """
+    for a, b in PAIRS:
+        print_operations(a, b)
+    expected = capsys.readouterr().out
+
+    stream = io.StringIO()
+    with OperationsWriter(stream) as writer:
+        for a, b in PAIRS:
+            writer.write_pair(a, b)
+    assert stream.getvalue() == expected
+
+    floats = [(float(a), float(b)) for a, b in PAIRS]
+    for a, b in floats:
+        print_operations(a, b)
+    expected = capsys.readouterr().out
+    stream = io.StringIO()
+    with OperationsWriter(stream) as writer:
+        writer.write_batch([a for a, _ in floats], [b for _, b in floats])
+    assert stream.getvalue() == expected
+
+
+def test_csv_format():
+    """
+    Test that the CSV format has a header and reads back into the computed numbers.
+    """
+    stream = io.StringIO()
+    with OperationsWriter(stream, "csv") as writer:
+        writer.write_batch([6.0, 1.0], [3.0, 0.0])
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert float(rows[0]["quotient"]) == 2.0 and rows[0]["division_error"] == "0"
+    assert rows[1]["quotient"] == "" and rows[1]["division_error"] == "1"
+    assert float(rows[1]["product"]) == 0.0
+
+
+def test_jsonl_format():
+    """
+    Test that every JSON Lines record parses, including non-finite numbers and zero divisors.
+    """
+    stream = io.StringIO()
+    with OperationsWriter(stream, "jsonl") as writer:
+        writer.write_batch([6.0, math.inf], [3.0, 0.0])
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first == {
+        "a": 6.0,
+        "b": 3.0,
+        "sum": 9.0,
+        "difference": 3.0,
+        "product": 18.0,
+        "quotient": 2.0,
+        "division_error": False,
+    }
+    assert second["quotient"] is None and second["division_error"] is True
+    assert second["sum"] == math.inf and math.isnan(second["product"])
+
+
+def test_writer_buffers_until_flush():
+    """
+    Test that nothing reaches the stream until the buffer fills up or flush is called.
+    """
+    stream = io.StringIO()
+    writer = OperationsWriter(stream, buffer_size=1000)
+    writer.write_pair(1.0, 2.0)
+    assert stream.getvalue() == ""
+    writer.flush()
+    assert stream.getvalue() == render_pair(1.0, 2.0)
+
+
+def test_unknown_format():
+    """
+    Test that an unsupported output format is rejected.
+    """
+    with pytest.raises(ValueError):
+        OperationsWriter(io.StringIO(), "xml")
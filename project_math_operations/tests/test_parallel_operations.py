@@ -0,0 +1,68 @@
+# test_parallel_operations.py
+
+# This test module contains unit tests for the parallel_operations module.
+# Results computed in the process pool must equal the single-process batch results, in order.
+
+import math
+import random
+import pytest
+from math_operations import add_batch, subtract_batch, multiply_batch, divide_batch
+from parallel_operations import evaluate_parallel, shard_bounds
+
+
+@pytest.fixture(params=[(1, None), (2, 7), (3, 1000)])
+def pool_settings(request: pytest.FixtureRequest):
+    """
+    A pytest fixture that provides worker counts and chunk sizes for the process pool.
+
+    Returns:
+        tuple: The number of workers and the chunk size.
+    """
+    return request.param
+
+
+def test_shard_bounds():
+    """
+    Test that shard_bounds covers every index exactly once, in order.
+    """
+    assert shard_bounds(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert shard_bounds(0, 4) == []
+
+
+def test_evaluate_parallel_matches_batch(pool_settings):
+    """
+    Test that evaluate_parallel returns the same results as the batch functions.
+
+    Args:
+        pool_settings (tuple): The number of workers and the chunk size.
+    """
+    workers, chunk_size = pool_settings
+    rng = random.Random(110)
+    a = [rng.uniform(-1e6, 1e6) for _ in range(500)]
+    b = [rng.choice([0.0, -0.0, rng.uniform(-10, 10)]) for _ in range(500)]
+    sums, differences, products, quotients, zero_mask = evaluate_parallel(
+        a, b, workers, chunk_size
+    )
+    assert sums == add_batch(a, b)
+    assert differences == subtract_batch(a, b)
+    assert products == multiply_batch(a, b)
+    expected_quotients, expected_mask = divide_batch(a, b)
+    assert zero_mask == expected_mask
+    for q, expected, zero in zip(quotients, expected_quotients, zero_mask):
+        assert math.isnan(q) if zero else q == expected
+
+
+def test_evaluate_parallel_empty_and_mismatched():
+    """
+    Test evaluate_parallel on empty operands and operands of different lengths.
+    """
+    assert evaluate_parallel([], [], workers=2) == (
+        add_batch([], []),
+        subtract_batch([], []),
+        multiply_batch([], []),
+        *divide_batch([], []),
+    )
+    with pytest.raises(ValueError):
+        evaluate_parallel([1.0], [], workers=2)
+    with pytest.raises(ValueError):
+        evaluate_parallel([1.0], [2.0], workers=0)
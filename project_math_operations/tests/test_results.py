@@ -0,0 +1,83 @@
+# test_results.py
+
+# This test module contains unit tests for the results module and the renderers of result records.
+
+import io
+import math
+from array import array
+from fractions import Fraction
+import pytest
+from numeric_backends import get_backend
+from print_operations import (
+    iter_rendered,
+    render_batch,
+    render_pair,
+    render_result,
+    render_results,
+    OperationsWriter,
+)
+from results import OperationResult, ResultBatch
+
+A = array("d", [5.0, 1.5, -2.0, 0.0])
+B = array("d", [3.0, 0.0, 4.0, 0.0])
+
+
+def test_operation_result_fields():
+    """
+    Test the fields of single results, with and without a division by zero.
+    """
+    result = OperationResult.compute(5.0, 2.0)
+    assert tuple(result) == (5.0, 2.0, 7.0, 3.0, 10.0, 2.5, False)
+    assert OperationResult.compute(5.0, 0.0).quotient is None
+    assert OperationResult.compute(5.0, 0.0).division_error
+    assert not hasattr(result, "__dict__")
+    with pytest.raises(AttributeError):
+        result.remainder = 1.0
+
+
+def test_batch_columns_and_rows():
+    """
+    Test that a batch holds array columns and that its rows equal single results.
+    """
+    batch = ResultBatch.compute(A, B)
+    assert len(batch) == 4
+    assert all(isinstance(column, array) for column in batch.columns()[:6])
+    assert list(batch.division_errors) == [0, 1, 0, 1]
+    assert math.isnan(batch.quotients[1])
+    assert list(batch) == [OperationResult.compute(a, b) for a, b in zip(A, B)]
+    assert batch[-1] == OperationResult.compute(0.0, 0.0)
+    assert list(batch[1:3]) == list(batch)[1:3]
+    assert batch.nbytes == 4 * (6 * 8 + 1)
+
+
+@pytest.mark.parametrize("fmt", ["text", "csv", "jsonl"])
+def test_lazy_rendering_matches_render_pair(fmt):
+    """
+    Test that rendering records gives the same text as rendering the operands.
+
+    Args:
+        fmt (str): The output format.
+    """
+    batch = ResultBatch.compute(A, B)
+    expected = [render_pair(a, b, fmt) for a, b in zip(A, B)]
+    assert list(iter_rendered(batch, fmt)) == expected
+    assert render_results(batch, fmt) == render_batch(A, B, fmt) == "".join(expected)
+    assert [render_result(result, fmt) for result in batch] == expected
+    stream = io.StringIO()
+    with OperationsWriter(stream, fmt) as writer:
+        writer.write_results(batch)
+    assert stream.getvalue().endswith("".join(expected))
+
+
+def test_batch_with_backend():
+    """
+    Test a batch computed by an exact numeric backend, which holds lists.
+    """
+    backend = get_backend("fraction")
+    a, b = [Fraction(1, 3), Fraction(1)], [Fraction(2), Fraction(0)]
+    batch = ResultBatch.compute(a, b, backend)
+    assert batch[0] == OperationResult.compute(a[0], b[0], backend)
+    assert batch[0].quotient == Fraction(1, 6) and batch[1].division_error
+    assert render_results(batch, "jsonl", backend) == render_batch(
+        a, b, "jsonl", backend
+    )
@@ -0,0 +1,96 @@
+# test_service.py
+
+# This test module contains unit tests for the service module.
+# Responses must carry the same numbers and text as the math_operations and print_operations
+# functions, in request order, also when many requests are pipelined on one connection.
+
+import asyncio
+import socket
+import pytest
+from math_operations import add, divide, multiply, subtract
+from print_operations import render_pair
+from input_validation import INVALID_INPUT_MESSAGE
+from service import handle_requests, start_server
+
+
+def test_handle_requests():
+    """
+    Test the responses to well-formed and malformed requests.
+    """
+    lines = [b"add 5 3", b"subtract 5 3", b"multiply 5 3", b"divide 5 3", b"divide 5 0"]
+    lines += [b"print 5 0", b"power 2 3", b"add 5", b"add x 3"]
+    responses = handle_requests(lines).decode().splitlines(keepends=True)
+    assert responses[:5] == [
+        f"ok {add(5.0, 3.0)}\n",
+        f"ok {subtract(5.0, 3.0)}\n",
+        f"ok {multiply(5.0, 3.0)}\n",
+        f"ok {divide(5.0, 3.0)}\n",
+        "error Cannot divide by zero!\n",
+    ]
+    assert "".join(responses[5:10]) == "ok 4\n" + render_pair(5.0, 0.0)
+    assert [line.split()[0] for line in responses[10:]] == ["error"] * 3
+    assert responses[12] == f"error {INVALID_INPUT_MESSAGE}\n"
+
+
+def test_pipelined_requests_over_tcp():
+    """
+    Test that pipelined requests sent over TCP get their responses in request order.
+    """
+
+    async def exchange():
+        server = await start_server("127.0.0.1:0")
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"".join(b"add %d 1\n" % i for i in range(2000)))
+            # A request split across two writes is only answered once complete.
+            writer.write(b"print 6 ")
+            await writer.drain()
+            writer.write(b"3\n")
+            responses = [await reader.readline() for _ in range(2005)]
+            writer.close()
+            await writer.wait_closed()
+        return responses
+
+    responses = asyncio.run(exchange())
+    assert [line.decode() for line in responses[:2000]] == [
+        f"ok {float(i + 1)}\n" for i in range(2000)
+    ]
+    assert b"".join(responses[2000:]).decode() == "ok 4\n" + render_pair(6.0, 3.0)
+
+
+def ipv6_loopback_available():
+    """
+    Tells whether a socket can be bound to the IPv6 loopback address.
+
+    Returns:
+        bool: True if [::1] can be served on.
+    """
+    if not socket.has_ipv6:
+        return False
+    try:
+        with socket.socket(socket.AF_INET6) as probe:
+            probe.bind(("::1", 0))
+    except OSError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not ipv6_loopback_available(), reason="no IPv6 loopback")
+def test_ipv6_address_in_brackets():
+    """
+    Test that an IPv6 address in brackets, "[::1]:port", is served over TCP.
+    """
+
+    async def exchange():
+        server = await start_server("[::1]:0")
+        host, port = server.sockets[0].getsockname()[:2]
+        async with server:
+            reader, writer = await asyncio.open_connection("::1", port)
+            writer.write(b"multiply 6 7\n")
+            response = await reader.readline()
+            writer.close()
+            await writer.wait_closed()
+        return host, response
+
+    assert asyncio.run(exchange()) == ("::1", f"ok {multiply(6.0, 7.0)}\n".encode())
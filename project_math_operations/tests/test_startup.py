@@ -0,0 +1,37 @@
+# test_startup.py
+
+# This test module contains unit tests for the startup budget check in benchmarks/startup.py.
+# Timings depend on the machine, so the tests check which modules are loaded at startup and
+# that an exceeded budget is reported, not the import times of this machine.
+
+from benchmarks.startup import HEAVY_MODULES, check_startup, import_times, run
+
+
+def test_entry_points_do_not_import_heavy_modules():
+    """
+    Test that importing math_operations, main or the client loads none of the heavy modules.
+    """
+    for module in ("math_operations", "main", "client"):
+        times = import_times(module)
+        assert module in times
+        assert not set(times).intersection(HEAVY_MODULES)
+
+
+def test_modes_import_their_subsystems_lazily():
+    """
+    Test that the subsystems of the other modes are not loaded by importing main.
+    """
+    times = import_times("main")
+    for module in ("binary_format", "service", "stream_operations", "instrumentation"):
+        assert module not in times
+
+
+def test_exceeded_budget_is_reported():
+    """
+    Test that check_startup and the command line report a module over its budget.
+    """
+    best, failures = check_startup({"math_operations": 0.0}, repeat=1)
+    assert best["math_operations"] > 0
+    assert len(failures) == 1 and "over its budget" in failures[0]
+    assert run(["--budget", "math_operations=0", "--repeat", "1"]) == 1
+    assert run(["--budget", "math_operations=100000", "--repeat", "1"]) == 0
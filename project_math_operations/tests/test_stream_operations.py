@@ -0,0 +1,72 @@
+# test_stream_operations.py
+
+# This test module contains unit tests for the stream_operations module.
+# The file mode must write exactly what print_operations prints for each pair, so the
+# expected text is captured from print_operations with the capsys fixture.
+
+import io
+import pytest
+from print_operations import print_operations
+from stream_operations import evaluate_file, evaluate_stream, parse_pairs
+
+
+@pytest.fixture(params=[1, 2, 1000])
+def chunk_size(request: pytest.FixtureRequest) -> int:
+    """
+    A pytest fixture that provides chunk sizes smaller and larger than the test input.
+
+    Returns:
+        int: The number of lines evaluated at a time.
+    """
+    return request.param
+
+
+def test_parse_pairs():
+    """
+    Test the parse_pairs function from the stream_operations module.
+
+    Ensures that comma and whitespace separated pairs are parsed, blank lines are ignored,
+    and malformed lines are counted as skipped.
+    """
+    a, b, skipped = parse_pairs(["5,3\n", "\n", "1.5 -2\n", "a,b\n", "1,2,3\n"])
+    assert list(a) == [5.0, 1.5]
+    assert list(b) == [3.0, -2.0]
+    assert skipped == 2
+
+
+def test_evaluate_stream_matches_print_operations(capsys, chunk_size):
+    """
+    Test that evaluate_stream writes the same text as print_operations for every pair.
+
+    Args:
+        capsys (CaptureFixture): Pytest fixture to capture stdout and stderr.
+        chunk_size (int): The chunk size provided by the chunk_size fixture.
+    """
+    pairs = [(5.0, 3.0), (5.0, 0.0), (-1.5, 0.25), (0.0, -0.0)]
+    for a, b in pairs:
+        print_operations(a, b)
+    expected = capsys.readouterr().out
+
+    infile = io.StringIO("".join(f"{a},{b}\n" for a, b in pairs) + "x,y\n")
+    outfile = io.StringIO()
+    assert evaluate_stream(infile, outfile, chunk_size) == (len(pairs), 1)
+    assert outfile.getvalue() == expected
+
+
+def test_evaluate_file(tmp_path):
+    """
+    Test that evaluate_file reads the input file and writes the results to the output file.
+
+    Args:
+        tmp_path (Path): Pytest fixture providing a temporary directory.
+    """
+    input_path = tmp_path / "pairs.csv"
+    output_path = tmp_path / "results.txt"
+    input_path.write_text("4,2\n")
+    assert evaluate_file(str(input_path), str(output_path)) == (1, 0)
+    assert output_path.read_text().splitlines() == [
+        "The sum of 4.0 and 2.0 is 6.0",
+        "The difference between 4.0 and 2.0 is 2.0",
+        "The product of 4.0 and 2.0 is 8.0",
+        "The division of 4.0 by 2.0 results in 2.0",
+    ]